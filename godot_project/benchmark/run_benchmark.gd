@@ -0,0 +1,39 @@
+# Runs a recorded session through every tracker backend without a camera or
+# a window, e.g. in CI:
+#
+#   godot --headless --path godot_project --script res://benchmark/run_benchmark.gd \
+#       -- --replay=res://benchmark/session.mp4 --reference=res://benchmark/session.csv
+#
+# The reference file holds `frame,x,y` lines in capture pixels. Results are
+# printed as JSON, and written to `--output` if given.
+extends SceneTree
+
+
+func _init() -> void:
+	var args := {}
+	for arg in OS.get_cmdline_user_args():
+		var parts: PackedStringArray = arg.trim_prefix("--").split("=", true, 1)
+		args[parts[0]] = parts[1] if parts.size() > 1 else ""
+
+	if not args.has("replay"):
+		printerr("usage: --replay=<video or image sequence> [--reference=<csv>] [--output=<json>]")
+		quit(1)
+		return
+
+	var camera := CameraExtension.new()
+	var results: Dictionary = camera.run_benchmark(args["replay"], args.get("reference", ""))
+	camera.free()
+
+	var json := JSON.stringify(results, "\t")
+	print(json)
+
+	if args.has("output"):
+		var file := FileAccess.open(args["output"], FileAccess.WRITE)
+		file.store_string(json)
+
+	var failed := results.is_empty()
+	for backend in results:
+		if results[backend].has("error"):
+			printerr("%s: %s" % [backend, results[backend]["error"]])
+			failed = true
+	quit(1 if failed else 0)
@@ -1,8 +1,14 @@
 #!/usr/bin/env python
 
+import hashlib
 import json
+import os
+import pickle
 import re
 import shutil
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
 from pathlib import Path
 
 
@@ -48,7 +54,7 @@ virtual $RETVAL _##m_name($FUNCARGS) $CONST override; \\
     return s
 
 
-def generate_wrappers(target):
+def generate_wrappers(target, files):
     max_versions = 12
 
     txt = """
@@ -66,8 +72,7 @@ def generate_wrappers(target):
 
     txt += "\n#endif\n"
 
-    with open(target, "w", encoding="utf-8") as f:
-        f.write(txt)
+    files[target] = txt
 
 
 def generate_virtual_version(argcount, const=False, returns=False):
@@ -175,7 +180,7 @@ def generate_virtual_version(argcount, const=False, returns=False):
     return s
 
 
-def generate_virtuals(target):
+def generate_virtuals(target, files):
     max_versions = 12
 
     txt = """/* THIS FILE IS GENERATED DO NOT EDIT */
@@ -193,17 +198,96 @@ def generate_virtuals(target):
 
     txt += "#endif // GDEXTENSION_GDVIRTUAL_GEN_H\n"
 
-    with open(target, "w", encoding="utf-8") as f:
-        f.write(txt)
+    files[target] = txt
+
+
+# Bump this whenever the content of the API index changes, to invalidate existing caches.
+API_INDEX_VERSION = 2
+
+
+def make_api_index(api):
+    """
+    Compact digest of the API JSON, with only what is needed to list the generated files
+    and to resolve the dependencies between engine classes.
+    """
+    class_names = {engine_class["name"] for engine_class in api["classes"]}
+
+    # Engine classes referenced by the methods of each engine class.
+    dependencies = {}
+    for engine_class in api["classes"]:
+        ref_cls = set()
+        for method in engine_class.get("methods", []):
+            types = [method.get("return_value", {}).get("type", "")]
+            types += [a["type"] for a in method.get("arguments", [])]
+            for type_name in types:
+                if type_name in class_names:
+                    ref_cls.add(type_name)
+                elif is_enum(type_name) and get_enum_class(type_name) in class_names:
+                    ref_cls.add(get_enum_class(type_name))
+        ref_cls.discard(engine_class["name"])
+        dependencies[engine_class["name"]] = sorted(ref_cls)
+
+    # Reverse edges of the inheritance and dependency graphs, used to propagate disabled classes.
+    inherits = {engine_class["name"]: engine_class.get("inherits", "") for engine_class in api["classes"]}
+    children = {}
+    for child, parent in inherits.items():
+        if parent:
+            children.setdefault(parent, []).append(child)
+    dependents = {}
+    for name, ref_cls in dependencies.items():
+        for acls in ref_cls:
+            dependents.setdefault(acls, []).append(name)
+
+    return {
+        "builtin_classes": [builtin_class["name"] for builtin_class in api["builtin_classes"]],
+        "classes": [engine_class["name"] for engine_class in api["classes"]],
+        "native_structures": [native_struct["name"] for native_struct in api["native_structures"]],
+        "inherits": inherits,
+        "children": children,
+        "dependencies": dependencies,
+        "dependents": dependents,
+    }
+
+
+def load_api_index(api_filepath, output_dir):
+    """
+    Load the index of the API JSON, from a cache next to the `gen` folder when the API file didn't change,
+    so that listing the generated files (done on every SCons invocation) doesn't need to parse the whole JSON.
+    """
+    api_stat = os.stat(api_filepath)
+    cache_key = (API_INDEX_VERSION, str(Path(api_filepath).resolve()), api_stat.st_mtime_ns, api_stat.st_size)
+    cache_path = Path(output_dir) / "api_index.gen.pickle"
+
+    try:
+        with cache_path.open("rb") as cache_file:
+            cached_key, index = pickle.load(cache_file)
+        if cached_key == cache_key:
+            return index
+    except Exception:
+        # Missing, outdated or corrupted cache, rebuild it.
+        pass
+
+    with open(api_filepath, encoding="utf-8") as api_file:
+        index = make_api_index(json.load(api_file))
+
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = cache_path.with_suffix(".tmp")
+        with temp_path.open("wb") as cache_file:
+            pickle.dump((cache_key, index), cache_file, pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, cache_path)
+    except OSError:
+        # The cache is only an optimization, e.g. the output directory may be read-only.
+        pass
+
+    return index
 
 
 def get_file_list(api_filepath, output_dir, headers=False, sources=False, profile_filepath=""):
-    api = {}
     files = []
-    with open(api_filepath, encoding="utf-8") as api_file:
-        api = json.load(api_file)
+    api_index = load_api_index(api_filepath, output_dir)
 
-    build_profile = parse_build_profile(profile_filepath, api)
+    build_profile = parse_build_profile(profile_filepath, api_index)
 
     core_gen_folder = Path(output_dir) / "gen" / "include" / "godot_cpp" / "core"
     include_gen_folder = Path(output_dir) / "gen" / "include" / "godot_cpp"
@@ -212,34 +296,31 @@ def get_file_list(api_filepath, output_dir, headers=False, sources=False, profil
     files.append(str((core_gen_folder / "ext_wrappers.gen.inc").as_posix()))
     files.append(str((core_gen_folder / "gdvirtual.gen.inc").as_posix()))
 
-    for builtin_class in api["builtin_classes"]:
-        if is_pod_type(builtin_class["name"]):
+    for builtin_class_name in api_index["builtin_classes"]:
+        if is_pod_type(builtin_class_name):
             continue
 
-        if is_included_type(builtin_class["name"]):
+        if is_included_type(builtin_class_name):
             continue
 
-        header_filename = include_gen_folder / "variant" / (camel_to_snake(builtin_class["name"]) + ".hpp")
-        source_filename = source_gen_folder / "variant" / (camel_to_snake(builtin_class["name"]) + ".cpp")
+        header_filename = include_gen_folder / "variant" / (camel_to_snake(builtin_class_name) + ".hpp")
+        source_filename = source_gen_folder / "variant" / (camel_to_snake(builtin_class_name) + ".cpp")
         if headers:
             files.append(str(header_filename.as_posix()))
         if sources:
             files.append(str(source_filename.as_posix()))
 
-    for engine_class in api["classes"]:
+    for engine_class_name in api_index["classes"]:
         # Generate code for the ClassDB singleton under a different name.
-        if engine_class["name"] == "ClassDB":
-            engine_class["name"] = "ClassDBSingleton"
-            engine_class["alias_for"] = "ClassDB"
-        header_filename = include_gen_folder / "classes" / (camel_to_snake(engine_class["name"]) + ".hpp")
-        source_filename = source_gen_folder / "classes" / (camel_to_snake(engine_class["name"]) + ".cpp")
+        engine_class_name = CLASS_ALIASES.get(engine_class_name, engine_class_name)
+        header_filename = include_gen_folder / "classes" / (camel_to_snake(engine_class_name) + ".hpp")
+        source_filename = source_gen_folder / "classes" / (camel_to_snake(engine_class_name) + ".cpp")
         if headers:
             files.append(str(header_filename.as_posix()))
-        if sources and is_class_included(engine_class["name"], build_profile):
+        if sources and is_class_included(engine_class_name, build_profile):
             files.append(str(source_filename.as_posix()))
 
-    for native_struct in api["native_structures"]:
-        struct_name = native_struct["name"]
+    for struct_name in api_index["native_structures"]:
         if struct_name == "ObjectID":
             continue
         snake_struct_name = camel_to_snake(struct_name)
@@ -271,7 +352,11 @@ def print_file_list(api_filepath, output_dir, headers=False, sources=False, prof
     print(*get_file_list(api_filepath, output_dir, headers, sources, profile_filepath), sep=";", end=None)
 
 
-def parse_build_profile(profile_filepath, api):
+def parse_build_profile(profile_filepath, api_index):
+    """
+    Compute the classes enabled or disabled by a build profile, following inheritance and method dependencies.
+    Both returned entries map each class to the reason it was enabled or disabled.
+    """
     if profile_filepath == "":
         return {}
     print("Using feature build profile: " + profile_filepath)
@@ -279,75 +364,20 @@ def parse_build_profile(profile_filepath, api):
     with open(profile_filepath, encoding="utf-8") as profile_file:
         profile = json.load(profile_file)
 
-    api_dict = {}
-    parents = {}
-    children = {}
-    for engine_class in api["classes"]:
-        api_dict[engine_class["name"]] = engine_class
-        parent = engine_class.get("inherits", "")
-        child = engine_class["name"]
-        parents[child] = parent
-        if parent == "":
-            continue
-        children[parent] = children.get(parent, [])
-        children[parent].append(child)
-
-    # Parse methods dependencies
-    deps = {}
-    reverse_deps = {}
-    for name, engine_class in api_dict.items():
-        ref_cls = set()
-        for method in engine_class.get("methods", []):
-            rtype = method.get("return_value", {}).get("type", "")
-            args = [a["type"] for a in method.get("arguments", [])]
-            if rtype in api_dict:
-                ref_cls.add(rtype)
-            elif is_enum(rtype) and get_enum_class(rtype) in api_dict:
-                ref_cls.add(get_enum_class(rtype))
-            for arg in args:
-                if arg in api_dict:
-                    ref_cls.add(arg)
-                elif is_enum(arg) and get_enum_class(arg) in api_dict:
-                    ref_cls.add(get_enum_class(arg))
-        deps[engine_class["name"]] = set(filter(lambda x: x != name, ref_cls))
-        for acls in ref_cls:
-            if acls == name:
-                continue
-            reverse_deps[acls] = reverse_deps.get(acls, set())
-            reverse_deps[acls].add(name)
-
-    included = []
-    front = list(profile.get("enabled_classes", []))
-    if front:
-        # These must always be included
-        front.append("WorkerThreadPool")
-        front.append("ClassDB")
-        front.append("ClassDBSingleton")
-    while front:
-        cls = front.pop()
-        if cls in included:
-            continue
-        included.append(cls)
-        parent = parents.get(cls, "")
-        if parent:
-            front.append(parent)
-        for rcls in deps.get(cls, set()):
-            if rcls in included or rcls in front:
-                continue
-            front.append(rcls)
+    included = {}
+    enabled_classes = profile.get("enabled_classes", [])
+    if enabled_classes:
+        included = resolve_class_closure(
+            [(cls, "enabled in the build profile") for cls in enabled_classes]
+            # These must always be included
+            + [(cls, "always included") for cls in ["WorkerThreadPool", "ClassDB", "ClassDBSingleton"]],
+            [(api_index["inherits"], "parent of"), (api_index["dependencies"], "used by")],
+        )
 
-    excluded = []
-    front = list(profile.get("disabled_classes", []))
-    while front:
-        cls = front.pop()
-        if cls in excluded:
-            continue
-        excluded.append(cls)
-        front += children.get(cls, [])
-        for rcls in reverse_deps.get(cls, set()):
-            if rcls in excluded or rcls in front:
-                continue
-            front.append(rcls)
+    excluded = resolve_class_closure(
+        [(cls, "disabled in the build profile") for cls in profile.get("disabled_classes", [])],
+        [(api_index["children"], "inherits from"), (api_index["dependents"], "uses")],
+    )
 
     if included and excluded:
         print(
@@ -360,6 +390,53 @@ def parse_build_profile(profile_filepath, api):
     }
 
 
+def resolve_class_closure(roots, graphs):
+    """
+    Breadth-first closure of the `roots` classes over the edges of `graphs`, a list of
+    (class -> class or list of classes, reason) pairs. Returns a dict mapping every reached class
+    to the reason it was reached, in discovery order, so each class is visited only once.
+    """
+    reasons = {}
+    queue = deque()
+    for cls, reason in roots:
+        if cls not in reasons:
+            reasons[cls] = reason
+            queue.append(cls)
+
+    while queue:
+        cls = queue.popleft()
+        for graph, reason in graphs:
+            targets = graph.get(cls, [])
+            for target in [targets] if isinstance(targets, str) else targets:
+                if target and target not in reasons:
+                    reasons[target] = f"{reason} {cls}"
+                    queue.append(target)
+
+    return reasons
+
+
+def explain_build_profile(api_filepath, profile_filepath, output_dir="."):
+    """
+    Print which classes a build profile enables or disables and why, and how many generated sources it saves.
+    """
+    build_profile = parse_build_profile(profile_filepath, load_api_index(api_filepath, output_dir))
+
+    for key in ["enabled_classes", "disabled_classes"]:
+        reasons = build_profile.get(key, {})
+        if not reasons:
+            continue
+        print(f"{key} ({len(reasons)}):")
+        for cls, reason in reasons.items():
+            print(f"\t{cls}: {reason}")
+
+    all_sources = get_file_list(api_filepath, output_dir, sources=True)
+    profile_sources = get_file_list(api_filepath, output_dir, sources=True, profile_filepath=profile_filepath)
+    print(
+        f"Compiling {len(profile_sources)} of {len(all_sources)} generated sources "
+        f"({len(all_sources) - len(profile_sources)} saved by the build profile)."
+    )
+
+
 def scons_emit_files(target, source, env):
     profile_filepath = env.get("build_profile", "")
     if profile_filepath and not Path(profile_filepath).is_absolute():
@@ -378,11 +455,15 @@ def scons_generate_bindings(target, source, env):
         "32" if "32" in env["arch"] else "64",
         env["precision"],
         env["godot_cpp_gen_dir"],
+        env.get("incremental_bindings", False),
+        env.GetOption("num_jobs"),
     )
     return None
 
 
-def generate_bindings(api_filepath, use_template_get_node, bits="64", precision="single", output_dir="."):
+def generate_bindings(
+    api_filepath, use_template_get_node, bits="64", precision="single", output_dir=".", incremental=False, jobs=1
+):
     api = None
 
     target_dir = Path(output_dir) / "gen"
@@ -390,54 +471,230 @@ def generate_bindings(api_filepath, use_template_get_node, bits="64", precision=
     with open(api_filepath, encoding="utf-8") as api_file:
         api = json.load(api_file)
 
-    shutil.rmtree(target_dir, ignore_errors=True)
-    target_dir.mkdir(parents=True)
-
     real_t = "double" if precision == "double" else "float"
     print("Built-in type config: " + real_t + "_" + bits)
 
-    generate_global_constants(api, target_dir)
-    generate_version_header(api, target_dir)
-    generate_global_constant_binds(api, target_dir)
-    generate_builtin_bindings(api, target_dir, real_t + "_" + bits)
-    generate_engine_classes_bindings(api, target_dir, use_template_get_node)
-    generate_utility_functions(api, target_dir)
+    registry = TypeRegistry(api)
+
+    # All files are generated in memory first (path -> content), then written out at once.
+    files = {}
+
+    generate_global_constants(api, target_dir, files)
+    generate_version_header(api, target_dir, files)
+    generate_global_constant_binds(api, target_dir, files)
+    generate_builtin_bindings(registry, api, target_dir, real_t + "_" + bits, files, jobs)
+    generate_engine_classes_bindings(registry, api, target_dir, use_template_get_node, files, jobs)
+    generate_utility_functions(registry, api, target_dir, files)
+
+    if incremental:
+        write_files_incremental(files, target_dir)
+    else:
+        shutil.rmtree(target_dir, ignore_errors=True)
+        target_dir.mkdir(parents=True)
+        for path, content in files.items():
+            write_file(path, content)
+        write_manifest(files, target_dir)
+
+
+def write_file(path, content):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as file:
+        file.write(content)
+
+
+# Lists the files written by the last generation, relative to `gen`. Only those are ever removed, `gen` also holding
+# build products and files generated by the build tools.
+GENERATED_MANIFEST = ".generated_files"
+
+
+def write_manifest(files, target_dir):
+    generated = sorted(path.relative_to(target_dir).as_posix() for path in files)
+    write_file(target_dir / GENERATED_MANIFEST, "".join(name + "\n" for name in generated))
+    return generated
+
+
+def write_files_incremental(files, target_dir):
+    """
+    Only write the generated files whose content differs from what is already on disk, and remove
+    the files which were generated last time but aren't anymore. Unchanged files keep their timestamp,
+    so they don't trigger a rebuild of everything that includes them.
+    """
+    written = 0
+    for path, content in files.items():
+        digest = hashlib.sha256(content.encode("utf-8")).digest()
+        try:
+            with path.open(encoding="utf-8") as file:
+                if hashlib.sha256(file.read().encode("utf-8")).digest() == digest:
+                    continue
+        except OSError:
+            pass
+        write_file(path, content)
+        written += 1
+
+    try:
+        with (target_dir / GENERATED_MANIFEST).open(encoding="utf-8") as manifest:
+            previous = set(manifest.read().splitlines())
+    except OSError:
+        # Nothing is known to be stale.
+        previous = set()
+
+    removed = 0
+    for name in sorted(previous - set(write_manifest(files, target_dir))):
+        path = target_dir / name
+        try:
+            path.unlink()
+            removed += 1
+        except OSError:
+            continue
+        # Directories left empty by the removed files only.
+        for parent in path.parents:
+            if parent == target_dir or any(parent.iterdir()):
+                break
+            parent.rmdir()
+
+    print(f"Updated {written} and removed {removed} of {len(files)} generated files.")
 
 
 CLASS_ALIASES = {
     "ClassDB": "ClassDBSingleton",
 }
 
-builtin_classes = []
 
-# Key is class name, value is boolean where True means the class is refcounted.
-engine_classes = {}
+class TypeRegistry:
+    """
+    Indexes of the types declared by the API, used to classify type names during generation.
+    It is built once from the API JSON and passed explicitly to the generators, which keeps them free of
+    global state: running them twice in one process, or in worker processes, gives the same result.
+    """
 
-# Type names of native structures
-native_structures = []
+    def __init__(self, api):
+        # Names of the builtin classes which get generated, in API order.
+        self.builtin_classes = tuple(
+            builtin_api["name"] for builtin_api in api["builtin_classes"] if not is_pod_type(builtin_api["name"])
+        )
+        self.builtin_class_set = frozenset(self.builtin_classes)
+
+        # Type names of native structures.
+        self.native_structures = frozenset(
+            native_struct["name"] for native_struct in api["native_structures"] if native_struct["name"] != "ObjectID"
+        )
 
-singletons = []
+        # Key is class name, value is boolean where True means the class is refcounted.
+        self.engine_classes = {
+            CLASS_ALIASES.get(class_api["name"], class_api["name"]): class_api["is_refcounted"]
+            for class_api in api["classes"]
+        }
+        for struct_name in self.native_structures:
+            self.engine_classes[struct_name] = False
+
+        self.singletons = frozenset(
+            CLASS_ALIASES.get(singleton["name"], singleton["name"]) for singleton in api["singletons"]
+        )
 
+        self.correct_type_cache = {}
 
-def generate_builtin_bindings(api, output_dir, build_config):
-    global builtin_classes
+    def is_variant(self, type_name):
+        return (
+            type_name == "Variant"
+            or type_name in self.builtin_class_set
+            or type_name == "Nil"
+            or type_name.startswith("typedarray::")
+        )
 
+    def is_engine_class(self, type_name):
+        return type_name == "Object" or type_name in self.engine_classes
+
+    def is_struct_type(self, type_name):
+        # This is used to determine which keyword to use for forward declarations.
+        return is_included_struct_type(type_name) or type_name in self.native_structures
+
+    def is_refcounted(self, type_name):
+        return self.engine_classes.get(type_name, False)
+
+    def is_singleton(self, class_name):
+        return class_name in self.singletons
+
+    def is_included(self, type_name, current_type):
+        """
+        Check if a builtin type should be included.
+        This removes Variant and POD types from inclusion, and the current type.
+        """
+        if type_name.startswith("typedarray::"):
+            return True
+        to_include = get_enum_class(type_name) if is_enum(type_name) else type_name
+        if to_include == current_type or is_pod_type(to_include):
+            return False
+        if to_include == "GlobalConstants" or to_include == "UtilityFunctions":
+            return True
+        return self.is_engine_class(to_include) or self.is_variant(to_include)
+
+    def correct_type(self, type_name, meta=None, use_alias=True):
+        key = (type_name, meta, use_alias)
+        if key not in self.correct_type_cache:
+            self.correct_type_cache[key] = self.resolve_type(type_name, meta, use_alias)
+        return self.correct_type_cache[key]
+
+    def resolve_type(self, type_name, meta=None, use_alias=True):
+        type_conversion = {"float": "double", "int": "int64_t", "Nil": "Variant"}
+        if meta is not None:
+            if "int" in meta:
+                return f"{meta}_t"
+            elif "char" in meta:
+                return f"{meta}_t"
+            else:
+                return meta
+        if type_name in type_conversion:
+            return type_conversion[type_name]
+        if type_name.startswith("typedarray::"):
+            return type_name.replace("typedarray::", "TypedArray<") + ">"
+        if is_enum(type_name):
+            if is_bitfield(type_name):
+                base_class = get_enum_class(type_name)
+                if use_alias and base_class in CLASS_ALIASES:
+                    base_class = CLASS_ALIASES[base_class]
+                if base_class == "GlobalConstants":
+                    return f"BitField<{get_enum_name(type_name)}>"
+                return f"BitField<{base_class}::{get_enum_name(type_name)}>"
+            else:
+                base_class = get_enum_class(type_name)
+                if use_alias and base_class in CLASS_ALIASES:
+                    base_class = CLASS_ALIASES[base_class]
+                if base_class == "GlobalConstants":
+                    return f"{get_enum_name(type_name)}"
+                return f"{base_class}::{get_enum_name(type_name)}"
+        if self.is_refcounted(type_name):
+            return f"Ref<{type_name}>"
+        if type_name == "Object" or self.is_engine_class(type_name):
+            return f"{type_name} *"
+        if type_name.endswith("*") and not type_name.endswith("**") and not type_name.endswith(" *"):
+            return f"{type_name[:-1]} *"
+        return type_name
+
+
+def map_parallel(function, jobs, registry, *iterables):
+    """
+    Same as `list(map(partial(function, registry), *iterables))`, but spread over a pool of `jobs` worker processes.
+    Results are returned in order, so the generated output doesn't depend on the number of jobs.
+    """
+    function = partial(function, registry)
+    iterables = [list(iterable) for iterable in iterables]
+    count = min(len(iterable) for iterable in iterables)
+    if jobs <= 1 or count <= 1:
+        return list(map(function, *iterables))
+
+    jobs = min(jobs, count)
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        # Batch the classes so that each worker gets a few large chunks instead of many tiny tasks.
+        return list(executor.map(function, *iterables, chunksize=max(1, count // (jobs * 4))))
+
+
+def generate_builtin_bindings(registry, api, output_dir, build_config, files, jobs=1):
     core_gen_folder = Path(output_dir) / "include" / "godot_cpp" / "core"
     include_gen_folder = Path(output_dir) / "include" / "godot_cpp" / "variant"
     source_gen_folder = Path(output_dir) / "src" / "variant"
 
-    core_gen_folder.mkdir(parents=True, exist_ok=True)
-    include_gen_folder.mkdir(parents=True, exist_ok=True)
-    source_gen_folder.mkdir(parents=True, exist_ok=True)
-
-    generate_wrappers(core_gen_folder / "ext_wrappers.gen.inc")
-    generate_virtuals(core_gen_folder / "gdvirtual.gen.inc")
-
-    # Store types beforehand.
-    for builtin_api in api["builtin_classes"]:
-        if is_pod_type(builtin_api["name"]):
-            continue
-        builtin_classes.append(builtin_api["name"])
+    generate_wrappers(core_gen_folder / "ext_wrappers.gen.inc", files)
+    generate_virtuals(core_gen_folder / "gdvirtual.gen.inc", files)
 
     builtin_sizes = {}
 
@@ -449,139 +706,144 @@ def generate_builtin_bindings(api, output_dir, build_config):
 
     # Create a file for Variant size, since that class isn't generated.
     variant_size_filename = include_gen_folder / "variant_size.hpp"
-    with variant_size_filename.open("+w", encoding="utf-8") as variant_size_file:
-        variant_size_source = []
-        add_header("variant_size.hpp", variant_size_source)
+    variant_size_source = []
+    add_header("variant_size.hpp", variant_size_source)
 
-        header_guard = "GODOT_CPP_VARIANT_SIZE_HPP"
-        variant_size_source.append(f"#ifndef {header_guard}")
-        variant_size_source.append(f"#define {header_guard}")
-        variant_size_source.append(f'#define GODOT_CPP_VARIANT_SIZE {builtin_sizes["Variant"]}')
-        variant_size_source.append(f"#endif // ! {header_guard}")
+    header_guard = "GODOT_CPP_VARIANT_SIZE_HPP"
+    variant_size_source.append(f"#ifndef {header_guard}")
+    variant_size_source.append(f"#define {header_guard}")
+    variant_size_source.append(f'#define GODOT_CPP_VARIANT_SIZE {builtin_sizes["Variant"]}')
+    variant_size_source.append(f"#endif // ! {header_guard}")
 
-        variant_size_file.write("\n".join(variant_size_source))
+    files[variant_size_filename] = "\n".join(variant_size_source)
 
-    for builtin_api in api["builtin_classes"]:
-        if is_pod_type(builtin_api["name"]):
-            continue
-        if is_included_type(builtin_api["name"]):
-            continue
+    generated_builtins = [
+        builtin_api
+        for builtin_api in api["builtin_classes"]
+        if not is_pod_type(builtin_api["name"]) and not is_included_type(builtin_api["name"])
+    ]
+    sizes = [builtin_sizes[builtin_api["name"]] for builtin_api in generated_builtins]
 
-        size = builtin_sizes[builtin_api["name"]]
+    for builtin_api, (header, source) in zip(
+        generated_builtins, map_parallel(generate_builtin_class_files, jobs, registry, generated_builtins, sizes)
+    ):
+        snake_class_name = camel_to_snake(builtin_api["name"])
+        files[include_gen_folder / (snake_class_name + ".hpp")] = header
+        files[source_gen_folder / (snake_class_name + ".cpp")] = source
 
-        header_filename = include_gen_folder / (camel_to_snake(builtin_api["name"]) + ".hpp")
-        source_filename = source_gen_folder / (camel_to_snake(builtin_api["name"]) + ".cpp")
+    # Create a header with all builtin types for convenience.
+    builtin_header_filename = include_gen_folder / "builtin_types.hpp"
+    builtin_header = []
+    add_header("builtin_types.hpp", builtin_header)
 
-        # Check used classes for header include
-        used_classes = set()
-        fully_used_classes = set()
+    builtin_header.append("#ifndef GODOT_CPP_BUILTIN_TYPES_HPP")
+    builtin_header.append("#define GODOT_CPP_BUILTIN_TYPES_HPP")
 
-        class_name = builtin_api["name"]
+    builtin_header.append("")
 
-        if "constructors" in builtin_api:
-            for constructor in builtin_api["constructors"]:
-                if "arguments" in constructor:
-                    for argument in constructor["arguments"]:
-                        if is_included(argument["type"], class_name):
-                            if "default_value" in argument and argument["type"] != "Variant":
-                                fully_used_classes.add(argument["type"])
-                            else:
-                                used_classes.add(argument["type"])
+    for builtin in registry.builtin_classes:
+        builtin_header.append(f"#include <godot_cpp/variant/{camel_to_snake(builtin)}.hpp>")
 
-        if "methods" in builtin_api:
-            for method in builtin_api["methods"]:
-                if "arguments" in method:
-                    for argument in method["arguments"]:
-                        if is_included(argument["type"], class_name):
-                            if "default_value" in argument and argument["type"] != "Variant":
-                                fully_used_classes.add(argument["type"])
-                            else:
-                                used_classes.add(argument["type"])
-                if "return_type" in method:
-                    if is_included(method["return_type"], class_name):
-                        used_classes.add(method["return_type"])
-
-        if "members" in builtin_api:
-            for member in builtin_api["members"]:
-                if is_included(member["type"], class_name):
-                    used_classes.add(member["type"])
+    builtin_header.append("")
 
-        if "indexing_return_type" in builtin_api:
-            if is_included(builtin_api["indexing_return_type"], class_name):
-                used_classes.add(builtin_api["indexing_return_type"])
+    builtin_header.append("#endif // ! GODOT_CPP_BUILTIN_TYPES_HPP")
 
-        if "operators" in builtin_api:
-            for operator in builtin_api["operators"]:
-                if "right_type" in operator:
-                    if is_included(operator["right_type"], class_name):
-                        used_classes.add(operator["right_type"])
+    files[builtin_header_filename] = "\n".join(builtin_header)
 
-        for type_name in fully_used_classes:
-            if type_name in used_classes:
-                used_classes.remove(type_name)
+    # Create a header with bindings for builtin types.
+    builtin_binds_filename = include_gen_folder / "builtin_binds.hpp"
+    builtin_binds = []
+    add_header("builtin_binds.hpp", builtin_binds)
 
-        used_classes = list(used_classes)
-        used_classes.sort()
-        fully_used_classes = list(fully_used_classes)
-        fully_used_classes.sort()
+    builtin_binds.append("#ifndef GODOT_CPP_BUILTIN_BINDS_HPP")
+    builtin_binds.append("#define GODOT_CPP_BUILTIN_BINDS_HPP")
+    builtin_binds.append("")
+    builtin_binds.append("#include <godot_cpp/variant/builtin_types.hpp>")
+    builtin_binds.append("")
 
-        with header_filename.open("w+", encoding="utf-8") as header_file:
-            header_file.write(generate_builtin_class_header(builtin_api, size, used_classes, fully_used_classes))
+    for builtin_api in api["builtin_classes"]:
+        if is_included_type(builtin_api["name"]):
+            if "enums" in builtin_api:
+                for enum_api in builtin_api["enums"]:
+                    builtin_binds.append(f"VARIANT_ENUM_CAST({builtin_api['name']}::{enum_api['name']});")
 
-        with source_filename.open("w+", encoding="utf-8") as source_file:
-            source_file.write(generate_builtin_class_source(builtin_api, size, used_classes, fully_used_classes))
+    builtin_binds.append("")
+    builtin_binds.append("#endif // ! GODOT_CPP_BUILTIN_BINDS_HPP")
 
-    # Create a header with all builtin types for convenience.
-    builtin_header_filename = include_gen_folder / "builtin_types.hpp"
-    with builtin_header_filename.open("w+", encoding="utf-8") as builtin_header_file:
-        builtin_header = []
-        add_header("builtin_types.hpp", builtin_header)
+    files[builtin_binds_filename] = "\n".join(builtin_binds)
 
-        builtin_header.append("#ifndef GODOT_CPP_BUILTIN_TYPES_HPP")
-        builtin_header.append("#define GODOT_CPP_BUILTIN_TYPES_HPP")
+    # Create a header to implement all builtin class vararg methods and be included in "variant.hpp".
+    builtin_vararg_methods_header = include_gen_folder / "builtin_vararg_methods.hpp"
+    files[builtin_vararg_methods_header] = generate_builtin_class_vararg_method_implements_header(
+        registry, api["builtin_classes"]
+    )
 
-        builtin_header.append("")
 
-        for builtin in builtin_classes:
-            builtin_header.append(f"#include <godot_cpp/variant/{camel_to_snake(builtin)}.hpp>")
+def generate_builtin_class_files(registry, builtin_api, size):
+    """
+    Generate the header and source of a single builtin class.
+    This doesn't depend on any global state, so it can run in a worker process.
+    """
+    # Check used classes for header include
+    used_classes = set()
+    fully_used_classes = set()
 
-        builtin_header.append("")
+    class_name = builtin_api["name"]
 
-        builtin_header.append("#endif // ! GODOT_CPP_BUILTIN_TYPES_HPP")
+    if "constructors" in builtin_api:
+        for constructor in builtin_api["constructors"]:
+            if "arguments" in constructor:
+                for argument in constructor["arguments"]:
+                    if registry.is_included(argument["type"], class_name):
+                        if "default_value" in argument and argument["type"] != "Variant":
+                            fully_used_classes.add(argument["type"])
+                        else:
+                            used_classes.add(argument["type"])
 
-        builtin_header_file.write("\n".join(builtin_header))
+    if "methods" in builtin_api:
+        for method in builtin_api["methods"]:
+            if "arguments" in method:
+                for argument in method["arguments"]:
+                    if registry.is_included(argument["type"], class_name):
+                        if "default_value" in argument and argument["type"] != "Variant":
+                            fully_used_classes.add(argument["type"])
+                        else:
+                            used_classes.add(argument["type"])
+            if "return_type" in method:
+                if registry.is_included(method["return_type"], class_name):
+                    used_classes.add(method["return_type"])
 
-    # Create a header with bindings for builtin types.
-    builtin_binds_filename = include_gen_folder / "builtin_binds.hpp"
-    with builtin_binds_filename.open("w+", encoding="utf-8") as builtin_binds_file:
-        builtin_binds = []
-        add_header("builtin_binds.hpp", builtin_binds)
+    if "members" in builtin_api:
+        for member in builtin_api["members"]:
+            if registry.is_included(member["type"], class_name):
+                used_classes.add(member["type"])
 
-        builtin_binds.append("#ifndef GODOT_CPP_BUILTIN_BINDS_HPP")
-        builtin_binds.append("#define GODOT_CPP_BUILTIN_BINDS_HPP")
-        builtin_binds.append("")
-        builtin_binds.append("#include <godot_cpp/variant/builtin_types.hpp>")
-        builtin_binds.append("")
+    if "indexing_return_type" in builtin_api:
+        if registry.is_included(builtin_api["indexing_return_type"], class_name):
+            used_classes.add(builtin_api["indexing_return_type"])
 
-        for builtin_api in api["builtin_classes"]:
-            if is_included_type(builtin_api["name"]):
-                if "enums" in builtin_api:
-                    for enum_api in builtin_api["enums"]:
-                        builtin_binds.append(f"VARIANT_ENUM_CAST({builtin_api['name']}::{enum_api['name']});")
+    if "operators" in builtin_api:
+        for operator in builtin_api["operators"]:
+            if "right_type" in operator:
+                if registry.is_included(operator["right_type"], class_name):
+                    used_classes.add(operator["right_type"])
 
-        builtin_binds.append("")
-        builtin_binds.append("#endif // ! GODOT_CPP_BUILTIN_BINDS_HPP")
+    for type_name in fully_used_classes:
+        if type_name in used_classes:
+            used_classes.remove(type_name)
 
-        builtin_binds_file.write("\n".join(builtin_binds))
+    used_classes = list(used_classes)
+    used_classes.sort()
+    fully_used_classes = list(fully_used_classes)
+    fully_used_classes.sort()
 
-    # Create a header to implement all builtin class vararg methods and be included in "variant.hpp".
-    builtin_vararg_methods_header = include_gen_folder / "builtin_vararg_methods.hpp"
-    builtin_vararg_methods_header.open("w+").write(
-        generate_builtin_class_vararg_method_implements_header(api["builtin_classes"])
+    return (
+        generate_builtin_class_header(registry, builtin_api, size, used_classes, fully_used_classes),
+        generate_builtin_class_source(registry, builtin_api, size, used_classes, fully_used_classes),
     )
 
 
-def generate_builtin_class_vararg_method_implements_header(builtin_classes):
+def generate_builtin_class_vararg_method_implements_header(registry, builtin_classes):
     result = []
 
     add_header("builtin_vararg_methods.hpp", result)
@@ -599,7 +861,7 @@ def generate_builtin_class_vararg_method_implements_header(builtin_classes):
                 continue
 
             result += make_varargs_template(
-                method, "is_static" in method and method["is_static"], class_name, False, False, True
+                registry, method, "is_static" in method and method["is_static"], class_name, False, False, True
             )
             result.append("")
 
@@ -609,7 +871,7 @@ def generate_builtin_class_vararg_method_implements_header(builtin_classes):
     return "\n".join(result)
 
 
-def generate_builtin_class_header(builtin_api, size, used_classes, fully_used_classes):
+def generate_builtin_class_header(registry, builtin_api, size, used_classes, fully_used_classes):
     result = []
 
     class_name = builtin_api["name"]
@@ -657,7 +919,7 @@ def generate_builtin_class_header(builtin_api, size, used_classes, fully_used_cl
         if include == "TypedArray":
             result.append("#include <godot_cpp/variant/typed_array.hpp>")
         else:
-            result.append(f"#include <godot_cpp/{get_include_path(include)}>")
+            result.append(f"#include <godot_cpp/{get_include_path(registry, include)}>")
 
     if len(fully_used_classes) > 0:
         result.append("")
@@ -668,7 +930,7 @@ def generate_builtin_class_header(builtin_api, size, used_classes, fully_used_cl
     result.append("")
 
     for type_name in used_classes:
-        if is_struct_type(type_name):
+        if registry.is_struct_type(type_name):
             result.append(f"struct {type_name};")
         else:
             result.append(f"class {type_name};")
@@ -747,7 +1009,7 @@ def generate_builtin_class_header(builtin_api, size, used_classes, fully_used_cl
             method_signature = f"\t{class_name}("
             if "arguments" in constructor:
                 method_signature += make_function_parameters(
-                    constructor["arguments"], include_default=True, for_builtin=True
+                    registry, constructor["arguments"], include_default=True, for_builtin=True
                 )
                 if len(constructor["arguments"]) == 1 and constructor["arguments"][0]["type"] == class_name:
                     copy_constructor_index = constructor["index"]
@@ -784,7 +1046,7 @@ def generate_builtin_class_header(builtin_api, size, used_classes, fully_used_cl
                 if axis_constants_count == 3:
                     result.append("\t};")
             else:
-                result.append(f'\tstatic const {correct_type(constant["type"])} {constant["name"]};')
+                result.append(f'\tstatic const {registry.correct_type(constant["type"])} {constant["name"]};')
 
     if builtin_api["has_destructor"]:
         result.append(f"\t~{class_name}();")
@@ -804,7 +1066,7 @@ def generate_builtin_class_header(builtin_api, size, used_classes, fully_used_cl
                 method_signature += "static "
 
             if "return_type" in method:
-                method_signature += f'{correct_type(method["return_type"])}'
+                method_signature += f'{registry.correct_type(method["return_type"])}'
                 if not method_signature.endswith("*"):
                     method_signature += " "
             else:
@@ -817,7 +1079,7 @@ def generate_builtin_class_header(builtin_api, size, used_classes, fully_used_cl
                 method_arguments = method["arguments"]
 
             method_signature += make_function_parameters(
-                method_arguments, include_default=True, for_builtin=True, is_vararg=vararg
+                registry, method_arguments, include_default=True, for_builtin=True, is_vararg=vararg
             )
 
             method_signature += ")"
@@ -846,20 +1108,20 @@ def generate_builtin_class_header(builtin_api, size, used_classes, fully_used_cl
     if "members" in builtin_api:
         for member in builtin_api["members"]:
             if f'get_{member["name"]}' not in method_list:
-                result.append(f'\t{correct_type(member["type"])} get_{member["name"]}() const;')
+                result.append(f'\t{registry.correct_type(member["type"])} get_{member["name"]}() const;')
             if f'set_{member["name"]}' not in method_list:
-                result.append(f'\tvoid set_{member["name"]}({type_for_parameter(member["type"])}value);')
+                result.append(f'\tvoid set_{member["name"]}({type_for_parameter(registry, member["type"])}value);')
 
     if "operators" in builtin_api:
         for operator in builtin_api["operators"]:
             if is_valid_cpp_operator(operator["name"]):
                 if "right_type" in operator:
                     result.append(
-                        f'\t{correct_type(operator["return_type"])} operator{get_operator_cpp_name(operator["name"])}({type_for_parameter(operator["right_type"])}p_other) const;'
+                        f'\t{registry.correct_type(operator["return_type"])} operator{get_operator_cpp_name(operator["name"])}({type_for_parameter(registry, operator["right_type"])}p_other) const;'
                     )
                 else:
                     result.append(
-                        f'\t{correct_type(operator["return_type"])} operator{get_operator_cpp_name(operator["name"])}() const;'
+                        f'\t{registry.correct_type(operator["return_type"])} operator{get_operator_cpp_name(operator["name"])}() const;'
                     )
 
     # Copy assignment.
@@ -906,7 +1168,7 @@ def generate_builtin_class_header(builtin_api, size, used_classes, fully_used_cl
         result.append("\t}")
 
     if is_packed_array(class_name):
-        return_type = correct_type(builtin_api["indexing_return_type"])
+        return_type = registry.correct_type(builtin_api["indexing_return_type"])
         if class_name == "PackedByteArray":
             return_type = "uint8_t"
         elif class_name == "PackedInt32Array":
@@ -1036,7 +1298,7 @@ def generate_builtin_class_header(builtin_api, size, used_classes, fully_used_cl
     return "\n".join(result)
 
 
-def generate_builtin_class_source(builtin_api, size, used_classes, fully_used_classes):
+def generate_builtin_class_source(registry, builtin_api, size, used_classes, fully_used_classes):
     result = []
 
     class_name = builtin_api["name"]
@@ -1055,7 +1317,7 @@ def generate_builtin_class_source(builtin_api, size, used_classes, fully_used_cl
 
     # Only used since the "fully used" is included in header already.
     for include in used_classes:
-        result.append(f"#include <godot_cpp/{get_include_path(include)}>")
+        result.append(f"#include <godot_cpp/{get_include_path(registry, include)}>")
 
     if len(used_classes) > 0:
         result.append("")
@@ -1167,7 +1429,7 @@ def generate_builtin_class_source(builtin_api, size, used_classes, fully_used_cl
             method_signature = f"{class_name}::{class_name}("
             if "arguments" in constructor:
                 method_signature += make_function_parameters(
-                    constructor["arguments"], include_default=False, for_builtin=True
+                    registry, constructor["arguments"], include_default=False, for_builtin=True
                 )
             method_signature += ") {"
 
@@ -1183,6 +1445,7 @@ def generate_builtin_class_source(builtin_api, size, used_classes, fully_used_cl
                 arguments = []
                 for argument in constructor["arguments"]:
                     (encode, arg_name) = get_encoded_arg(
+                        registry,
                         argument["name"],
                         argument["type"],
                         argument["meta"] if "meta" in argument else None,
@@ -1223,7 +1486,7 @@ def generate_builtin_class_source(builtin_api, size, used_classes, fully_used_cl
                 # Done in the header because of the template.
                 continue
 
-            method_signature = make_signature(class_name, method, for_builtin=True)
+            method_signature = make_signature(registry, class_name, method, for_builtin=True)
             result.append(method_signature + " {")
 
             method_call = "\t"
@@ -1232,10 +1495,10 @@ def generate_builtin_class_source(builtin_api, size, used_classes, fully_used_cl
             if "return_type" in method:
                 return_type = method["return_type"]
                 if is_enum(return_type):
-                    method_call += f"return ({get_gdextension_type(correct_type(return_type))})internal::_call_builtin_method_ptr_ret<int64_t>("
-                elif is_pod_type(return_type) or is_variant(return_type):
-                    method_call += f"return internal::_call_builtin_method_ptr_ret<{get_gdextension_type(correct_type(return_type))}>("
-                elif is_refcounted(return_type):
+                    method_call += f"return ({get_gdextension_type(registry.correct_type(return_type))})internal::_call_builtin_method_ptr_ret<int64_t>("
+                elif is_pod_type(return_type) or registry.is_variant(return_type):
+                    method_call += f"return internal::_call_builtin_method_ptr_ret<{get_gdextension_type(registry.correct_type(return_type))}>("
+                elif registry.is_refcounted(return_type):
                     method_call += f"return Ref<{return_type}>::_gde_internal_constructor(internal::_call_builtin_method_ptr_ret_obj<{return_type}>("
                     is_ref = True
                 else:
@@ -1253,6 +1516,7 @@ def generate_builtin_class_source(builtin_api, size, used_classes, fully_used_cl
                 method_call += ", "
                 for argument in method["arguments"]:
                     (encode, arg_name) = get_encoded_arg(
+                        registry,
                         argument["name"],
                         argument["type"],
                         argument["meta"] if "meta" in argument else None,
@@ -1272,15 +1536,17 @@ def generate_builtin_class_source(builtin_api, size, used_classes, fully_used_cl
     if "members" in builtin_api:
         for member in builtin_api["members"]:
             if f'get_{member["name"]}' not in method_list:
-                result.append(f'{correct_type(member["type"])} {class_name}::get_{member["name"]}() const {{')
+                result.append(f'{registry.correct_type(member["type"])} {class_name}::get_{member["name"]}() const {{')
                 result.append(
-                    f'\treturn internal::_call_builtin_ptr_getter<{correct_type(member["type"])}>(_method_bindings.member_{member["name"]}_getter, (GDExtensionConstTypePtr)&opaque);'
+                    f'\treturn internal::_call_builtin_ptr_getter<{registry.correct_type(member["type"])}>(_method_bindings.member_{member["name"]}_getter, (GDExtensionConstTypePtr)&opaque);'
                 )
                 result.append("}")
 
             if f'set_{member["name"]}' not in method_list:
-                result.append(f'void {class_name}::set_{member["name"]}({type_for_parameter(member["type"])}value) {{')
-                (encode, arg_name) = get_encoded_arg("value", member["type"], None)
+                result.append(
+                    f'void {class_name}::set_{member["name"]}({type_for_parameter(registry, member["type"])}value) {{'
+                )
+                (encode, arg_name) = get_encoded_arg(registry, "value", member["type"], None)
                 result += encode
                 result.append(
                     f'\t_method_bindings.member_{member["name"]}_setter((GDExtensionConstTypePtr)&opaque, (GDExtensionConstTypePtr){arg_name});'
@@ -1294,20 +1560,20 @@ def generate_builtin_class_source(builtin_api, size, used_classes, fully_used_cl
             if is_valid_cpp_operator(operator["name"]):
                 if "right_type" in operator:
                     result.append(
-                        f'{correct_type(operator["return_type"])} {class_name}::operator{get_operator_cpp_name(operator["name"])}({type_for_parameter(operator["right_type"])}p_other) const {{'
+                        f'{registry.correct_type(operator["return_type"])} {class_name}::operator{get_operator_cpp_name(operator["name"])}({type_for_parameter(registry, operator["right_type"])}p_other) const {{'
                     )
-                    (encode, arg_name) = get_encoded_arg("other", operator["right_type"], None)
+                    (encode, arg_name) = get_encoded_arg(registry, "other", operator["right_type"], None)
                     result += encode
                     result.append(
-                        f'\treturn internal::_call_builtin_operator_ptr<{get_gdextension_type(correct_type(operator["return_type"]))}>(_method_bindings.operator_{get_operator_id_name(operator["name"])}_{operator["right_type"]}, (GDExtensionConstTypePtr)&opaque, (GDExtensionConstTypePtr){arg_name});'
+                        f'\treturn internal::_call_builtin_operator_ptr<{get_gdextension_type(registry.correct_type(operator["return_type"]))}>(_method_bindings.operator_{get_operator_id_name(operator["name"])}_{operator["right_type"]}, (GDExtensionConstTypePtr)&opaque, (GDExtensionConstTypePtr){arg_name});'
                     )
                     result.append("}")
                 else:
                     result.append(
-                        f'{correct_type(operator["return_type"])} {class_name}::operator{get_operator_cpp_name(operator["name"])}() const {{'
+                        f'{registry.correct_type(operator["return_type"])} {class_name}::operator{get_operator_cpp_name(operator["name"])}() const {{'
                     )
                     result.append(
-                        f'\treturn internal::_call_builtin_operator_ptr<{get_gdextension_type(correct_type(operator["return_type"]))}>(_method_bindings.operator_{get_operator_id_name(operator["name"])}, (GDExtensionConstTypePtr)&opaque, (GDExtensionConstTypePtr)nullptr);'
+                        f'\treturn internal::_call_builtin_operator_ptr<{get_gdextension_type(registry.correct_type(operator["return_type"]))}>(_method_bindings.operator_{get_operator_id_name(operator["name"])}, (GDExtensionConstTypePtr)&opaque, (GDExtensionConstTypePtr)nullptr);'
                     )
                     result.append("}")
                 result.append("")
@@ -1318,6 +1584,7 @@ def generate_builtin_class_source(builtin_api, size, used_classes, fully_used_cl
         if builtin_api["has_destructor"]:
             result.append("\t_method_bindings.destructor(&opaque);")
         (encode, arg_name) = get_encoded_arg(
+            registry,
             "other",
             class_name,
             None,
@@ -1347,151 +1614,29 @@ def generate_builtin_class_source(builtin_api, size, used_classes, fully_used_cl
     return "\n".join(result)
 
 
-def generate_engine_classes_bindings(api, output_dir, use_template_get_node):
-    global engine_classes
-    global singletons
-    global native_structures
-
+def generate_engine_classes_bindings(registry, api, output_dir, use_template_get_node, files, jobs=1):
     include_gen_folder = Path(output_dir) / "include" / "godot_cpp" / "classes"
     source_gen_folder = Path(output_dir) / "src" / "classes"
 
-    include_gen_folder.mkdir(parents=True, exist_ok=True)
-    source_gen_folder.mkdir(parents=True, exist_ok=True)
-
-    # First create map of classes and singletons.
     for class_api in api["classes"]:
         # Generate code for the ClassDB singleton under a different name.
         if class_api["name"] in CLASS_ALIASES:
             class_api["alias_for"] = class_api["name"]
             class_api["name"] = CLASS_ALIASES[class_api["alias_for"]]
-        engine_classes[class_api["name"]] = class_api["is_refcounted"]
-    for native_struct in api["native_structures"]:
-        if native_struct["name"] == "ObjectID":
-            continue
-        engine_classes[native_struct["name"]] = False
-        native_structures.append(native_struct["name"])
-
-    for singleton in api["singletons"]:
-        # Generate code for the ClassDB singleton under a different name.
-        if singleton["name"] in CLASS_ALIASES:
-            singleton["alias_for"] = singleton["name"]
-            singleton["name"] = CLASS_ALIASES[singleton["name"]]
-        singletons.append(singleton["name"])
-
-    for class_api in api["classes"]:
-        # Check used classes for header include.
-        used_classes = set()
-        fully_used_classes = set()
-
-        class_name = class_api["name"]
-
-        header_filename = include_gen_folder / (camel_to_snake(class_api["name"]) + ".hpp")
-        source_filename = source_gen_folder / (camel_to_snake(class_api["name"]) + ".cpp")
-
-        if "methods" in class_api:
-            for method in class_api["methods"]:
-                if "arguments" in method:
-                    for argument in method["arguments"]:
-                        type_name = argument["type"]
-                        if type_name.startswith("const "):
-                            type_name = type_name[6:]
-                        if type_name.endswith("*"):
-                            type_name = type_name[:-1]
-                        if is_included(type_name, class_name):
-                            if type_name.startswith("typedarray::"):
-                                fully_used_classes.add("TypedArray")
-                                array_type_name = type_name.replace("typedarray::", "")
-                                if array_type_name.startswith("const "):
-                                    array_type_name = array_type_name[6:]
-                                if array_type_name.endswith("*"):
-                                    array_type_name = array_type_name[:-1]
-                                if is_included(array_type_name, class_name):
-                                    if is_enum(array_type_name):
-                                        fully_used_classes.add(get_enum_class(array_type_name))
-                                    elif "default_value" in argument:
-                                        fully_used_classes.add(array_type_name)
-                                    else:
-                                        used_classes.add(array_type_name)
-                            elif is_enum(type_name):
-                                fully_used_classes.add(get_enum_class(type_name))
-                            elif "default_value" in argument:
-                                fully_used_classes.add(type_name)
-                            else:
-                                used_classes.add(type_name)
-                            if is_refcounted(type_name):
-                                fully_used_classes.add("Ref")
-                if "return_value" in method:
-                    type_name = method["return_value"]["type"]
-                    if type_name.startswith("const "):
-                        type_name = type_name[6:]
-                    if type_name.endswith("*"):
-                        type_name = type_name[:-1]
-                    if is_included(type_name, class_name):
-                        if type_name.startswith("typedarray::"):
-                            fully_used_classes.add("TypedArray")
-                            array_type_name = type_name.replace("typedarray::", "")
-                            if array_type_name.startswith("const "):
-                                array_type_name = array_type_name[6:]
-                            if array_type_name.endswith("*"):
-                                array_type_name = array_type_name[:-1]
-                            if is_included(array_type_name, class_name):
-                                if is_enum(array_type_name):
-                                    fully_used_classes.add(get_enum_class(array_type_name))
-                                elif is_variant(array_type_name):
-                                    fully_used_classes.add(array_type_name)
-                                else:
-                                    used_classes.add(array_type_name)
-                        elif is_enum(type_name):
-                            fully_used_classes.add(get_enum_class(type_name))
-                        elif is_variant(type_name):
-                            fully_used_classes.add(type_name)
-                        else:
-                            used_classes.add(type_name)
-                        if is_refcounted(type_name):
-                            fully_used_classes.add("Ref")
-
-        if "members" in class_api:
-            for member in class_api["members"]:
-                if is_included(member["type"], class_name):
-                    if is_enum(member["type"]):
-                        fully_used_classes.add(get_enum_class(member["type"]))
-                    else:
-                        used_classes.add(member["type"])
-                    if is_refcounted(member["type"]):
-                        fully_used_classes.add("Ref")
 
-        if "inherits" in class_api:
-            if is_included(class_api["inherits"], class_name):
-                fully_used_classes.add(class_api["inherits"])
-            if is_refcounted(class_api["name"]):
-                fully_used_classes.add("Ref")
-        else:
-            fully_used_classes.add("Wrapped")
-
-        # In order to ensure that PtrToArg specializations for native structs are
-        # always used, let's move any of them into 'fully_used_classes'.
-        for type_name in used_classes:
-            if is_struct_type(type_name) and not is_included_struct_type(type_name):
-                fully_used_classes.add(type_name)
-
-        for type_name in fully_used_classes:
-            if type_name in used_classes:
-                used_classes.remove(type_name)
-
-        used_classes = list(used_classes)
-        used_classes.sort()
-        fully_used_classes = list(fully_used_classes)
-        fully_used_classes.sort()
-
-        with header_filename.open("w+", encoding="utf-8") as header_file:
-            header_file.write(
-                generate_engine_class_header(class_api, used_classes, fully_used_classes, use_template_get_node)
-            )
-
-        with source_filename.open("w+", encoding="utf-8") as source_file:
-            source_file.write(
-                generate_engine_class_source(class_api, used_classes, fully_used_classes, use_template_get_node)
-            )
+    for class_api, (header, source) in zip(
+        api["classes"],
+        map_parallel(
+            generate_engine_class_files,
+            jobs,
+            registry,
+            api["classes"],
+            [use_template_get_node] * len(api["classes"]),
+        ),
+    ):
+        snake_class_name = camel_to_snake(class_api["name"])
+        files[include_gen_folder / (snake_class_name + ".hpp")] = header
+        files[source_gen_folder / (snake_class_name + ".cpp")] = source
 
     for native_struct in api["native_structures"]:
         struct_name = native_struct["name"]
@@ -1519,7 +1664,7 @@ def generate_engine_classes_bindings(api, output_dir, use_template_get_node):
         result.append("")
 
         for included in used_classes:
-            result.append(f"#include <godot_cpp/{get_include_path(included)}>")
+            result.append(f"#include <godot_cpp/{get_include_path(registry, included)}>")
 
         if len(used_classes) == 0:
             result.append("#include <godot_cpp/core/method_ptrcall.hpp>")
@@ -1541,17 +1686,127 @@ def generate_engine_classes_bindings(api, output_dir, use_template_get_node):
         result.append("")
         result.append(f"#endif // ! {header_guard}")
 
-        with header_filename.open("w+", encoding="utf-8") as header_file:
-            header_file.write("\n".join(result))
+        files[header_filename] = "\n".join(result)
+
+
+def generate_engine_class_files(registry, class_api, use_template_get_node):
+    """
+    Generate the header and source of a single engine class.
+    This doesn't depend on any global state, so it can run in a worker process.
+    """
+    # Check used classes for header include.
+    used_classes = set()
+    fully_used_classes = set()
+
+    class_name = class_api["name"]
 
+    if "methods" in class_api:
+        for method in class_api["methods"]:
+            if "arguments" in method:
+                for argument in method["arguments"]:
+                    type_name = argument["type"]
+                    if type_name.startswith("const "):
+                        type_name = type_name[6:]
+                    if type_name.endswith("*"):
+                        type_name = type_name[:-1]
+                    if registry.is_included(type_name, class_name):
+                        if type_name.startswith("typedarray::"):
+                            fully_used_classes.add("TypedArray")
+                            array_type_name = type_name.replace("typedarray::", "")
+                            if array_type_name.startswith("const "):
+                                array_type_name = array_type_name[6:]
+                            if array_type_name.endswith("*"):
+                                array_type_name = array_type_name[:-1]
+                            if registry.is_included(array_type_name, class_name):
+                                if is_enum(array_type_name):
+                                    fully_used_classes.add(get_enum_class(array_type_name))
+                                elif "default_value" in argument:
+                                    fully_used_classes.add(array_type_name)
+                                else:
+                                    used_classes.add(array_type_name)
+                        elif is_enum(type_name):
+                            fully_used_classes.add(get_enum_class(type_name))
+                        elif "default_value" in argument:
+                            fully_used_classes.add(type_name)
+                        else:
+                            used_classes.add(type_name)
+                        if registry.is_refcounted(type_name):
+                            fully_used_classes.add("Ref")
+            if "return_value" in method:
+                type_name = method["return_value"]["type"]
+                if type_name.startswith("const "):
+                    type_name = type_name[6:]
+                if type_name.endswith("*"):
+                    type_name = type_name[:-1]
+                if registry.is_included(type_name, class_name):
+                    if type_name.startswith("typedarray::"):
+                        fully_used_classes.add("TypedArray")
+                        array_type_name = type_name.replace("typedarray::", "")
+                        if array_type_name.startswith("const "):
+                            array_type_name = array_type_name[6:]
+                        if array_type_name.endswith("*"):
+                            array_type_name = array_type_name[:-1]
+                        if registry.is_included(array_type_name, class_name):
+                            if is_enum(array_type_name):
+                                fully_used_classes.add(get_enum_class(array_type_name))
+                            elif registry.is_variant(array_type_name):
+                                fully_used_classes.add(array_type_name)
+                            else:
+                                used_classes.add(array_type_name)
+                    elif is_enum(type_name):
+                        fully_used_classes.add(get_enum_class(type_name))
+                    elif registry.is_variant(type_name):
+                        fully_used_classes.add(type_name)
+                    else:
+                        used_classes.add(type_name)
+                    if registry.is_refcounted(type_name):
+                        fully_used_classes.add("Ref")
 
-def generate_engine_class_header(class_api, used_classes, fully_used_classes, use_template_get_node):
-    global singletons
+    if "members" in class_api:
+        for member in class_api["members"]:
+            if registry.is_included(member["type"], class_name):
+                if is_enum(member["type"]):
+                    fully_used_classes.add(get_enum_class(member["type"]))
+                else:
+                    used_classes.add(member["type"])
+                if registry.is_refcounted(member["type"]):
+                    fully_used_classes.add("Ref")
+
+    if "inherits" in class_api:
+        if registry.is_included(class_api["inherits"], class_name):
+            fully_used_classes.add(class_api["inherits"])
+        if registry.is_refcounted(class_api["name"]):
+            fully_used_classes.add("Ref")
+    else:
+        fully_used_classes.add("Wrapped")
+
+    # In order to ensure that PtrToArg specializations for native structs are
+    # always used, let's move any of them into 'fully_used_classes'.
+    for type_name in used_classes:
+        if registry.is_struct_type(type_name) and not is_included_struct_type(type_name):
+            fully_used_classes.add(type_name)
+
+    for type_name in fully_used_classes:
+        if type_name in used_classes:
+            used_classes.remove(type_name)
+
+    used_classes = list(used_classes)
+    used_classes.sort()
+    fully_used_classes = list(fully_used_classes)
+    fully_used_classes.sort()
+
+    return (
+        generate_engine_class_header(registry, class_api, used_classes, fully_used_classes, use_template_get_node),
+        generate_engine_class_source(registry, class_api, used_classes, fully_used_classes, use_template_get_node),
+    )
+
+
+def generate_engine_class_header(registry, class_api, used_classes, fully_used_classes, use_template_get_node):
     result = []
 
     class_name = class_api["name"]
     snake_class_name = camel_to_snake(class_name).upper()
-    is_singleton = class_name in singletons
+    is_singleton = registry.is_singleton(class_name)
 
     add_header(f"{snake_class_name.lower()}.hpp", result)
 
@@ -1566,7 +1821,7 @@ def generate_engine_class_header(class_api, used_classes, fully_used_classes, us
         if included == "TypedArray":
             result.append("#include <godot_cpp/variant/typed_array.hpp>")
         else:
-            result.append(f"#include <godot_cpp/{get_include_path(included)}>")
+            result.append(f"#include <godot_cpp/{get_include_path(registry, included)}>")
 
     if class_name == "EditorPlugin":
         result.append("#include <godot_cpp/classes/editor_plugin_registration.hpp>")
@@ -1588,7 +1843,7 @@ def generate_engine_class_header(class_api, used_classes, fully_used_classes, us
     result.append("")
 
     for type_name in used_classes:
-        if is_struct_type(type_name):
+        if registry.is_struct_type(type_name):
             result.append(f"struct {type_name};")
         else:
             result.append(f"class {type_name};")
@@ -1645,13 +1900,13 @@ def generate_engine_class_header(class_api, used_classes, fully_used_classes, us
 
             method_signature = "\t"
             method_signature += make_signature(
-                class_name, method, for_header=True, use_template_get_node=use_template_get_node
+                registry, class_name, method, for_header=True, use_template_get_node=use_template_get_node
             )
             result.append(method_signature + ";")
 
             if vararg:
                 # Add templated version.
-                result += make_varargs_template(method)
+                result += make_varargs_template(registry, method)
 
         # Virtuals now.
         for method in class_api["methods"]:
@@ -1660,7 +1915,7 @@ def generate_engine_class_header(class_api, used_classes, fully_used_classes, us
 
             method_signature = "\t"
             method_signature += make_signature(
-                class_name, method, for_header=True, use_template_get_node=use_template_get_node
+                registry, class_name, method, for_header=True, use_template_get_node=use_template_get_node
             )
             result.append(method_signature + ";")
 
@@ -1779,9 +2034,11 @@ def generate_engine_class_header(class_api, used_classes, fully_used_classes, us
 
             return_type = None
             if "return_type" in method:
-                return_type = correct_type(method["return_type"].replace("ClassDBSingleton", "ClassDB"), None, False)
+                return_type = registry.correct_type(
+                    method["return_type"].replace("ClassDBSingleton", "ClassDB"), None, False
+                )
             elif "return_value" in method:
-                return_type = correct_type(
+                return_type = registry.correct_type(
                     method["return_value"]["type"].replace("ClassDBSingleton", "ClassDB"),
                     method["return_value"].get("meta", None),
                     False,
@@ -1800,7 +2057,7 @@ def generate_engine_class_header(class_api, used_classes, fully_used_classes, us
                 method_arguments = method["arguments"]
 
             method_signature += make_function_parameters(
-                method_arguments, include_default=True, for_builtin=True, is_vararg=vararg
+                registry, method_arguments, include_default=True, for_builtin=True, is_vararg=vararg
             )
 
             method_signature += ") { \\"
@@ -1840,13 +2097,12 @@ def generate_engine_class_header(class_api, used_classes, fully_used_classes, us
     return "\n".join(result)
 
 
-def generate_engine_class_source(class_api, used_classes, fully_used_classes, use_template_get_node):
-    global singletons
+def generate_engine_class_source(registry, class_api, used_classes, fully_used_classes, use_template_get_node):
     result = []
 
     class_name = class_api["name"]
     snake_class_name = camel_to_snake(class_name)
-    is_singleton = class_name in singletons
+    is_singleton = registry.is_singleton(class_name)
 
     add_header(f"{snake_class_name}.cpp", result)
 
@@ -1858,7 +2114,7 @@ def generate_engine_class_source(class_api, used_classes, fully_used_classes, us
     result.append("")
 
     for included in used_classes:
-        result.append(f"#include <godot_cpp/{get_include_path(included)}>")
+        result.append(f"#include <godot_cpp/{get_include_path(registry, included)}>")
 
     if len(used_classes) > 0:
         result.append("")
@@ -1909,7 +2165,7 @@ def generate_engine_class_source(class_api, used_classes, fully_used_classes, us
             vararg = "is_vararg" in method and method["is_vararg"]
 
             # Method signature.
-            method_signature = make_signature(class_name, method, use_template_get_node=use_template_get_node)
+            method_signature = make_signature(registry, class_name, method, use_template_get_node=use_template_get_node)
             result.append(method_signature + " {")
 
             # Method body.
@@ -1921,7 +2177,7 @@ def generate_engine_class_source(class_api, used_classes, fully_used_classes, us
 
             if has_return:
                 result.append(
-                    f'\tCHECK_METHOD_BIND_RET(_gde_method_bind, {get_default_value_for_type(method["return_value"]["type"])});'
+                    f'\tCHECK_METHOD_BIND_RET(_gde_method_bind, {get_default_value_for_type(registry, method["return_value"]["type"])});'
                 )
             else:
                 result.append("\tCHECK_METHOD_BIND(_gde_method_bind);")
@@ -1933,15 +2189,15 @@ def generate_engine_class_source(class_api, used_classes, fully_used_classes, us
                     meta_type = method["return_value"]["meta"] if "meta" in method["return_value"] else None
                     if is_enum(return_type):
                         if method["is_static"]:
-                            method_call += f"return ({get_gdextension_type(correct_type(return_type, meta_type))})internal::_call_native_mb_ret<int64_t>(_gde_method_bind, nullptr"
+                            method_call += f"return ({get_gdextension_type(registry.correct_type(return_type, meta_type))})internal::_call_native_mb_ret<int64_t>(_gde_method_bind, nullptr"
                         else:
-                            method_call += f"return ({get_gdextension_type(correct_type(return_type, meta_type))})internal::_call_native_mb_ret<int64_t>(_gde_method_bind, _owner"
-                    elif is_pod_type(return_type) or is_variant(return_type):
+                            method_call += f"return ({get_gdextension_type(registry.correct_type(return_type, meta_type))})internal::_call_native_mb_ret<int64_t>(_gde_method_bind, _owner"
+                    elif is_pod_type(return_type) or registry.is_variant(return_type):
                         if method["is_static"]:
-                            method_call += f"return internal::_call_native_mb_ret<{get_gdextension_type(correct_type(return_type, meta_type))}>(_gde_method_bind, nullptr"
+                            method_call += f"return internal::_call_native_mb_ret<{get_gdextension_type(registry.correct_type(return_type, meta_type))}>(_gde_method_bind, nullptr"
                         else:
-                            method_call += f"return internal::_call_native_mb_ret<{get_gdextension_type(correct_type(return_type, meta_type))}>(_gde_method_bind, _owner"
-                    elif is_refcounted(return_type):
+                            method_call += f"return internal::_call_native_mb_ret<{get_gdextension_type(registry.correct_type(return_type, meta_type))}>(_gde_method_bind, _owner"
+                    elif registry.is_refcounted(return_type):
                         if method["is_static"]:
                             method_call += f"return Ref<{return_type}>::_gde_internal_constructor(internal::_call_native_mb_ret_obj<{return_type}>(_gde_method_bind, nullptr"
                         else:
@@ -1967,6 +2223,7 @@ def generate_engine_class_source(class_api, used_classes, fully_used_classes, us
                     arguments = []
                     for argument in method["arguments"]:
                         (encode, arg_name) = get_encoded_arg(
+                            registry,
                             argument["name"],
                             argument["type"],
                             argument["meta"] if "meta" in argument else None,
@@ -1999,11 +2256,11 @@ def generate_engine_class_source(class_api, used_classes, fully_used_classes, us
             if not method["is_virtual"]:
                 continue
 
-            method_signature = make_signature(class_name, method, use_template_get_node=use_template_get_node)
+            method_signature = make_signature(registry, class_name, method, use_template_get_node=use_template_get_node)
             method_signature += " {"
-            if "return_value" in method and correct_type(method["return_value"]["type"]) != "void":
+            if "return_value" in method and registry.correct_type(method["return_value"]["type"]) != "void":
                 result.append(method_signature)
-                result.append(f'\treturn {get_default_value_for_type(method["return_value"]["type"])};')
+                result.append(f'\treturn {get_default_value_for_type(registry, method["return_value"]["type"])};')
                 result.append("}")
             else:
                 method_signature += "}"
@@ -2016,12 +2273,8 @@ def generate_engine_class_source(class_api, used_classes, fully_used_classes, us
     return "\n".join(result)
 
 
-def generate_global_constants(api, output_dir):
+def generate_global_constants(api, output_dir, files):
     include_gen_folder = Path(output_dir) / "include" / "godot_cpp" / "classes"
-    source_gen_folder = Path(output_dir) / "src" / "classes"
-
-    include_gen_folder.mkdir(parents=True, exist_ok=True)
-    source_gen_folder.mkdir(parents=True, exist_ok=True)
 
     # Generate header
 
@@ -2063,17 +2316,15 @@ def generate_global_constants(api, output_dir):
     header.append("")
     header.append(f"#endif // ! {header_guard}")
 
-    with header_filename.open("w+", encoding="utf-8") as header_file:
-        header_file.write("\n".join(header))
+    files[header_filename] = "\n".join(header)
 
 
-def generate_version_header(api, output_dir):
+def generate_version_header(api, output_dir, files):
     header = []
     header_filename = "version.hpp"
     add_header(header_filename, header)
 
     include_gen_folder = Path(output_dir) / "include" / "godot_cpp" / "core"
-    include_gen_folder.mkdir(parents=True, exist_ok=True)
 
     header_file_path = include_gen_folder / header_filename
 
@@ -2092,16 +2343,11 @@ def generate_version_header(api, output_dir):
     header.append(f"#endif // {header_guard}")
     header.append("")
 
-    with header_file_path.open("w+", encoding="utf-8") as header_file:
-        header_file.write("\n".join(header))
+    files[header_file_path] = "\n".join(header)
 
 
-def generate_global_constant_binds(api, output_dir):
+def generate_global_constant_binds(api, output_dir, files):
     include_gen_folder = Path(output_dir) / "include" / "godot_cpp" / "classes"
-    source_gen_folder = Path(output_dir) / "src" / "classes"
-
-    include_gen_folder.mkdir(parents=True, exist_ok=True)
-    source_gen_folder.mkdir(parents=True, exist_ok=True)
 
     # Generate header
 
@@ -2133,17 +2379,13 @@ def generate_global_constant_binds(api, output_dir):
 
     header.append(f"#endif // ! {header_guard}")
 
-    with header_filename.open("w+", encoding="utf-8") as header_file:
-        header_file.write("\n".join(header))
+    files[header_filename] = "\n".join(header)
 
 
-def generate_utility_functions(api, output_dir):
+def generate_utility_functions(registry, api, output_dir, files):
     include_gen_folder = Path(output_dir) / "include" / "godot_cpp" / "variant"
     source_gen_folder = Path(output_dir) / "src" / "variant"
 
-    include_gen_folder.mkdir(parents=True, exist_ok=True)
-    source_gen_folder.mkdir(parents=True, exist_ok=True)
-
     # Generate header.
 
     header = []
@@ -2169,12 +2411,12 @@ def generate_utility_functions(api, output_dir):
         vararg = "is_vararg" in function and function["is_vararg"]
 
         function_signature = "\t"
-        function_signature += make_signature("UtilityFunctions", function, for_header=True, static=True)
+        function_signature += make_signature(registry, "UtilityFunctions", function, for_header=True, static=True)
         header.append(function_signature + ";")
 
         if vararg:
             # Add templated version.
-            header += make_varargs_template(function, static=True)
+            header += make_varargs_template(registry, function, static=True)
 
     header.append("};")
     header.append("")
@@ -2182,8 +2424,7 @@ def generate_utility_functions(api, output_dir):
     header.append("")
     header.append(f"#endif // ! {header_guard}")
 
-    with header_filename.open("w+", encoding="utf-8") as header_file:
-        header_file.write("\n".join(header))
+    files[header_filename] = "\n".join(header)
 
     # Generate source.
 
@@ -2202,7 +2443,7 @@ def generate_utility_functions(api, output_dir):
     for function in api["utility_functions"]:
         vararg = "is_vararg" in function and function["is_vararg"]
 
-        function_signature = make_signature("UtilityFunctions", function)
+        function_signature = make_signature(registry, "UtilityFunctions", function)
         source.append(function_signature + " {")
 
         # Function body.
@@ -2213,7 +2454,7 @@ def generate_utility_functions(api, output_dir):
         has_return = "return_type" in function and function["return_type"] != "void"
         if has_return:
             source.append(
-                f'\tCHECK_METHOD_BIND_RET(_gde_function, {get_default_value_for_type(function["return_type"])});'
+                f'\tCHECK_METHOD_BIND_RET(_gde_function, {get_default_value_for_type(registry, function["return_type"])});'
             )
         else:
             source.append("\tCHECK_METHOD_BIND(_gde_function);")
@@ -2225,7 +2466,7 @@ def generate_utility_functions(api, output_dir):
                 if function["return_type"] == "Object":
                     function_call += "internal::_call_utility_ret_obj(_gde_function"
                 else:
-                    function_call += f'internal::_call_utility_ret<{get_gdextension_type(correct_type(function["return_type"]))}>(_gde_function'
+                    function_call += f'internal::_call_utility_ret<{get_gdextension_type(registry.correct_type(function["return_type"]))}>(_gde_function'
             else:
                 function_call += "internal::_call_utility_no_ret(_gde_function"
 
@@ -2234,6 +2475,7 @@ def generate_utility_functions(api, output_dir):
                 arguments = []
                 for argument in function["arguments"]:
                     (encode, arg_name) = get_encoded_arg(
+                        registry,
                         argument["name"],
                         argument["type"],
                         argument["meta"] if "meta" in argument else None,
@@ -2243,7 +2485,7 @@ def generate_utility_functions(api, output_dir):
                 function_call += ", ".join(arguments)
         else:
             if has_return:
-                source.append(f'\t{get_gdextension_type(correct_type(function["return_type"]))} ret;')
+                source.append(f'\t{get_gdextension_type(registry.correct_type(function["return_type"]))} ret;')
             else:
                 source.append("\tVariant ret;")
             function_call += "_gde_function(&ret, reinterpret_cast<GDExtensionConstVariantPtr *>(p_args), p_arg_count"
@@ -2259,24 +2501,24 @@ def generate_utility_functions(api, output_dir):
 
     source.append("} // namespace godot")
 
-    with source_filename.open("w+", encoding="utf-8") as source_file:
-        source_file.write("\n".join(source))
+    files[source_filename] = "\n".join(source)
 
 
 # Helper functions.
 
 
+@lru_cache(maxsize=None)
 def camel_to_snake(name):
     name = re.sub("(.)([A-Z][a-z]+)", r"\1_\2", name)
     name = re.sub("([a-z0-9])([A-Z])", r"\1_\2", name)
     return name.replace("2_D", "2D").replace("3_D", "3D").lower()
 
 
-def make_function_parameters(parameters, include_default=False, for_builtin=False, is_vararg=False):
+def make_function_parameters(registry, parameters, include_default=False, for_builtin=False, is_vararg=False):
     signature = []
 
     for index, par in enumerate(parameters):
-        parameter = type_for_parameter(par["type"], par["meta"] if "meta" in par else None)
+        parameter = type_for_parameter(registry, par["type"], par["meta"] if "meta" in par else None)
         parameter_name = escape_argument(par["name"])
         if len(parameter_name) == 0:
             parameter_name = "p_arg_" + str(index + 1)
@@ -2285,7 +2527,7 @@ def make_function_parameters(parameters, include_default=False, for_builtin=Fals
         if include_default and "default_value" in par and (not for_builtin or par["type"] != "Variant"):
             parameter += " = "
             if is_enum(par["type"]):
-                parameter_type = correct_type(par["type"])
+                parameter_type = registry.correct_type(par["type"])
                 if parameter_type == "void":
                     parameter_type = "Variant"
                 parameter += f"({parameter_type})"
@@ -2298,22 +2540,22 @@ def make_function_parameters(parameters, include_default=False, for_builtin=Fals
     return ", ".join(signature)
 
 
-def type_for_parameter(type_name, meta=None):
+def type_for_parameter(registry, type_name, meta=None):
     if type_name == "void":
         return "Variant "
     elif is_pod_type(type_name) and type_name != "Nil" or is_enum(type_name):
-        return f"{correct_type(type_name, meta)} "
-    elif is_variant(type_name) or is_refcounted(type_name):
-        return f"const {correct_type(type_name)} &"
+        return f"{registry.correct_type(type_name, meta)} "
+    elif registry.is_variant(type_name) or registry.is_refcounted(type_name):
+        return f"const {registry.correct_type(type_name)} &"
     else:
-        return f"{correct_type(type_name)}"
+        return f"{registry.correct_type(type_name)}"
 
 
-def get_include_path(type_name):
+def get_include_path(registry, type_name):
     base_dir = ""
     if type_name == "Object":
         base_dir = "core"
-    elif is_variant(type_name):
+    elif registry.is_variant(type_name):
         base_dir = "variant"
     else:
         base_dir = "classes"
@@ -2321,16 +2563,16 @@ def get_include_path(type_name):
     return f"{base_dir}/{camel_to_snake(type_name)}.hpp"
 
 
-def get_encoded_arg(arg_name, type_name, type_meta):
+def get_encoded_arg(registry, arg_name, type_name, type_meta):
     result = []
 
     name = escape_argument(arg_name)
-    arg_type = correct_type(type_name)
+    arg_type = registry.correct_type(type_name)
     if is_pod_type(arg_type):
         result.append(f"\t{get_gdextension_type(arg_type)} {name}_encoded;")
-        result.append(f"\tPtrToArg<{correct_type(type_name)}>::encode({name}, &{name}_encoded);")
+        result.append(f"\tPtrToArg<{registry.correct_type(type_name)}>::encode({name}, &{name}_encoded);")
         name = f"&{name}_encoded"
-    elif is_engine_class(type_name):
+    elif registry.is_engine_class(type_name):
         # `{name}` is a C++ wrapper, it contains a field which is the object's pointer Godot expects.
         # We have to check `nullptr` because when the caller sends `nullptr`, the wrapper itself will be null.
         name = f"({name} != nullptr ? &{name}->_owner : nullptr)"
@@ -2341,7 +2583,7 @@ def get_encoded_arg(arg_name, type_name, type_meta):
 
 
 def make_signature(
-    class_name, function_data, for_header=False, use_template_get_node=True, for_builtin=False, static=False
+    registry, class_name, function_data, for_header=False, use_template_get_node=True, for_builtin=False, static=False
 ):
     function_signature = ""
 
@@ -2360,12 +2602,12 @@ def make_signature(
     return_type = "void"
     return_meta = None
     if "return_type" in function_data:
-        return_type = correct_type(function_data["return_type"])
+        return_type = registry.correct_type(function_data["return_type"])
     elif "return_value" in function_data:
         return_type = function_data["return_value"]["type"]
         return_meta = function_data["return_value"]["meta"] if "meta" in function_data["return_value"] else None
 
-    function_signature += correct_type(
+    function_signature += registry.correct_type(
         return_type,
         return_meta,
     )
@@ -2388,7 +2630,7 @@ def make_signature(
     arguments = function_data["arguments"] if "arguments" in function_data else []
 
     if not is_vararg:
-        function_signature += make_function_parameters(arguments, for_header, for_builtin, is_vararg)
+        function_signature += make_function_parameters(registry, arguments, for_header, for_builtin, is_vararg)
     else:
         function_signature += "const Variant **p_args, GDExtensionInt p_arg_count"
 
@@ -2403,6 +2645,7 @@ def make_signature(
 
 
 def make_varargs_template(
+    registry,
     function_data,
     static=False,
     class_befor_signature="",
@@ -2425,12 +2668,12 @@ def make_varargs_template(
     return_type = "void"
     return_meta = None
     if "return_type" in function_data:
-        return_type = correct_type(function_data["return_type"])
+        return_type = registry.correct_type(function_data["return_type"])
     elif "return_value" in function_data:
         return_type = function_data["return_value"]["type"]
         return_meta = function_data["return_value"]["meta"] if "meta" in function_data["return_value"] else None
 
-    function_signature += correct_type(
+    function_signature += registry.correct_type(
         return_type,
         return_meta,
     )
@@ -2450,7 +2693,9 @@ def make_varargs_template(
 
     is_vararg = "is_vararg" in function_data and function_data["is_vararg"]
 
-    function_signature += make_function_parameters(method_arguments, include_default=True, is_vararg=is_vararg)
+    function_signature += make_function_parameters(
+        registry, method_arguments, include_default=True, is_vararg=is_vararg
+    )
 
     function_signature += ")"
 
@@ -2491,7 +2736,7 @@ def make_varargs_template(
         ret = "nullptr"
         if return_type != "void":
             ret = "&ret"
-            result.append(f'\t{correct_type(function_data["return_type"])} ret;')
+            result.append(f'\t{registry.correct_type(function_data["return_type"])} ret;')
 
         function_name = function_data["name"]
         result.append(
@@ -2513,11 +2758,8 @@ def make_varargs_template(
 # Engine idiosyncrasies.
 
 
-def is_pod_type(type_name):
-    """
-    Those are types for which no class should be generated.
-    """
-    return type_name in [
+POD_TYPES = frozenset(
+    [
         "Nil",
         "void",
         "bool",
@@ -2534,16 +2776,23 @@ def is_pod_type(type_name):
         "uint32_t",
         "uint64_t",
     ]
+)
+
+
+def is_pod_type(type_name):
+    """
+    Those are types for which no class should be generated.
+    """
+    return type_name in POD_TYPES
 
 
 def is_included_type(type_name):
     # Types which we already have implemented.
-    return is_included_struct_type(type_name) or type_name in ["ObjectID"]
+    return type_name == "ObjectID" or is_included_struct_type(type_name)
 
 
-def is_included_struct_type(type_name):
-    # Struct types which we already have implemented.
-    return type_name in [
+INCLUDED_STRUCT_TYPES = frozenset(
+    [
         "AABB",
         "Basis",
         "Color",
@@ -2561,13 +2810,16 @@ def is_included_struct_type(type_name):
         "Vector4",
         "Vector4i",
     ]
+)
 
 
-def is_packed_array(type_name):
-    """
-    Those are types for which we add our extra packed array functions.
-    """
-    return type_name in [
+def is_included_struct_type(type_name):
+    # Struct types which we already have implemented.
+    return type_name in INCLUDED_STRUCT_TYPES
+
+
+PACKED_ARRAY_TYPES = frozenset(
+    [
         "PackedByteArray",
         "PackedColorArray",
         "PackedFloat32Array",
@@ -2579,6 +2831,14 @@ def is_packed_array(type_name):
         "PackedVector3Array",
         "PackedVector4Array",
     ]
+)
+
+
+def is_packed_array(type_name):
+    """
+    Those are types for which we add our extra packed array functions.
+    """
+    return type_name in PACKED_ARRAY_TYPES
 
 
 def needs_copy_instead_of_move(type_name):
@@ -2598,6 +2858,7 @@ def is_bitfield(type_name):
     return type_name.startswith("bitfield::")
 
 
+@lru_cache(maxsize=None)
 def get_enum_class(enum_name: str):
     if "." in enum_name:
         if is_bitfield(enum_name):
@@ -2622,37 +2883,13 @@ def get_enum_name(enum_name: str):
         return enum_name.replace("enum::", "").split(".")[-1]
 
 
-def is_variant(type_name):
-    return (
-        type_name == "Variant"
-        or type_name in builtin_classes
-        or type_name == "Nil"
-        or type_name.startswith("typedarray::")
-    )
-
-
-def is_engine_class(type_name):
-    global engine_classes
-    return type_name == "Object" or type_name in engine_classes
-
-
-def is_struct_type(type_name):
-    # This is used to determine which keyword to use for forward declarations.
-    global native_structures
-    return is_included_struct_type(type_name) or type_name in native_structures
-
-
-def is_refcounted(type_name):
-    return type_name in engine_classes and engine_classes[type_name]
-
-
 def is_class_included(class_name, build_profile):
     """
     Check if an engine class should be included.
     This removes classes according to a build profile of enabled or disabled classes.
     """
-    included = build_profile.get("enabled_classes", [])
-    excluded = build_profile.get("disabled_classes", [])
+    included = build_profile.get("enabled_classes", {})
+    excluded = build_profile.get("disabled_classes", {})
     if included:
         return class_name in included
     if excluded:
@@ -2660,21 +2897,6 @@ def is_class_included(class_name, build_profile):
     return True
 
 
-def is_included(type_name, current_type):
-    """
-    Check if a builtin type should be included.
-    This removes Variant and POD types from inclusion, and the current type.
-    """
-    if type_name.startswith("typedarray::"):
-        return True
-    to_include = get_enum_class(type_name) if is_enum(type_name) else type_name
-    if to_include == current_type or is_pod_type(to_include):
-        return False
-    if to_include == "GlobalConstants" or to_include == "UtilityFunctions":
-        return True
-    return is_engine_class(to_include) or is_variant(to_include)
-
-
 def correct_default_value(value, type_name):
     value_map = {
         "null": "nullptr",
@@ -2705,43 +2927,6 @@ def correct_typed_array(type_name):
     return type_name
 
 
-def correct_type(type_name, meta=None, use_alias=True):
-    type_conversion = {"float": "double", "int": "int64_t", "Nil": "Variant"}
-    if meta is not None:
-        if "int" in meta:
-            return f"{meta}_t"
-        elif "char" in meta:
-            return f"{meta}_t"
-        else:
-            return meta
-    if type_name in type_conversion:
-        return type_conversion[type_name]
-    if type_name.startswith("typedarray::"):
-        return type_name.replace("typedarray::", "TypedArray<") + ">"
-    if is_enum(type_name):
-        if is_bitfield(type_name):
-            base_class = get_enum_class(type_name)
-            if use_alias and base_class in CLASS_ALIASES:
-                base_class = CLASS_ALIASES[base_class]
-            if base_class == "GlobalConstants":
-                return f"BitField<{get_enum_name(type_name)}>"
-            return f"BitField<{base_class}::{get_enum_name(type_name)}>"
-        else:
-            base_class = get_enum_class(type_name)
-            if use_alias and base_class in CLASS_ALIASES:
-                base_class = CLASS_ALIASES[base_class]
-            if base_class == "GlobalConstants":
-                return f"{get_enum_name(type_name)}"
-            return f"{base_class}::{get_enum_name(type_name)}"
-    if is_refcounted(type_name):
-        return f"Ref<{type_name}>"
-    if type_name == "Object" or is_engine_class(type_name):
-        return f"{type_name} *"
-    if type_name.endswith("*") and not type_name.endswith("**") and not type_name.endswith(" *"):
-        return f"{type_name[:-1]} *"
-    return type_name
-
-
 def get_gdextension_type(type_name):
     type_conversion_map = {
         "bool": "int8_t",
@@ -2855,7 +3040,7 @@ def is_valid_cpp_operator(op):
     return op not in ["**", "xor", "in"]
 
 
-def get_default_value_for_type(type_name):
+def get_default_value_for_type(registry, type_name):
     if type_name == "int":
         return "0"
     if type_name == "float":
@@ -2863,12 +3048,12 @@ def get_default_value_for_type(type_name):
     if type_name == "bool":
         return "false"
     if type_name.startswith("typedarray::"):
-        return f"{correct_type(type_name)}()"
+        return f"{registry.correct_type(type_name)}()"
     if is_enum(type_name):
-        return f"{correct_type(type_name)}(0)"
-    if is_variant(type_name):
+        return f"{registry.correct_type(type_name)}(0)"
+    if registry.is_variant(type_name):
         return f"{type_name}()"
-    if is_refcounted(type_name):
+    if registry.is_refcounted(type_name):
         return f"Ref<{type_name}>()"
     return "nullptr"
 
@@ -2919,3 +3104,21 @@ def add_header(filename, lines):
 
     lines.append("// THIS FILE IS GENERATED. EDITS WILL BE LOST.")
     lines.append("")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect the godot-cpp bindings for a GDExtension API file.")
+    parser.add_argument("--api", default="gdextension/extension_api.json", help="Path to the GDExtension API JSON file")
+    parser.add_argument(
+        "--explain-profile",
+        metavar="PROFILE",
+        help="Explain why each class is enabled or disabled by a build profile",
+    )
+    args = parser.parse_args()
+
+    if args.explain_profile:
+        explain_build_profile(args.api, args.explain_profile)
+    else:
+        parser.print_help()
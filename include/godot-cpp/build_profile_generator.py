@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+
+import json
+import re
+from pathlib import Path
+
+from binding_generator import CLASS_ALIASES, camel_to_snake, load_api_index, resolve_class_closure
+
+SOURCE_EXTENSIONS = [".c", ".cc", ".cpp", ".cxx", ".h", ".hh", ".hpp", ".hxx", ".inc"]
+
+CLASS_INCLUDE_REGEX = re.compile(r"#\s*include\s*[<\"]godot_cpp/classes/(\w+)\.hpp[>\"]")
+IDENTIFIER_REGEX = re.compile(r"\b[A-Z][A-Za-z0-9_]*\b")
+COMMENT_REGEX = re.compile(r"//[^\n]*|/\*.*?\*/", re.S)
+
+
+def get_source_files(source_paths):
+    files = []
+    for source_path in source_paths:
+        source_path = Path(source_path)
+        if source_path.is_file():
+            files.append(source_path)
+        elif source_path.is_dir():
+            files += sorted(f for f in source_path.glob("**/*") if f.suffix in SOURCE_EXTENSIONS and f.is_file())
+    return files
+
+
+def scan_used_classes(source_paths, api_index):
+    """
+    Find the engine classes used by C++ sources, either through an include of their generated header
+    or by naming them. Returns the API names of the classes (e.g. `ClassDB` for `ClassDBSingleton`).
+    """
+    class_names = {}
+    for name in api_index["classes"]:
+        class_names[name] = name
+        class_names[CLASS_ALIASES.get(name, name)] = name
+    headers = {camel_to_snake(alias): name for alias, name in class_names.items()}
+
+    used = set()
+    for source_file in get_source_files(source_paths):
+        with open(source_file, encoding="utf-8", errors="replace") as f:
+            content = COMMENT_REGEX.sub("", f.read())
+        for header in CLASS_INCLUDE_REGEX.findall(content):
+            if header in headers:
+                used.add(headers[header])
+        for identifier in set(IDENTIFIER_REGEX.findall(content)):
+            if identifier in class_names:
+                used.add(class_names[identifier])
+
+    return used
+
+
+def minimize_enabled_classes(classes, api_index):
+    """
+    Drop the classes which are already pulled in by another one through inheritance or method dependencies,
+    since the build profile resolves those anyway.
+    """
+    graphs = [(api_index["inherits"], "parent of"), (api_index["dependencies"], "used by")]
+    remaining = set(classes)
+    for cls in sorted(classes):
+        others = [(other, "") for other in sorted(remaining) if other != cls]
+        if cls in resolve_class_closure(others, graphs):
+            remaining.remove(cls)
+    return sorted(remaining)
+
+
+def generate_build_profile(api_filepath, source_paths, profile_filepath, output_dir="."):
+    """
+    Write a build profile enabling only the engine classes used by the given sources.
+    The file is left untouched if its content doesn't change, so it doesn't trigger needless rebuilds.
+    """
+    api_index = load_api_index(api_filepath, output_dir)
+    enabled_classes = minimize_enabled_classes(scan_used_classes(source_paths, api_index), api_index)
+    content = json.dumps({"enabled_classes": enabled_classes}, indent="\t") + "\n"
+
+    profile_filepath = Path(profile_filepath)
+    if not profile_filepath.is_file() or profile_filepath.read_text(encoding="utf-8") != content:
+        profile_filepath.parent.mkdir(parents=True, exist_ok=True)
+        profile_filepath.write_text(content, encoding="utf-8")
+
+    return enabled_classes
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate a build profile enabling only the classes used by sources.")
+    parser.add_argument("--api", default="gdextension/extension_api.json", help="Path to the GDExtension API JSON file")
+    parser.add_argument("--output", default="build_profile.json", help="Path of the build profile to write")
+    parser.add_argument("sources", nargs="+", help="Source files or directories to scan")
+    args = parser.parse_args()
+
+    enabled_classes = generate_build_profile(args.api, args.sources, args.output)
+    print("Enabled %d classes in %s: %s" % (len(enabled_classes), args.output, ", ".join(enabled_classes)))
@@ -0,0 +1,205 @@
+import json
+import os
+import threading
+import time
+
+from SCons.CacheDir import CacheDir
+
+# Kept at the root of the cache, next to the `config` file of CacheDir, while the cached files are in subdirectories.
+INDEX_FILE = "lru_index.json"
+# How long to wait for another build pruning the same cache, checking every `LOCK_RETRY_SEC`.
+LOCK_TIMEOUT_SEC = 60
+LOCK_RETRY_SEC = 0.1
+# A lock older than this was left behind by an interrupted build.
+STALE_LOCK_SEC = 600
+# The index only knows about the files used by builds with a `cache_limit`, so the cache is scanned again from
+# time to time to account for the others.
+RESCAN_INTERVAL_SEC = 7 * 24 * 3600
+
+
+class GodotCPPCacheDir(CacheDir):
+    """
+    CacheDir recording which cached files every build used and how much it moved, so the cache can be pruned from
+    an index without scanning it, and the build can report how much it got from the cache.
+
+    The statistics are class attributes since SCons creates an instance for every environment using the cache.
+    """
+
+    lock = threading.Lock()
+    requests_made = 0
+    requests_hit = 0
+    bytes_retrieved = 0
+    bytes_pushed = 0
+    # Cached file path -> size, for every file retrieved or pushed by this build.
+    accessed = {}
+
+    @classmethod
+    def record(cls, cachefile, retrieved=False, hit=False, pushed=False):
+        try:
+            size = os.path.getsize(cachefile) if hit or pushed else 0
+        except OSError:
+            size = 0
+        with cls.lock:
+            if retrieved:
+                cls.requests_made += 1
+            if hit:
+                cls.requests_hit += 1
+                cls.bytes_retrieved += size
+            if pushed:
+                cls.bytes_pushed += size
+            if size:
+                cls.accessed[cachefile] = size
+
+    def retrieve(self, node):
+        if not self.is_enabled():
+            return False
+        hit = super().retrieve(node)
+        self.record(self.cachepath(node)[1], retrieved=True, hit=hit)
+        return hit
+
+    def push(self, node):
+        if not self.is_enabled():
+            return None
+        cachefile = self.cachepath(node)[1]
+        existed = os.path.exists(cachefile)
+        result = super().push(node)
+        # Already cached by a concurrent build, but used by this one all the same.
+        self.record(cachefile, pushed=not existed and os.path.exists(cachefile))
+        return result
+
+
+class CacheLock:
+    """
+    Lock file held by the build pruning a cache. SCons only provides one from 4.8 on.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.fd = None
+
+    def __enter__(self):
+        try:
+            if time.time() - os.path.getmtime(self.path) > STALE_LOCK_SEC:
+                os.remove(self.path)
+        except OSError:
+            pass
+
+        deadline = time.monotonic() + LOCK_TIMEOUT_SEC
+        while True:
+            try:
+                self.fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_RDWR)
+                return self
+            except FileExistsError:
+                if time.monotonic() > deadline:
+                    raise TimeoutError("timed out waiting for %s" % self.path)
+                time.sleep(LOCK_RETRY_SEC)
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        os.close(self.fd)
+        os.remove(self.path)
+
+
+def scan_cache(cache_path):
+    # CacheDir refreshes the timestamp of the files it retrieves, so it's also their last access.
+    files = {}
+    for root, _, names in os.walk(cache_path):
+        if root == cache_path:
+            continue
+        for name in names:
+            # Pushed by a concurrent build.
+            if ".tmp" in name:
+                continue
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files[os.path.relpath(path, cache_path)] = [stat.st_mtime, stat.st_size]
+    return files
+
+
+def read_index(index_path, cache_path, rescan):
+    if rescan:
+        return {"scanned": time.time(), "files": scan_cache(cache_path)}
+    try:
+        with open(index_path, encoding="utf-8") as f:
+            index = json.load(f)
+        if time.time() - index["scanned"] < RESCAN_INTERVAL_SEC:
+            return index
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return {"scanned": time.time(), "files": scan_cache(cache_path)}
+
+
+def write_index(index_path, index):
+    temp_path = "%s.tmp%d" % (index_path, os.getpid())
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, separators=(",", ":"))
+    os.replace(temp_path, index_path)
+
+
+def prune_cache(cache_path, cache_limit, tracked=True):
+    """
+    Adds the files used by this build to the index of the cache, then removes the least recently used files until
+    the cache fits in `cache_limit` bytes. Concurrent builds sharing the cache take turns. If the build wasn't
+    `tracked` by `GodotCPPCacheDir`, the index is rebuilt from a scan of the cache.
+    """
+    index_path = os.path.join(cache_path, INDEX_FILE)
+    try:
+        with CacheLock(index_path + ".lock"):
+            index = read_index(index_path, cache_path, not tracked)
+            files = index["files"]
+            now = time.time()
+            for cachefile, size in GodotCPPCacheDir.accessed.items():
+                files[os.path.relpath(cachefile, cache_path)] = [now, size]
+
+            cache_size = sum(size for _, size in files.values())
+            removed = 0
+            removed_size = 0
+            if cache_size > cache_limit:
+                for name, (_, size) in sorted(files.items(), key=lambda item: item[1][0]):
+                    if cache_size <= cache_limit:
+                        break
+                    try:
+                        os.remove(os.path.join(cache_path, name))
+                        removed += 1
+                        removed_size += size
+                    except FileNotFoundError:
+                        pass
+                    except OSError:
+                        # Still there, still counted.
+                        continue
+                    del files[name]
+                    cache_size -= size
+
+            write_index(index_path, index)
+    except OSError as e:
+        print("Couldn't prune the SCons cache: %s" % e)
+        return
+
+    if removed:
+        print(
+            "Pruned %d files (%.1f MiB) from the SCons cache, %.2f GiB left."
+            % (removed, removed_size / 1024**2, cache_size / 1024**3)
+        )
+
+
+def finish_build(cache_path, cache_limit, tracked=True):
+    """
+    Reports how this build used the cache, then prunes it if it has a limit. Registered to run at exit, once every
+    target is built.
+    """
+    stats = GodotCPPCacheDir
+    if stats.requests_made or stats.bytes_pushed:
+        print(
+            "SCons cache: %d hits, %d misses (%.0f%% hit rate), %.1f MiB retrieved, %.1f MiB pushed."
+            % (
+                stats.requests_hit,
+                stats.requests_made - stats.requests_hit,
+                100.0 * stats.requests_hit / max(stats.requests_made, 1),
+                stats.bytes_retrieved / 1024**2,
+                stats.bytes_pushed / 1024**2,
+            )
+        )
+    if cache_limit > 0:
+        prune_cache(cache_path, cache_limit, tracked)
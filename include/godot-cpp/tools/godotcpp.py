@@ -1,16 +1,20 @@
+import atexit
 import os
 import platform
 import sys
 
+from build_cache import GodotCPPCacheDir, finish_build
+from common_compiler_flags import using_clang
 from SCons.Action import Action
-from SCons.Builder import Builder
+from SCons.Builder import Builder, ListEmitter
 from SCons.Errors import UserError
 from SCons.Script import ARGUMENTS
-from SCons.Tool import Tool
+from SCons.Tool import CScanner, Tool
 from SCons.Variables import BoolVariable, EnumVariable, PathVariable
 from SCons.Variables.BoolVariable import _text2bool
 
 from binding_generator import scons_emit_files, scons_generate_bindings
+from build_profile_generator import generate_build_profile
 
 
 def add_sources(sources, dir, extension):
@@ -44,6 +48,11 @@ def validate_dir(key, val, env):
         raise UserError("'%s' is not a directory: %s" % (key, val))
 
 
+def validate_build_profile(key, val, env):
+    if val != "auto":
+        validate_file(key, val, env)
+
+
 def validate_parent_dir(key, val, env):
     if not os.path.isdir(normalize_path(os.path.dirname(val), env)):
         raise UserError("'%s' is not a directory: %s" % (key, os.path.dirname(val)))
@@ -114,6 +123,9 @@ def no_verbose(env):
     generated_file_message = "{}Generating {}$TARGET{} ...{}".format(
         colors["blue"], colors["bold_blue"], colors["blue"], colors["reset"]
     )
+    precompiled_header_message = "{}Precompiling {}$SOURCE{} ...{}".format(
+        colors["blue"], colors["bold_blue"], colors["blue"], colors["reset"]
+    )
 
     env.Append(CXXCOMSTR=[compile_source_message])
     env.Append(CCCOMSTR=[compile_source_message])
@@ -127,6 +139,7 @@ def no_verbose(env):
     env.Append(JAVACCOMSTR=[java_compile_source_message])
     env.Append(RCCOMSTR=[compiled_resource_message])
     env.Append(GENCOMSTR=[generated_file_message])
+    env.Append(GODOT_CPP_PCHCOMSTR=[precompiled_header_message])
 
 
 platforms = ["linux", "macos", "windows", "android", "ios", "web"]
@@ -235,6 +248,13 @@ def options(opts, env):
             default=env.get("generate_bindings", False),
         )
     )
+    opts.Add(
+        BoolVariable(
+            key="incremental_bindings",
+            help="Only rewrite the generated binding files whose content changed, to avoid needless recompilation.",
+            default=env.get("incremental_bindings", True),
+        )
+    )
     opts.Add(
         BoolVariable(
             key="generate_template_get_node",
@@ -289,9 +309,34 @@ def options(opts, env):
     opts.Add(
         PathVariable(
             "build_profile",
-            "Path to a file containing a feature build profile",
+            "Path to a file containing a feature build profile, or 'auto' to derive it from the extension sources",
             default=env.get("build_profile", None),
-            validator=validate_file,
+            validator=validate_build_profile,
+        )
+    )
+    opts.Add(
+        "build_profile_sources",
+        "Comma-separated list of source directories scanned for used classes when build_profile=auto",
+        env.get("build_profile_sources", "src"),
+    )
+
+    # Build caching
+    opts.Add(
+        "cache_path",
+        "Path to a directory where SCons cache files will be stored. No value disables the cache.",
+        env.get("cache_path", os.environ.get("SCONS_CACHE", "")),
+    )
+    opts.Add(
+        "cache_limit",
+        "Max size (in GiB) of the SCons cache, the least recently used files being removed after every build. 0 means no limit.",
+        env.get("cache_limit", os.environ.get("SCONS_CACHE_LIMIT", "0")),
+    )
+    opts.Add(
+        EnumVariable(
+            key="compiler_launcher",
+            help="Compiler cache wrapping the C and C++ compilers",
+            default=env.get("compiler_launcher", "none"),
+            allowed_values=("none", "ccache", "sccache"),
         )
     )
 
@@ -329,6 +374,25 @@ def options(opts, env):
     opts.Add(BoolVariable("debug_symbols", "Build with debugging symbols", True))
     opts.Add(BoolVariable("dev_build", "Developer build with dev-only debugging code (DEV_ENABLED)", False))
     opts.Add(BoolVariable("verbose", "Enable verbose output for the compilation", False))
+    opts.Add(
+        BoolVariable(
+            "pch",
+            "Precompile the godot-cpp headers shared by every source, for the library and the extension (GCC and Clang)",
+            False,
+        )
+    )
+    opts.Add(
+        BoolVariable(
+            "unity_build",
+            "Compile the generated bindings in batched translation units, which parse the shared headers once per batch",
+            False,
+        )
+    )
+    opts.Add(
+        "unity_batches",
+        "Number of unity build batches, 0 to derive it from the number of jobs. Changing it regroups every batch",
+        "0",
+    )
 
     # Add platform options (custom tools can override platforms)
     for pl in sorted(set(platforms + custom_platforms)):
@@ -337,49 +401,211 @@ def options(opts, env):
             tool.options(opts)
 
 
+DOC_DATA_CHUNK_SIZE = 64 * 1024
+# Bytes per line of the emitted array, each byte being written as 4 characters.
+DOC_DATA_BYTES_PER_LINE = 32
+DOC_DATA_ESCAPES = ["\\x%02x" % b for b in range(256)]
+DOC_DATA_HEX_BYTES = ["0x%02x" % b for b in range(256)]
+
+
+def write_doc_data_array(g, name, data, string_literals):
+    """
+    Write `data` as a C++ array, compactly enough that both writing and compiling it stay fast.
+    String literals are the cheapest for compilers to parse, but MSVC limits them to 64 KiB once
+    concatenated, so it gets a hex byte list instead.
+    """
+    if string_literals:
+        # The literal's implicit null terminator is ignored, the size is passed along.
+        g.write("static const unsigned char %s[] =\n" % name)
+        for i in range(0, len(data), DOC_DATA_BYTES_PER_LINE):
+            g.write('\t"%s"\n' % "".join(map(DOC_DATA_ESCAPES.__getitem__, data[i : i + DOC_DATA_BYTES_PER_LINE])))
+        g.write(";\n")
+    else:
+        g.write("static const unsigned char %s[] = {\n" % name)
+        for i in range(0, len(data), DOC_DATA_BYTES_PER_LINE):
+            g.write("\t%s,\n" % ",".join(map(DOC_DATA_HEX_BYTES.__getitem__, data[i : i + DOC_DATA_BYTES_PER_LINE])))
+        g.write("};\n")
+
+
 def make_doc_source(target, source, env):
+    import hashlib
     import zlib
 
-    dst = str(target[0])
-    g = open(dst, "w", encoding="utf-8")
-    buf = ""
-    docbegin = ""
-    docend = ""
+    # Maximum compression keeps release binaries small, dev builds favor build times instead.
+    level = zlib.Z_BEST_SPEED if env.get("dev_build", False) else zlib.Z_BEST_COMPRESSION
+    compressor = zlib.compressobj(level)
+    # Stable across runs and Python versions, unlike `hash()`.
+    content_hash = hashlib.sha256()
+    decomp_size = 0
+    compressed = []
+
+    # Stream the sources rather than concatenating them all in memory.
     for src in source:
         src_path = str(src)
         if not src_path.endswith(".xml"):
             continue
-        with open(src_path, "r", encoding="utf-8") as f:
-            content = f.read()
-        buf += content
+        with open(src_path, "rb") as f:
+            while True:
+                chunk = f.read(DOC_DATA_CHUNK_SIZE)
+                if not chunk:
+                    break
+                decomp_size += len(chunk)
+                content_hash.update(chunk)
+                compressed.append(compressor.compress(chunk))
+    compressed.append(compressor.flush())
+    buf = b"".join(compressed)
+
+    with open(str(target[0]), "w", encoding="utf-8", newline="\n") as g:
+        g.write("/* THIS FILE IS GENERATED DO NOT EDIT */\n")
+        g.write("\n")
+        g.write("#include <godot_cpp/godot.hpp>\n")
+        g.write("\n")
+
+        g.write('static const char *_doc_data_hash = "' + content_hash.hexdigest() + '";\n')
+        g.write("static const int _doc_data_uncompressed_size = " + str(decomp_size) + ";\n")
+        g.write("static const int _doc_data_compressed_size = " + str(len(buf)) + ";\n")
+        write_doc_data_array(g, "_doc_data_compressed", buf, not env.get("is_msvc", False))
+        g.write("\n")
+
+        g.write(
+            "static godot::internal::DocDataRegistration _doc_data_registration(_doc_data_hash, _doc_data_uncompressed_size, _doc_data_compressed_size, _doc_data_compressed);\n"
+        )
+        g.write("\n")
+
+
+def setup_cache(env):
+    """
+    Enables the SCons cache in `cache_path` and wraps the compilers with `compiler_launcher`. The cache stores the
+    outputs of whole build steps, except generated bindings, and is shared by every configuration, while the
+    compiler cache also hits when only unrelated flags or dependencies changed.
+    """
+    cache_path = env["cache_path"]
+    if cache_path:
+        cache_path = normalize_path(cache_path, env)
+        try:
+            env.CacheDir(cache_path, GodotCPPCacheDir)
+            tracked = True
+        except TypeError:
+            # Older SCons versions don't take a custom CacheDir class: the build isn't reported and pruning scans
+            # the whole cache.
+            env.CacheDir(cache_path)
+            tracked = False
+        # Only hashes the files whose timestamp changed, rather than every file on every build.
+        env.Decider("MD5-timestamp")
+
+        try:
+            cache_limit = float(env["cache_limit"]) * 1024**3
+        except ValueError:
+            raise UserError("cache_limit must be a size in GiB: %s" % env["cache_limit"])
+        if not env.GetOption("no_exec"):
+            atexit.register(finish_build, cache_path, cache_limit, tracked)
+
+    launcher = env["compiler_launcher"]
+    if launcher == "none":
+        return
+    launcher_path = env.WhereIs(launcher)
+    if launcher_path is None:
+        print("%s was not found in PATH, building without a compiler cache." % launcher)
+        return
+
+    # The launchers are configured through environment variables, which SCons doesn't forward by default.
+    prefix = launcher.upper() + "_"
+    for key, value in os.environ.items():
+        if key.startswith(prefix):
+            env["ENV"].setdefault(key, value)
+    if launcher == "ccache" and env["pch"]:
+        # Needed for ccache to cache objects using a precompiled header.
+        env["ENV"].setdefault("CCACHE_SLOPPINESS", "pch_defines,time_macros")
+
+    # Wrapped after the toolchain detection, which runs the compilers themselves.
+    env["CC"] = '"%s" %s' % (launcher_path, env["CC"])
+    env["CXX"] = '"%s" %s' % (launcher_path, env["CXX"])
+
+
+# The godot-cpp headers included, directly or not, by every binding and most extension sources.
+PCH_HEADERS = [
+    "godot_cpp/core/class_db.hpp",
+    "godot_cpp/core/engine_ptrcall.hpp",
+    "godot_cpp/core/error_macros.hpp",
+    "godot_cpp/variant/variant.hpp",
+    "godot_cpp/variant/utility_functions.hpp",
+]
+
 
-    buf = (docbegin + buf + docend).encode("utf-8")
-    decomp_size = len(buf)
+def pch_emitter(target, source, env):
+    # `-include` isn't seen by the dependency scanner, and objects compiled before the precompiled header
+    # exists would parse the headers themselves.
+    env.Depends(target, env["GODOT_CPP_PCH"])
+    return target, source
 
-    # Use maximum zlib compression level to further reduce file size
-    # (at the cost of initial build times).
-    buf = zlib.compress(buf, zlib.Z_BEST_COMPRESSION)
 
-    g.write("/* THIS FILE IS GENERATED DO NOT EDIT */\n")
-    g.write("\n")
-    g.write("#include <godot_cpp/godot.hpp>\n")
-    g.write("\n")
+def make_pch_header(target, source, env):
+    with open(str(target[0]), "w", encoding="utf-8", newline="\n") as g:
+        g.write("/* THIS FILE IS GENERATED DO NOT EDIT */\n")
+        g.write("\n")
+        g.write("#pragma once\n")
+        g.write("\n")
+        for include in PCH_HEADERS:
+            g.write("#include <%s>\n" % include)
 
-    g.write('static const char *_doc_data_hash = "' + str(hash(buf)) + '";\n')
-    g.write("static const int _doc_data_uncompressed_size = " + str(decomp_size) + ";\n")
-    g.write("static const int _doc_data_compressed_size = " + str(len(buf)) + ";\n")
-    g.write("static const unsigned char _doc_data_compressed[] = {\n")
-    for i in range(len(buf)):
-        g.write("\t" + str(buf[i]) + ",\n")
-    g.write("};\n")
-    g.write("\n")
 
-    g.write(
-        "static godot::internal::DocDataRegistration _doc_data_registration(_doc_data_hash, _doc_data_uncompressed_size, _doc_data_compressed_size, _doc_data_compressed);\n"
+def setup_pch(env, bindings):
+    """
+    Precompile `PCH_HEADERS` once per build configuration and force-include them in every C++ object of this
+    environment, the extension's included. GCC and the Clang driver both pick up the precompiled header found
+    next to an `-include`d one, and fall back to parsing it if the precompiled header can't be used.
+    """
+    if env.get("is_msvc", False):
+        print("Precompiled headers are only supported with GCC and Clang, ignoring pch=yes.")
+        return
+
+    # Written once the bindings are generated, which may clear the `gen` directory first.
+    header = env.GodotCPPPrecompiledHeaderSource(
+        env.File("gen/pch/godot-cpp%s.hpp" % env["suffix"]), env.Value(PCH_HEADERS)
+    )[0]
+    env.Depends(header, bindings)
+
+    pch_suffix = ".pch" if using_clang(env) else ".gch"
+    # Compiled with the very flags of the objects using it, minus its own inclusion.
+    env["GODOT_CPP_PCH"] = env.GodotCPPPrecompiledHeader(
+        env.File(header.abspath + pch_suffix), header, GODOT_CPP_PCH_INCLUDE=[]
     )
-    g.write("\n")
+    env["GODOT_CPP_PCH_INCLUDE"] = ["-include", header.abspath, "-Winvalid-pch"]
+    env.Append(CXXFLAGS=["$GODOT_CPP_PCH_INCLUDE"])
+
+    for builder_name in ["StaticObject", "SharedObject"]:
+        builder = env["BUILDERS"][builder_name]
+        for suffix in [".cpp", ".cc", ".cxx"]:
+            if suffix in builder.emitter:
+                builder.add_emitter(suffix, ListEmitter([builder.emitter[suffix], pch_emitter]))
+
 
-    g.close()
+# Enough batches for every job to stay busy while the last, uneven ones finish.
+UNITY_BATCHES_PER_JOB = 2
+
+
+def get_unity_batches(sources, batch_count):
+    """
+    Group sources into `batch_count` batches by a hash of their file name rather than by their position,
+    so adding or removing a source only changes its own batch and the others aren't rebuilt.
+    Returns a dictionary of batch index to its sorted sources, without the empty batches.
+    """
+    import zlib
+
+    batches = {}
+    for source in sources:
+        index = zlib.crc32(os.path.basename(str(source)).encode("utf-8")) % batch_count
+        batches.setdefault(index, []).append(source)
+    return {index: sorted(batch, key=str) for index, batch in batches.items()}
+
+
+def make_unity_source(target, source, env):
+    target_dir = os.path.dirname(str(target[0]))
+    with open(str(target[0]), "w", encoding="utf-8", newline="\n") as g:
+        g.write("/* THIS FILE IS GENERATED DO NOT EDIT */\n")
+        g.write("\n")
+        for src in source:
+            g.write('#include "%s"\n' % os.path.relpath(str(src), target_dir).replace("\\", "/"))
 
 
 def generate(env):
@@ -502,6 +728,8 @@ def generate(env):
     env["suffix"] = suffix  # Exposed when included from another project
     env["OBJSUFFIX"] = suffix + env["OBJSUFFIX"]
 
+    setup_cache(env)
+
     # compile_commands.json
     env.Tool("compilation_db")
     env.Alias("compiledb", env.CompilationDatabase(normalize_path(env["compiledb_file"], env)))
@@ -513,16 +741,36 @@ def generate(env):
     # Builders
     env.Append(
         BUILDERS={
-            "GodotCPPBindings": Builder(action=Action(scons_generate_bindings, "$GENCOMSTR"), emitter=scons_emit_files),
-            "GodotCPPDocData": Builder(action=make_doc_source),
+            "GodotCPPBindings": Builder(
+                # Everything the generated files depend on besides the sources.
+                action=Action(
+                    scons_generate_bindings, "$GENCOMSTR", varlist=["generate_template_get_node", "arch", "precision"]
+                ),
+                emitter=scons_emit_files,
+            ),
+            "GodotCPPDocData": Builder(action=Action(make_doc_source, varlist=["dev_build", "is_msvc"])),
+            "GodotCPPUnity": Builder(action=Action(make_unity_source, "$GENCOMSTR")),
+            "GodotCPPPrecompiledHeaderSource": Builder(action=Action(make_pch_header, "$GENCOMSTR")),
+            "GodotCPPPrecompiledHeader": Builder(
+                action=Action("$GODOT_CPP_PCHCOM", "$GODOT_CPP_PCHCOMSTR"), source_scanner=CScanner
+            ),
         }
     )
+    env["GODOT_CPP_PCHCOM"] = "$CXX -x c++-header -o $TARGET -c $CXXFLAGS $CCFLAGS $_CCCOMCOM $SOURCES"
     env.AddMethod(_godot_cpp, "GodotCPP")
 
 
 def _godot_cpp(env):
     extension_dir = normalize_path(env.get("gdextension_dir", env.Dir("gdextension").abspath), env)
     api_file = normalize_path(env.get("custom_api_file", env.File(extension_dir + "/extension_api.json").abspath), env)
+
+    # Derive the build profile from the classes the extension actually uses.
+    if env.get("build_profile", "") == "auto":
+        profile_file = env.File("build_profile.gen.json").abspath
+        source_dirs = [normalize_path(d.strip(), env) for d in env["build_profile_sources"].split(",") if d.strip()]
+        enabled_classes = generate_build_profile(api_file, source_dirs, profile_file, env.Dir(".").abspath)
+        print("Generated build profile enabling %d classes: %s" % (len(enabled_classes), profile_file))
+        env["build_profile"] = profile_file
     bindings = env.GodotCPPBindings(
         env.Dir("."),
         [
@@ -531,10 +779,14 @@ def _godot_cpp(env):
             "binding_generator.py",
         ],
     )
+    # SCons removes the targets of an action before running it unless they are precious, which would leave the
+    # incremental writer nothing to compare with.
+    env.Precious(bindings)
     # Forces bindings regeneration.
     if env["generate_bindings"]:
         env.AlwaysBuild(bindings)
-        env.NoCache(bindings)
+    # Restoring them from the cache would bypass the incremental writer and the removal of stale files.
+    env.NoCache(bindings)
 
     # Sources to compile
     sources = []
@@ -542,11 +794,22 @@ def _godot_cpp(env):
     add_sources(sources, "src/classes", "cpp")
     add_sources(sources, "src/core", "cpp")
     add_sources(sources, "src/variant", "cpp")
-    sources.extend([f for f in bindings if str(f).endswith(".cpp")])
+    generated_sources = [f for f in bindings if str(f).endswith(".cpp")]
+    if env["unity_build"]:
+        batch_count = int(env["unity_batches"]) or env.GetOption("num_jobs") * UNITY_BATCHES_PER_JOB
+        # Named after their batch index, which stays the same when other batches are empty.
+        generated_sources = [
+            env.GodotCPPUnity(env.File("gen/src/unity/unity_%d.gen.cpp" % index), batch)[0]
+            for index, batch in sorted(get_unity_batches(generated_sources, batch_count).items())
+        ]
+    sources.extend(generated_sources)
 
     # Includes
     env.AppendUnique(CPPPATH=[env.Dir(d) for d in [extension_dir, "include", "gen/include"]])
 
+    if env["pch"]:
+        setup_pch(env, bindings)
+
     library = None
     library_name = "libgodot-cpp" + env["suffix"] + env["LIBSUFFIX"]
 
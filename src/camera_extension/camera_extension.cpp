@@ -1,227 +1,1359 @@
 #include "camera_extension.hpp"
+#include "dlib_face_tracker.hpp"
+#include "dnn_face_tracker.hpp"
+#include "haar_eye_tracker.hpp"
+#include "tracking_benchmark.hpp"
+#include <godot_cpp/classes/engine.hpp>
+#include <godot_cpp/classes/os.hpp>
+#include <godot_cpp/classes/performance.hpp>
+#include <godot_cpp/classes/project_settings.hpp>
+#include <godot_cpp/variant/callable_method_pointer.hpp>
+#include <iterator>
 
-// TODO make this a relative path
-const char *MODEL_PATH =
-    "/home/pedro/uni/year_2/hci/project/parallax/godot_project/"
-    "assets/face_detection_model.dat";
-const char *HAAR_CASCADE_PATH =
-    "/home/pedro/uni/year_2/hci/project/parallax/godot_project/"
-    "assets/haarcascade_lefteye.xml";
+// resolved with `ProjectSettings.globalize_path`, the trackers read them from
+// the file system
+const char *MODEL_PATH = "res://assets/face_detection_model.dat";
+const char *HAAR_CASCADE_PATH = "res://assets/haarcascade_lefteye.xml";
+const char *DNN_MODEL_PATH =
+    "res://assets/res10_300x300_ssd_iter_140000_fp16.caffemodel";
+const char *DNN_CONFIG_PATH = "res://assets/res10_300x300_ssd_deploy.prototxt";
 const float DEFAULT_Z = 10.0;
 
-// -1.0 for both to use default camera resolution
-const int CAMERA_WIDTH = -1.0;
-const int CAMERA_HEIGHT = -1.0;
+// typical horizontal field of view of a laptop webcam
+const float DEFAULT_CAMERA_FOV_DEGREES = 60.0;
+// world units per meter, a head 1m away from the webcam lands at `DEFAULT_Z`
+const double DEFAULT_HEAD_POSE_SCALE = 10.0;
 
-// post-processing downscaling factor
-const float INPUT_FRAME_SCALE_FACTOR = 1.0;
+// physical size of a 15.6" 16:9 laptop screen, in meters
+const godot::Vector2 DEFAULT_SCREEN_SIZE = godot::Vector2(0.344, 0.194);
+// a webcam centered just above the top edge of the default screen
+const godot::Vector3 DEFAULT_WEBCAM_OFFSET = godot::Vector3(0.0, 0.107, 0.0);
+
+// -1 for both to use default camera resolution
+const int DEFAULT_CAPTURE_WIDTH = -1;
+const int DEFAULT_CAPTURE_HEIGHT = -1;
+// raw YUYV usually tops out at 30 fps or less over USB 2, MJPG doesn't
+const double DEFAULT_CAPTURE_FPS = 60.0;
+const char *DEFAULT_CAPTURE_FOURCC = "MJPG";
+// a single queued frame, older ones would only add latency
+const int DEFAULT_CAPTURE_BUFFER_SIZE = 1;
+
+// downscaling factor of the captured frame, landmarks are refined on it
+const float DEFAULT_FRAME_SCALE = 1.0;
+// downscaling factor of the grayscale frame the detectors run on
+const float DEFAULT_DETECTION_SCALE = 0.5;
 
 const int CAMERA_COORDS_SCALAR = 1;
-const int NOSE_TIP_IDX = 30;
 
-// between-frame-coords smoothing factor
+// between-frame-coords smoothing factor of the exponential filter
 const float ALPHA = 0.5;
 
+// full-frame detection period in frames, 1 disables ROI tracking
+const int DEFAULT_DETECTION_INTERVAL = 10;
+// ROI growth on each side, relative to the last detected rect size
+const float DEFAULT_ROI_MARGIN = 0.5;
+// mean absolute difference, in gray levels, between the face ROI thumbnails
+// of the current frame and of the last detection under which the viewer is
+// considered still. the webcam's noise is mostly averaged out by the thumbnail
+const float DEFAULT_MOTION_THRESHOLD = 3.0;
+// frames a detection can be reused for, so it's refreshed now and then
+const int DEFAULT_MAX_STATIC_FRAMES = 15;
+// compared ROI thumbnails, whatever the ROI size
+const cv::Size MOTION_THUMBNAIL_SIZE = cv::Size(32, 32);
+
+// detection threads used by default, as a share of the processor count. the
+// rest are left to the engine, which the detection shares its workers with
+const int AUTO_DETECTION_THREADS_DIVISOR = 2;
+
+// Performance custom monitors, in the debugger's Monitors tab
+const char *LATENCY_MONITOR = "CameraExtension/latency_p95_msec";
+const char *DETECT_MONITOR = "CameraExtension/detect_p95_msec";
+const char *DROPPED_FRAMES_MONITOR = "CameraExtension/dropped_frames";
+
+// indexed by `TrackerBackend`, the names `HeadTracker::get_name()` returns
+const char *TRACKER_BACKEND_NAMES[] = {"haar_eye", "dlib_landmarks",
+                                       "dnn_face"};
+
+// how long the vision thread waits before reopening a closed camera, doubled
+// on every failed attempt up to MAX_CAMERA_RETRY_MS
+const int CAMERA_RETRY_MS = 500;
+const int MAX_CAMERA_RETRY_MS = 8000;
+// wait after a failed read, doubled on every failure in a row up to
+// CAMERA_RETRY_MS
+const int FAILED_READ_BACKOFF_MS = 10;
+// reads failing in a row before the camera is closed, to be reopened
+const int MAX_FAILED_READS = 10;
+
 using namespace godot;
 
-void CameraExtension::_bind_methods() {}
+void CameraExtension::_bind_methods() {
+  ClassDB::bind_method(D_METHOD("set_tracker_backend", "backend"),
+                       &CameraExtension::set_tracker_backend);
+  ClassDB::bind_method(D_METHOD("get_tracker_backend"),
+                       &CameraExtension::get_tracker_backend);
+  ClassDB::bind_method(D_METHOD("is_tracker_ready"),
+                       &CameraExtension::is_tracker_ready);
+  ClassDB::bind_method(D_METHOD("get_tracker_status"),
+                       &CameraExtension::get_tracker_status);
+  ClassDB::bind_method(D_METHOD("get_pipeline_stats"),
+                       &CameraExtension::get_pipeline_stats);
+
+  ClassDB::bind_method(D_METHOD("set_filter_mode", "mode"),
+                       &CameraExtension::set_filter_mode);
+  ClassDB::bind_method(D_METHOD("get_filter_mode"),
+                       &CameraExtension::get_filter_mode);
+  ClassDB::bind_method(D_METHOD("set_filter_min_cutoff", "min_cutoff"),
+                       &CameraExtension::set_filter_min_cutoff);
+  ClassDB::bind_method(D_METHOD("get_filter_min_cutoff"),
+                       &CameraExtension::get_filter_min_cutoff);
+  ClassDB::bind_method(D_METHOD("set_filter_beta", "beta"),
+                       &CameraExtension::set_filter_beta);
+  ClassDB::bind_method(D_METHOD("get_filter_beta"),
+                       &CameraExtension::get_filter_beta);
+  ClassDB::bind_method(D_METHOD("set_filter_process_noise", "noise"),
+                       &CameraExtension::set_filter_process_noise);
+  ClassDB::bind_method(D_METHOD("get_filter_process_noise"),
+                       &CameraExtension::get_filter_process_noise);
+  ClassDB::bind_method(D_METHOD("set_filter_measurement_noise", "noise"),
+                       &CameraExtension::set_filter_measurement_noise);
+  ClassDB::bind_method(D_METHOD("get_filter_measurement_noise"),
+                       &CameraExtension::get_filter_measurement_noise);
+  ClassDB::bind_method(D_METHOD("set_prediction_lead_msec", "msec"),
+                       &CameraExtension::set_prediction_lead_msec);
+  ClassDB::bind_method(D_METHOD("get_prediction_lead_msec"),
+                       &CameraExtension::get_prediction_lead_msec);
+
+  ClassDB::bind_method(D_METHOD("set_replay_path", "path"),
+                       &CameraExtension::set_replay_path);
+  ClassDB::bind_method(D_METHOD("get_replay_path"),
+                       &CameraExtension::get_replay_path);
+  ClassDB::bind_method(D_METHOD("set_capture_width", "width"),
+                       &CameraExtension::set_capture_width);
+  ClassDB::bind_method(D_METHOD("get_capture_width"),
+                       &CameraExtension::get_capture_width);
+  ClassDB::bind_method(D_METHOD("set_capture_height", "height"),
+                       &CameraExtension::set_capture_height);
+  ClassDB::bind_method(D_METHOD("get_capture_height"),
+                       &CameraExtension::get_capture_height);
+  ClassDB::bind_method(D_METHOD("set_capture_fps", "fps"),
+                       &CameraExtension::set_capture_fps);
+  ClassDB::bind_method(D_METHOD("get_capture_fps"),
+                       &CameraExtension::get_capture_fps);
+  ClassDB::bind_method(D_METHOD("set_capture_fourcc", "fourcc"),
+                       &CameraExtension::set_capture_fourcc);
+  ClassDB::bind_method(D_METHOD("get_capture_fourcc"),
+                       &CameraExtension::get_capture_fourcc);
+  ClassDB::bind_method(D_METHOD("set_capture_buffer_size", "size"),
+                       &CameraExtension::set_capture_buffer_size);
+  ClassDB::bind_method(D_METHOD("get_capture_buffer_size"),
+                       &CameraExtension::get_capture_buffer_size);
+  ClassDB::bind_method(D_METHOD("get_capture_mode"),
+                       &CameraExtension::get_capture_mode);
+  ClassDB::bind_method(
+      D_METHOD("run_benchmark", "replay_path", "reference_path"),
+      &CameraExtension::run_benchmark, DEFVAL(String()));
+
+  ClassDB::bind_method(D_METHOD("set_detection_interval", "frames"),
+                       &CameraExtension::set_detection_interval);
+  ClassDB::bind_method(D_METHOD("get_detection_interval"),
+                       &CameraExtension::get_detection_interval);
+  ClassDB::bind_method(D_METHOD("set_roi_margin", "margin"),
+                       &CameraExtension::set_roi_margin);
+  ClassDB::bind_method(D_METHOD("get_roi_margin"),
+                       &CameraExtension::get_roi_margin);
+  ClassDB::bind_method(D_METHOD("set_motion_threshold", "threshold"),
+                       &CameraExtension::set_motion_threshold);
+  ClassDB::bind_method(D_METHOD("get_motion_threshold"),
+                       &CameraExtension::get_motion_threshold);
+  ClassDB::bind_method(D_METHOD("set_max_static_frames", "frames"),
+                       &CameraExtension::set_max_static_frames);
+  ClassDB::bind_method(D_METHOD("get_max_static_frames"),
+                       &CameraExtension::get_max_static_frames);
+  ClassDB::bind_method(D_METHOD("set_detection_threads", "threads"),
+                       &CameraExtension::set_detection_threads);
+  ClassDB::bind_method(D_METHOD("get_detection_threads"),
+                       &CameraExtension::get_detection_threads);
+
+  ClassDB::bind_method(D_METHOD("set_position_mode", "mode"),
+                       &CameraExtension::set_position_mode);
+  ClassDB::bind_method(D_METHOD("get_position_mode"),
+                       &CameraExtension::get_position_mode);
+  ClassDB::bind_method(D_METHOD("set_camera_fov_degrees", "degrees"),
+                       &CameraExtension::set_camera_fov_degrees);
+  ClassDB::bind_method(D_METHOD("get_camera_fov_degrees"),
+                       &CameraExtension::get_camera_fov_degrees);
+  ClassDB::bind_method(D_METHOD("set_head_pose_scale", "scale"),
+                       &CameraExtension::set_head_pose_scale);
+  ClassDB::bind_method(D_METHOD("get_head_pose_scale"),
+                       &CameraExtension::get_head_pose_scale);
+
+  ClassDB::bind_method(D_METHOD("set_webcam_offset", "offset"),
+                       &CameraExtension::set_webcam_offset);
+  ClassDB::bind_method(D_METHOD("get_webcam_offset"),
+                       &CameraExtension::get_webcam_offset);
+  ClassDB::bind_method(D_METHOD("set_off_axis_projection", "enabled"),
+                       &CameraExtension::set_off_axis_projection);
+  ClassDB::bind_method(D_METHOD("is_off_axis_projection"),
+                       &CameraExtension::is_off_axis_projection);
+  ClassDB::bind_method(D_METHOD("set_screen_size", "size"),
+                       &CameraExtension::set_screen_size);
+  ClassDB::bind_method(D_METHOD("get_screen_size"),
+                       &CameraExtension::get_screen_size);
+
+  ClassDB::bind_method(D_METHOD("set_frame_scale", "scale"),
+                       &CameraExtension::set_frame_scale);
+  ClassDB::bind_method(D_METHOD("get_frame_scale"),
+                       &CameraExtension::get_frame_scale);
+  ClassDB::bind_method(D_METHOD("set_detection_scale", "scale"),
+                       &CameraExtension::set_detection_scale);
+  ClassDB::bind_method(D_METHOD("get_detection_scale"),
+                       &CameraExtension::get_detection_scale);
+
+  ClassDB::bind_method(D_METHOD("get_frame_allocations"),
+                       &CameraExtension::get_frame_allocations);
+  ClassDB::bind_method(D_METHOD("get_total_frame_allocations"),
+                       &CameraExtension::get_total_frame_allocations);
+
+  ADD_SIGNAL(MethodInfo("tracker_ready",
+                        PropertyInfo(Variant::INT, "backend",
+                                     PROPERTY_HINT_ENUM,
+                                     "Haar Eye,Dlib Landmarks,DNN Face")));
+
+  ADD_GROUP("Capture", "");
+  ADD_PROPERTY(PropertyInfo(Variant::STRING, "replay_path",
+                            PROPERTY_HINT_FILE, "*.avi,*.mp4,*.mkv,*.png"),
+               "set_replay_path", "get_replay_path");
+  ADD_PROPERTY(PropertyInfo(Variant::INT, "capture_width", PROPERTY_HINT_RANGE,
+                            "-1,4096,1"),
+               "set_capture_width", "get_capture_width");
+  ADD_PROPERTY(PropertyInfo(Variant::INT, "capture_height",
+                            PROPERTY_HINT_RANGE, "-1,4096,1"),
+               "set_capture_height", "get_capture_height");
+  ADD_PROPERTY(PropertyInfo(Variant::FLOAT, "capture_fps", PROPERTY_HINT_RANGE,
+                            "0,240,1"),
+               "set_capture_fps", "get_capture_fps");
+  ADD_PROPERTY(PropertyInfo(Variant::STRING, "capture_fourcc",
+                            PROPERTY_HINT_ENUM_SUGGESTION, "MJPG,YUYV,H264"),
+               "set_capture_fourcc", "get_capture_fourcc");
+  ADD_PROPERTY(PropertyInfo(Variant::INT, "capture_buffer_size",
+                            PROPERTY_HINT_RANGE, "0,8,1"),
+               "set_capture_buffer_size", "get_capture_buffer_size");
+
+  ADD_GROUP("Tracking", "");
+  ADD_PROPERTY(PropertyInfo(Variant::INT, "tracker_backend", PROPERTY_HINT_ENUM,
+                            "Haar Eye,Dlib Landmarks,DNN Face"),
+               "set_tracker_backend", "get_tracker_backend");
+  ADD_PROPERTY(PropertyInfo(Variant::INT, "detection_interval",
+                            PROPERTY_HINT_RANGE, "1,120,1"),
+               "set_detection_interval", "get_detection_interval");
+  ADD_PROPERTY(PropertyInfo(Variant::FLOAT, "roi_margin", PROPERTY_HINT_RANGE,
+                            "0,2,0.05"),
+               "set_roi_margin", "get_roi_margin");
+  ADD_PROPERTY(PropertyInfo(Variant::FLOAT, "motion_threshold",
+                            PROPERTY_HINT_RANGE, "0,32,0.1"),
+               "set_motion_threshold", "get_motion_threshold");
+  ADD_PROPERTY(PropertyInfo(Variant::INT, "max_static_frames",
+                            PROPERTY_HINT_RANGE, "0,300,1"),
+               "set_max_static_frames", "get_max_static_frames");
+  ADD_PROPERTY(PropertyInfo(Variant::INT, "detection_threads",
+                            PROPERTY_HINT_RANGE, "0,64,1"),
+               "set_detection_threads", "get_detection_threads");
+  ADD_PROPERTY(PropertyInfo(Variant::FLOAT, "frame_scale", PROPERTY_HINT_RANGE,
+                            "0.1,1,0.05"),
+               "set_frame_scale", "get_frame_scale");
+  ADD_PROPERTY(PropertyInfo(Variant::FLOAT, "detection_scale",
+                            PROPERTY_HINT_RANGE, "0.1,1,0.05"),
+               "set_detection_scale", "get_detection_scale");
+
+  ADD_GROUP("Head Pose", "");
+  ADD_PROPERTY(PropertyInfo(Variant::INT, "position_mode", PROPERTY_HINT_ENUM,
+                            "Screen,Head Pose"),
+               "set_position_mode", "get_position_mode");
+  ADD_PROPERTY(PropertyInfo(Variant::FLOAT, "camera_fov_degrees",
+                            PROPERTY_HINT_RANGE, "20,150,0.1,degrees"),
+               "set_camera_fov_degrees", "get_camera_fov_degrees");
+  ADD_PROPERTY(PropertyInfo(Variant::FLOAT, "head_pose_scale",
+                            PROPERTY_HINT_RANGE, "0.01,100,0.01,or_greater"),
+               "set_head_pose_scale", "get_head_pose_scale");
+  ADD_PROPERTY(PropertyInfo(Variant::VECTOR3, "webcam_offset",
+                            PROPERTY_HINT_NONE, "suffix:m"),
+               "set_webcam_offset", "get_webcam_offset");
+
+  ADD_GROUP("Screen", "");
+  ADD_PROPERTY(PropertyInfo(Variant::BOOL, "off_axis_projection"),
+               "set_off_axis_projection", "is_off_axis_projection");
+  ADD_PROPERTY(PropertyInfo(Variant::VECTOR2, "screen_size",
+                            PROPERTY_HINT_NONE, "suffix:m"),
+               "set_screen_size", "get_screen_size");
+
+  ADD_GROUP("Filtering", "");
+  ADD_PROPERTY(PropertyInfo(Variant::INT, "filter_mode", PROPERTY_HINT_ENUM,
+                            "None,Exponential,One Euro,Kalman"),
+               "set_filter_mode", "get_filter_mode");
+  ADD_PROPERTY(PropertyInfo(Variant::FLOAT, "filter_min_cutoff",
+                            PROPERTY_HINT_RANGE, "0.01,10,0.01"),
+               "set_filter_min_cutoff", "get_filter_min_cutoff");
+  ADD_PROPERTY(PropertyInfo(Variant::FLOAT, "filter_beta", PROPERTY_HINT_RANGE,
+                            "0,10,0.01"),
+               "set_filter_beta", "get_filter_beta");
+  ADD_PROPERTY(PropertyInfo(Variant::FLOAT, "filter_process_noise",
+                            PROPERTY_HINT_RANGE, "0,1000,0.1,or_greater"),
+               "set_filter_process_noise", "get_filter_process_noise");
+  ADD_PROPERTY(PropertyInfo(Variant::FLOAT, "filter_measurement_noise",
+                            PROPERTY_HINT_RANGE, "0.000001,1,0.000001"),
+               "set_filter_measurement_noise", "get_filter_measurement_noise");
+  ADD_PROPERTY(PropertyInfo(Variant::FLOAT, "prediction_lead_msec",
+                            PROPERTY_HINT_RANGE, "0,100,0.1"),
+               "set_prediction_lead_msec", "get_prediction_lead_msec");
+
+  BIND_ENUM_CONSTANT(TRACKER_HAAR_EYE);
+  BIND_ENUM_CONSTANT(TRACKER_DLIB_LANDMARKS);
+  BIND_ENUM_CONSTANT(TRACKER_DNN_FACE);
+  BIND_ENUM_CONSTANT(FILTER_NONE);
+  BIND_ENUM_CONSTANT(FILTER_EXPONENTIAL);
+  BIND_ENUM_CONSTANT(FILTER_ONE_EURO);
+  BIND_ENUM_CONSTANT(FILTER_KALMAN);
+  BIND_ENUM_CONSTANT(POSITION_SCREEN);
+  BIND_ENUM_CONSTANT(POSITION_HEAD_POSE);
+}
 
 CameraExtension::CameraExtension() {
   time_passed = 0.0;
-  previousEyeScreenCoords = {0.0, 0.0};
-  rawEyeScreenCoords = {0.0, 0.0};
-
-  load_model();
-  open_camera();
+  vision_running = false;
+  tracker_backend = TRACKER_HAAR_EYE;
+  active_backend = NO_BACKEND;
+  tracker_ready = false;
+  last_tracking_result = {};
+  has_performance_monitors = false;
+  capture_usec = 0;
+  failed_reads = 0;
+  detection_interval = DEFAULT_DETECTION_INTERVAL;
+  roi_margin = DEFAULT_ROI_MARGIN;
+  detection_threads = 0;
+  motion_threshold = DEFAULT_MOTION_THRESHOLD;
+  max_static_frames = DEFAULT_MAX_STATIC_FRAMES;
+  has_motion_reference = false;
+  static_frames = 0;
+  auto_detection_threads = MAX(OS::get_singleton()->get_processor_count() /
+                                   AUTO_DETECTION_THREADS_DIVISOR,
+                               1);
+  position_mode = POSITION_SCREEN;
+  camera_fov_degrees = DEFAULT_CAMERA_FOV_DEGREES;
+  has_head_pose = false;
+  head_pose_scale = DEFAULT_HEAD_POSE_SCALE;
+  webcam_offset = DEFAULT_WEBCAM_OFFSET;
+  off_axis_projection = false;
+  screen_size = DEFAULT_SCREEN_SIZE;
+  projection_before_off_axis = PROJECTION_PERSPECTIVE;
+  size_before_off_axis = 1.0f;
+  frame_scale = DEFAULT_FRAME_SCALE;
+  detection_scale = DEFAULT_DETECTION_SCALE;
+  active_detection_scale = DEFAULT_DETECTION_SCALE;
+  frame_index = 0;
+  capture_mode = {DEFAULT_CAPTURE_WIDTH, DEFAULT_CAPTURE_HEIGHT,
+                  DEFAULT_CAPTURE_FPS, DEFAULT_CAPTURE_FOURCC,
+                  DEFAULT_CAPTURE_BUFFER_SIZE};
+  has_obtained_mode = false;
+  drained_frames = 0;
+  reopen_requested = false;
+#ifdef DEBUG_ENABLED
+  frame_allocations = 0;
+  total_frame_allocations = 0;
+#endif
+  pose_filter.exponential_alpha = ALPHA;
+  prediction_lead_msec = 0.0;
 
   godot::UtilityFunctions::print("CameraExtension instantiated");
 }
 
 CameraExtension::~CameraExtension() {
-  this->capture.release();
+  this->stop_vision_thread();
+  if (this->frame_source) {
+    this->frame_source->release();
+  }
   godot::UtilityFunctions::print("camera device released");
   godot::UtilityFunctions::print("CameraExtension destroyed");
 }
 
-void CameraExtension::load_model() {
-  /*godot::UtilityFunctions::print("model path: ", MODEL_PATH);*/
+static std::string globalize_path(const String &p_path) {
+  return ProjectSettings::get_singleton()
+      ->globalize_path(p_path)
+      .utf8()
+      .get_data();
+}
+
+std::unique_ptr<HeadTracker>
+CameraExtension::create_tracker(TrackerBackend p_backend) {
+  switch (p_backend) {
+  case TRACKER_DLIB_LANDMARKS:
+    return std::make_unique<DlibFaceTracker>(globalize_path(MODEL_PATH));
+  case TRACKER_DNN_FACE:
+    return std::make_unique<DnnFaceTracker>(globalize_path(DNN_MODEL_PATH),
+                                            globalize_path(DNN_CONFIG_PATH));
+  case TRACKER_HAAR_EYE:
+  default:
+    return std::make_unique<HaarEyeTracker>(globalize_path(HAAR_CASCADE_PATH));
+  }
+}
 
-  // TODO these dlib calls cause the object to be destroyed then re-created
-  this->left_eye_detector = cv::CascadeClassifier(HAAR_CASCADE_PATH);
-  godot::UtilityFunctions::print("instantiated face detector");
-  this->pose_model = dlib::shape_predictor();
-  godot::UtilityFunctions::print("instantiated pose model");
+void CameraExtension::load_model() {
+  this->tracker_ready = false;
+  this->active_backend = this->tracker_backend;
+  this->tracker = create_tracker((TrackerBackend)this->active_backend);
+  this->head_pose.reset();
 
-  try {
-    dlib::deserialize(MODEL_PATH) >> this->pose_model;
-  } catch (const dlib::serialization_error &e) {
-    godot::UtilityFunctions::print("failed to load model: ", e.what());
-  } catch (const std::exception &e) {
-    godot::UtilityFunctions::print("general error: ", e.what());
-  } catch (...) {
-    godot::UtilityFunctions::print("unknown error");
+  if (!this->tracker->load()) {
+    godot::UtilityFunctions::print("tracker backend ",
+                                   this->tracker->get_name(),
+                                   " is unavailable");
+    this->tracker.reset();
+    return;
   }
 
-  godot::UtilityFunctions::print("loaded model");
+  godot::UtilityFunctions::print("using tracker backend ",
+                                 this->tracker->get_name());
+  this->tracker_ready = true;
 }
 
+bool CameraExtension::is_tracker_ready() const { return this->tracker_ready; }
+
 void CameraExtension::open_camera() {
-  this->capture = cv::VideoCapture();
+  if (this->frame_source) {
+    this->frame_source->release();
+  }
+
+  String path;
+  CaptureMode mode;
+  {
+    std::lock_guard<std::mutex> lock(this->capture_settings_mutex);
+    path = this->replay_path;
+    mode = this->capture_mode;
+  }
+
+  if (path.is_empty()) {
+    this->frame_source = std::make_unique<CameraFrameSource>(0, mode);
+  } else {
+    this->frame_source =
+        std::make_unique<ReplayFrameSource>(globalize_path(path), true, true);
+  }
 
   godot::UtilityFunctions::print("instantiated capture");
 
-  if (!this->capture.open(0, cv::CAP_V4L2)) {
-    godot::UtilityFunctions::print("failed to open camera device");
+  this->failed_reads = 0;
+  bool opened = this->frame_source->open();
+  this->publish_obtained_mode();
+  if (!opened) {
     return;
   }
 
-  if (CAMERA_WIDTH != -1 && CAMERA_HEIGHT != -1) {
-    this->capture.set(cv::CAP_PROP_FRAME_WIDTH, CAMERA_WIDTH);
-    this->capture.set(cv::CAP_PROP_FRAME_HEIGHT, CAMERA_HEIGHT);
+  this->allocate_frame_buffers();
+}
+
+void CameraExtension::publish_obtained_mode() {
+  std::lock_guard<std::mutex> lock(this->obtained_mode_mutex);
+  this->has_obtained_mode =
+      this->frame_source && this->frame_source->is_opened();
+  this->obtained_mode =
+      this->has_obtained_mode ? this->frame_source->get_mode() : CaptureMode();
+  this->drained_frames = 0;
+}
+
+void CameraExtension::reopen_camera() {
+  if (this->vision_running) {
+    this->reopen_requested = true;
+    return;
+  }
 
-    godot::UtilityFunctions::print("set camera resolution to ", CAMERA_WIDTH,
-                                   "x", CAMERA_HEIGHT);
+  // the vision thread opens the new source when it starts
+  this->reopen_requested = false;
+  if (this->frame_source) {
+    this->frame_source->release();
+    this->frame_source.reset();
   }
+  this->publish_obtained_mode();
 }
 
-void CameraExtension::smooth_coordinates() {
-  // negatives coords when no face is detected
-  if (this->previousEyeScreenCoords.x < 0 ||
-      this->previousEyeScreenCoords.y < 0) {
-    this->smoothedEyeScreenCoords = this->rawEyeScreenCoords;
+void CameraExtension::set_replay_path(const String &p_path) {
+  if (p_path == this->replay_path) {
+    return;
+  }
+  {
+    std::lock_guard<std::mutex> lock(this->capture_settings_mutex);
+    this->replay_path = p_path;
+  }
+  this->reopen_camera();
+}
+
+String CameraExtension::get_replay_path() const { return this->replay_path; }
+
+// the setters below only reopen the camera when the mode changes, opening a
+// V4L2 device being slow
+void CameraExtension::set_capture_width(int p_width) {
+  p_width = MAX(p_width, -1);
+  if (p_width == this->capture_mode.width) {
+    return;
+  }
+  {
+    std::lock_guard<std::mutex> lock(this->capture_settings_mutex);
+    this->capture_mode.width = p_width;
+  }
+  this->reopen_camera();
+}
+
+int CameraExtension::get_capture_width() const {
+  return this->capture_mode.width;
+}
+
+void CameraExtension::set_capture_height(int p_height) {
+  p_height = MAX(p_height, -1);
+  if (p_height == this->capture_mode.height) {
+    return;
+  }
+  {
+    std::lock_guard<std::mutex> lock(this->capture_settings_mutex);
+    this->capture_mode.height = p_height;
+  }
+  this->reopen_camera();
+}
+
+int CameraExtension::get_capture_height() const {
+  return this->capture_mode.height;
+}
+
+void CameraExtension::set_capture_fps(double p_fps) {
+  p_fps = MAX(p_fps, 0.0);
+  if (p_fps == this->capture_mode.fps) {
+    return;
+  }
+  {
+    std::lock_guard<std::mutex> lock(this->capture_settings_mutex);
+    this->capture_mode.fps = p_fps;
+  }
+  this->reopen_camera();
+}
+
+double CameraExtension::get_capture_fps() const {
+  return this->capture_mode.fps;
+}
+
+void CameraExtension::set_capture_fourcc(const String &p_fourcc) {
+  std::string fourcc = p_fourcc.strip_edges().to_upper().utf8().get_data();
+  if (!fourcc.empty() && fourcc.size() != 4) {
+    godot::UtilityFunctions::print("invalid capture format ", p_fourcc,
+                                   ", expected four characters");
+    return;
+  }
+  if (fourcc == this->capture_mode.fourcc) {
+    return;
+  }
+  {
+    std::lock_guard<std::mutex> lock(this->capture_settings_mutex);
+    this->capture_mode.fourcc = fourcc;
+  }
+  this->reopen_camera();
+}
+
+String CameraExtension::get_capture_fourcc() const {
+  return String(this->capture_mode.fourcc.c_str());
+}
+
+void CameraExtension::set_capture_buffer_size(int p_size) {
+  p_size = MAX(p_size, 0);
+  if (p_size == this->capture_mode.buffer_size) {
+    return;
+  }
+  {
+    std::lock_guard<std::mutex> lock(this->capture_settings_mutex);
+    this->capture_mode.buffer_size = p_size;
+  }
+  this->reopen_camera();
+}
+
+int CameraExtension::get_capture_buffer_size() const {
+  return this->capture_mode.buffer_size;
+}
+
+Dictionary CameraExtension::get_capture_mode() const {
+  Dictionary mode;
+  CaptureMode obtained;
+  {
+    std::lock_guard<std::mutex> lock(this->obtained_mode_mutex);
+    if (!this->has_obtained_mode) {
+      return mode;
+    }
+    obtained = this->obtained_mode;
+  }
+
+  mode["width"] = obtained.width;
+  mode["height"] = obtained.height;
+  mode["fps"] = obtained.fps;
+  mode["fourcc"] = String(obtained.fourcc.c_str());
+  mode["buffer_size"] = obtained.buffer_size;
+  mode["drained_frames"] = this->drained_frames.load();
+  return mode;
+}
+
+Dictionary CameraExtension::run_benchmark(const String &p_replay_path,
+                                          const String &p_reference_path) {
+  Dictionary results;
+
+  BenchmarkAccuracy accuracy;
+  if (!p_reference_path.is_empty() &&
+      !accuracy.load_reference(globalize_path(p_reference_path))) {
+    godot::UtilityFunctions::print("failed to load reference coordinates ",
+                                   p_reference_path);
+  }
+
+  static_assert(std::size(TRACKER_BACKEND_NAMES) == TRACKER_BACKEND_MAX);
+
+  // the benchmark borrows the pipeline, the vision thread must not run
+  bool was_running = this->vision_running;
+  this->stop_vision_thread();
+  std::unique_ptr<FrameSource> live_source = std::move(this->frame_source);
+  int live_backend = this->tracker_backend;
+  // timings must measure the detectors, not frames skipped by the motion gate
+  int live_max_static_frames = this->max_static_frames;
+  this->max_static_frames = 0;
+
+  for (int backend = 0; backend < TRACKER_BACKEND_MAX; backend++) {
+    this->tracker_backend = backend;
+    this->load_model();
+    this->has_motion_reference = false;
+    this->static_frames = 0;
+
+    Dictionary backend_results;
+    results[TRACKER_BACKEND_NAMES[backend]] = backend_results;
+
+    if (!this->tracker) {
+      backend_results["error"] = "model unavailable";
+      continue;
+    }
+
+    auto replay = std::make_unique<ReplayFrameSource>(
+        globalize_path(p_replay_path), false, false);
+    ReplayFrameSource *replay_source = replay.get();
+    if (!replay->open()) {
+      backend_results["error"] = "replay unavailable";
+      continue;
+    }
+    this->frame_source = std::move(replay);
+    this->allocate_frame_buffers();
+    this->pipeline_stats.reset();
+    accuracy.reset();
+
+    int detections = 0;
+    EyeScreenCoords coords;
+    uint64_t start_usec = PipelineStats::get_ticks_usec();
+    while (true) {
+      bool found = this->resolve_eye_coords(coords);
+      if (!this->frame_source->is_opened()) {
+        // end of the recording
+        break;
+      }
+      if (!found) {
+        continue;
+      }
+
+      detections++;
+      // reference coordinates are in capture pixels
+      float capture_scale =
+          (float)this->frame_ring[this->frame_index].capture.cols /
+          this->frame.cols;
+      accuracy.add(replay_source->get_frame_index(),
+                   this->tracker_result.point * capture_scale);
+    }
+    double elapsed_sec = (PipelineStats::get_ticks_usec() - start_usec) / 1e6;
+    int frames = replay_source->get_frame_index() + 1;
+
+    backend_results["frames"] = frames;
+    backend_results["fps"] = elapsed_sec > 0 ? frames / elapsed_sec : 0.0;
+    backend_results["detection_rate"] =
+        frames > 0 ? (double)detections / frames : 0.0;
+    backend_results["stages"] = this->pipeline_stats.to_dictionary();
+    if (accuracy.has_reference()) {
+      backend_results["matched_frames"] = accuracy.get_matched_frames();
+      backend_results["mean_error_px"] = accuracy.get_mean_error();
+      backend_results["jitter_px"] = accuracy.get_jitter();
+    }
+  }
+
+  this->frame_source = std::move(live_source);
+  this->tracker_backend = live_backend;
+  this->max_static_frames = live_max_static_frames;
+  this->has_motion_reference = false;
+  // reloaded by the vision thread
+  this->tracker.reset();
+  this->tracker_ready = false;
+  this->active_backend = NO_BACKEND;
+  this->allocate_frame_buffers();
+  this->pipeline_stats.reset();
+
+  if (was_running) {
+    this->start_vision_thread();
+  }
+
+  return results;
+}
+
+void CameraExtension::set_tracker_backend(TrackerBackend p_backend) {
+  ERR_FAIL_INDEX(p_backend, TRACKER_BACKEND_MAX);
+  // the vision thread loads the new backend before its next detection
+  this->tracker_backend = p_backend;
+}
+
+CameraExtension::TrackerBackend CameraExtension::get_tracker_backend() const {
+  return (TrackerBackend)(int)this->tracker_backend;
+}
+
+Dictionary CameraExtension::get_tracker_status() const {
+  const TrackingResult &result = this->last_tracking_result;
+
+  Dictionary status;
+  status["backend"] = result.backend;
+  status["has_face"] = result.has_face;
+  status["confidence"] = result.confidence;
+  status["detect_msec"] = result.detect_msec;
+  status["landmark_msec"] = result.landmark_msec;
+  status["has_head_pose"] = result.has_head_pose;
+  return status;
+}
+
+Dictionary CameraExtension::get_pipeline_stats() const {
+  return this->pipeline_stats.to_dictionary();
+}
+
+void CameraExtension::add_performance_monitors() {
+  Performance *performance = Performance::get_singleton();
+  // monitors are global, only the first instance in the tree reports
+  if (performance->has_custom_monitor(LATENCY_MONITOR)) {
+    return;
+  }
+
+  performance->add_custom_monitor(
+      LATENCY_MONITOR,
+      callable_mp(this, &CameraExtension::get_latency_monitor));
+  performance->add_custom_monitor(
+      DETECT_MONITOR, callable_mp(this, &CameraExtension::get_detect_monitor));
+  performance->add_custom_monitor(
+      DROPPED_FRAMES_MONITOR,
+      callable_mp(this, &CameraExtension::get_dropped_frames_monitor));
+  this->has_performance_monitors = true;
+}
+
+void CameraExtension::remove_performance_monitors() {
+  if (!this->has_performance_monitors) {
+    return;
+  }
+
+  Performance *performance = Performance::get_singleton();
+  performance->remove_custom_monitor(LATENCY_MONITOR);
+  performance->remove_custom_monitor(DETECT_MONITOR);
+  performance->remove_custom_monitor(DROPPED_FRAMES_MONITOR);
+  this->has_performance_monitors = false;
+}
+
+double CameraExtension::get_latency_monitor() const {
+  return this->pipeline_stats.get_percentiles(STAGE_LATENCY).p95;
+}
+
+double CameraExtension::get_detect_monitor() const {
+  return this->pipeline_stats.get_percentiles(STAGE_DETECT).p95;
+}
+
+uint64_t CameraExtension::get_dropped_frames_monitor() const {
+  return this->pipeline_stats.dropped_frames;
+}
+
+void CameraExtension::set_filter_mode(FilterMode p_mode) {
+  this->pose_filter.mode = (PoseFilter::Mode)p_mode;
+  this->pose_filter.reset();
+}
+
+CameraExtension::FilterMode CameraExtension::get_filter_mode() const {
+  return (FilterMode)this->pose_filter.mode;
+}
+
+void CameraExtension::set_filter_min_cutoff(double p_min_cutoff) {
+  this->pose_filter.min_cutoff = MAX(p_min_cutoff, 0.001);
+}
+
+double CameraExtension::get_filter_min_cutoff() const {
+  return this->pose_filter.min_cutoff;
+}
+
+void CameraExtension::set_filter_beta(double p_beta) {
+  this->pose_filter.beta = MAX(p_beta, 0.0);
+}
+
+double CameraExtension::get_filter_beta() const {
+  return this->pose_filter.beta;
+}
+
+void CameraExtension::set_filter_process_noise(double p_noise) {
+  this->pose_filter.process_noise = MAX(p_noise, 0.0);
+}
+
+double CameraExtension::get_filter_process_noise() const {
+  return this->pose_filter.process_noise;
+}
+
+void CameraExtension::set_filter_measurement_noise(double p_noise) {
+  this->pose_filter.measurement_noise = MAX(p_noise, 0.000001);
+}
+
+double CameraExtension::get_filter_measurement_noise() const {
+  return this->pose_filter.measurement_noise;
+}
+
+void CameraExtension::set_prediction_lead_msec(double p_msec) {
+  this->prediction_lead_msec = MAX(p_msec, 0.0);
+}
+
+double CameraExtension::get_prediction_lead_msec() const {
+  return this->prediction_lead_msec;
+}
+
+void CameraExtension::set_detection_interval(int p_frames) {
+  this->detection_interval = p_frames < 1 ? 1 : p_frames;
+}
+
+int CameraExtension::get_detection_interval() const {
+  return this->detection_interval;
+}
+
+void CameraExtension::set_roi_margin(float p_margin) {
+  this->roi_margin = p_margin < 0 ? 0 : p_margin;
+}
+
+float CameraExtension::get_roi_margin() const { return this->roi_margin; }
+
+void CameraExtension::set_motion_threshold(float p_threshold) {
+  this->motion_threshold = MAX(p_threshold, 0.0f);
+}
+
+float CameraExtension::get_motion_threshold() const {
+  return this->motion_threshold;
+}
+
+void CameraExtension::set_max_static_frames(int p_frames) {
+  this->max_static_frames = MAX(p_frames, 0);
+}
+
+int CameraExtension::get_max_static_frames() const {
+  return this->max_static_frames;
+}
+
+void CameraExtension::set_detection_threads(int p_threads) {
+  this->detection_threads = MAX(p_threads, 0);
+}
+
+int CameraExtension::get_detection_threads() const {
+  return this->detection_threads;
+}
+
+void CameraExtension::set_frame_scale(float p_scale) {
+  this->frame_scale = CLAMP(p_scale, 0.1f, 1.0f);
+}
+
+void CameraExtension::set_position_mode(PositionMode p_mode) {
+  this->position_mode = p_mode;
+  // the units change, don't smooth across them
+  this->pose_filter.reset();
+}
+
+CameraExtension::PositionMode CameraExtension::get_position_mode() const {
+  return (PositionMode)(int)this->position_mode;
+}
+
+void CameraExtension::set_camera_fov_degrees(float p_degrees) {
+  this->camera_fov_degrees = CLAMP(p_degrees, 1.0f, 179.0f);
+}
+
+float CameraExtension::get_camera_fov_degrees() const {
+  return this->camera_fov_degrees;
+}
+
+void CameraExtension::set_head_pose_scale(double p_scale) {
+  this->head_pose_scale = MAX(p_scale, 0.0);
+}
+
+double CameraExtension::get_head_pose_scale() const {
+  return this->head_pose_scale;
+}
+
+void CameraExtension::set_webcam_offset(const Vector3 &p_offset) {
+  this->webcam_offset = p_offset;
+}
+
+Vector3 CameraExtension::get_webcam_offset() const {
+  return this->webcam_offset;
+}
+
+void CameraExtension::set_off_axis_projection(bool p_enabled) {
+  if (p_enabled == this->off_axis_projection) {
+    return;
+  }
+  this->off_axis_projection = p_enabled;
+  if (p_enabled) {
+    this->projection_before_off_axis = this->get_projection();
+    this->size_before_off_axis = this->get_size();
+    this->frustum_offset_before_off_axis = this->get_frustum_offset();
   } else {
-    this->smoothedEyeScreenCoords = {
-        ALPHA * this->rawEyeScreenCoords.x +
-            (1 - ALPHA) * this->previousEyeScreenCoords.x,
-        ALPHA * this->rawEyeScreenCoords.y +
-            (1 - ALPHA) * this->previousEyeScreenCoords.y};
+    // `set_frustum` overwrote the size and offset of a frustum camera too
+    this->set_size(this->size_before_off_axis);
+    this->set_frustum_offset(this->frustum_offset_before_off_axis);
+    this->set_projection(this->projection_before_off_axis);
   }
+}
+
+bool CameraExtension::is_off_axis_projection() const {
+  return this->off_axis_projection;
+}
+
+void CameraExtension::set_screen_size(const Vector2 &p_size) {
+  this->screen_size = Vector2(MAX(p_size.x, 0.01f), MAX(p_size.y, 0.01f));
+}
 
-  this->previousEyeScreenCoords = {this->smoothedEyeScreenCoords.x,
-                                   this->smoothedEyeScreenCoords.y};
+Vector2 CameraExtension::get_screen_size() const { return this->screen_size; }
+
+void CameraExtension::apply_off_axis_projection(const Vector3 &p_eye_position) {
+  float near = this->get_near();
+  // the screen can't get closer than the near plane without being clipped
+  float distance = MAX(p_eye_position.z, near);
+  // the screen edges, seen from the eye, projected on the near plane
+  float near_ratio = near / distance;
+
+  float screen_extent = this->get_keep_aspect_mode() == KEEP_WIDTH
+                            ? this->screen_size.x
+                            : this->screen_size.y;
+  float size = screen_extent * this->head_pose_scale * near_ratio;
+  Vector2 offset(-p_eye_position.x * near_ratio,
+                 -p_eye_position.y * near_ratio);
+
+  // a single projection update, unlike rendering a wider view to reproject it
+  this->set_frustum(size, offset, near, this->get_far());
+}
+
+float CameraExtension::get_frame_scale() const { return this->frame_scale; }
+
+void CameraExtension::set_detection_scale(float p_scale) {
+  this->detection_scale = CLAMP(p_scale, 0.1f, 1.0f);
+}
+
+float CameraExtension::get_detection_scale() const {
+  return this->detection_scale;
+}
+
+int CameraExtension::get_frame_allocations() const {
+#ifdef DEBUG_ENABLED
+  return this->frame_allocations;
+#else
+  return -1;
+#endif
+}
+
+int64_t CameraExtension::get_total_frame_allocations() const {
+#ifdef DEBUG_ENABLED
+  return this->total_frame_allocations;
+#else
+  return -1;
+#endif
+}
+
+static cv::Size scale_size(const cv::Size &size, float scale) {
+  return cv::Size(cvRound(size.width * scale), cvRound(size.height * scale));
 }
 
-EyeScreenCoords CameraExtension::dlib_resolve_eye_coords() {
-  this->capture >> this->frame;
-  if (this->frame.empty()) {
-    godot::UtilityFunctions::print("failed to read frame");
-    return {-1.0, -1.0};
+void CameraExtension::allocate_frame_buffers() {
+  if (!this->frame_source) {
+    return;
   }
 
-  // cv::imshow("current frame", frame);
-  // cv::waitKey(0);
-  // cv::destroyWindow("current frame");
+  cv::Size capture_size = this->frame_source->get_size();
+  if (capture_size.empty()) {
+    // the first frames will size the buffers
+    return;
+  }
+
+  cv::Size frame_size = scale_size(capture_size, this->frame_scale);
+  cv::Size detection_size = scale_size(frame_size, this->detection_scale);
 
-  if (INPUT_FRAME_SCALE_FACTOR != 1.0) {
-    godot::UtilityFunctions::print("downscaling frame");
-    cv::resize(this->frame, this->frame, cv::Size(), INPUT_FRAME_SCALE_FACTOR,
-               INPUT_FRAME_SCALE_FACTOR);
+  for (FrameBuffers &buffers : this->frame_ring) {
+    buffers.capture.create(capture_size, CV_8UC3);
+    buffers.scaled.create(frame_size, CV_8UC3);
+    buffers.gray.create(frame_size, CV_8UC1);
+    buffers.detection.create(detection_size, CV_8UC1);
   }
 
-  // TODO is allocation of cv::Mats expensive ? or any other allocation in this
-  // function ?
-  cv::Mat gray;
-  cv::cvtColor(this->frame, gray, cv::COLOR_BGR2GRAY);
+  godot::UtilityFunctions::print("allocated frame buffers for ",
+                                 capture_size.width, "x", capture_size.height,
+                                 " frames");
+}
 
-  auto cimg = dlib::cv_image<dlib::bgr_pixel>(frame);
+bool CameraExtension::prepare_frames() {
+  // every buffer below is only reallocated when the capture resolution or a
+  // scale property changes, `Mat::create` being a no-op otherwise
+  this->frame_index = (this->frame_index + 1) % FRAME_RING_SIZE;
+  FrameBuffers &buffers = this->frame_ring[this->frame_index];
 
-  auto startTime = std::chrono::high_resolution_clock::now();
-  auto faces = this->face_detector(cimg);
-  auto duration = std::chrono::duration_cast<std::chrono::milliseconds>(
-                      std::chrono::high_resolution_clock::now() - startTime)
-                      .count();
-  godot::UtilityFunctions::print("face detector took ", duration, "ms");
+#ifdef DEBUG_ENABLED
+  const uchar *previous_data[] = {buffers.capture.data, buffers.scaled.data,
+                                  buffers.gray.data, buffers.detection.data};
+#endif
 
-  if (faces.empty()) {
-    return {-1.0, -1.0};
+  uint64_t start_usec = PipelineStats::get_ticks_usec();
+  if (!this->frame_source->read(buffers.capture)) {
+    this->pipeline_stats.failed_captures++;
+    this->failed_reads++;
+    if (!this->frame_source->is_opened()) {
+      // end of a recording, or closed below
+      return false;
+    }
+    if (this->failed_reads == 1) {
+      godot::UtilityFunctions::print("failed to read frame");
+    }
+    if (this->failed_reads >= MAX_FAILED_READS) {
+      godot::UtilityFunctions::print("no frame in ", this->failed_reads,
+                                     " reads, closing the camera");
+      this->frame_source->release();
+      this->publish_obtained_mode();
+      return false;
+    }
+    // an unplugged or busy webcam often fails right away, don't spin on it
+    int backoff_ms = FAILED_READ_BACKOFF_MS << (this->failed_reads - 1);
+    std::this_thread::sleep_for(
+        std::chrono::milliseconds(MIN(backoff_ms, CAMERA_RETRY_MS)));
+    return false;
+  }
+  if (this->failed_reads > 0) {
+    godot::UtilityFunctions::print("reading frames again after ",
+                                   this->failed_reads, " failures");
+    this->failed_reads = 0;
   }
+  this->capture_usec = PipelineStats::get_ticks_usec();
+  this->drained_frames = this->frame_source->drained_frames.load();
+  this->pipeline_stats.record_since(STAGE_CAPTURE, start_usec);
 
-  this->face_rect = faces[0];
-  this->has_detected_face = true;
+  // cv::imshow("current frame", frame);
+  // cv::waitKey(0);
+  // cv::destroyWindow("current frame");
 
-  startTime = std::chrono::high_resolution_clock::now();
-  dlib::full_object_detection shape = this->pose_model(cimg, this->face_rect);
-  duration = std::chrono::duration_cast<std::chrono::milliseconds>(
-                 std::chrono::high_resolution_clock::now() - startTime)
-                 .count();
-  godot::UtilityFunctions::print("pose model took ", duration, "ms");
+  start_usec = PipelineStats::get_ticks_usec();
 
-  this->rawEyeScreenCoords = {(float)shape.part(NOSE_TIP_IDX).x(),
-                              (float)shape.part(NOSE_TIP_IDX).y()};
+  float frame_scale = this->frame_scale;
+  if (frame_scale != 1.0) {
+    cv::resize(buffers.capture, buffers.scaled,
+               scale_size(buffers.capture.size(), frame_scale), 0, 0,
+               cv::INTER_AREA);
+    this->frame = buffers.scaled;
+  } else {
+    this->frame = buffers.capture;
+  }
 
-  this->smooth_coordinates();
+  cv::cvtColor(this->frame, buffers.gray, cv::COLOR_BGR2GRAY);
+  this->gray = buffers.gray;
 
+  // detection cost grows with the pixel count, so the detectors run on a
+  // downscaled copy while landmarks are refined on the full resolution one
+  this->active_detection_scale = this->detection_scale;
+  if (this->active_detection_scale != 1.0) {
+    cv::resize(buffers.gray, buffers.detection,
+               scale_size(buffers.gray.size(), this->active_detection_scale),
+               0, 0, cv::INTER_AREA);
+    this->detection_frame = buffers.detection;
+  } else {
+    this->detection_frame = buffers.gray;
+  }
+
+  this->pipeline_stats.record_since(STAGE_CONVERT, start_usec);
+
+#ifdef DEBUG_ENABLED
+  const uchar *current_data[] = {buffers.capture.data, buffers.scaled.data,
+                                 buffers.gray.data, buffers.detection.data};
+  int allocations = 0;
+  for (int i = 0; i < 4; i++) {
+    allocations += current_data[i] != previous_data[i];
+  }
+  this->frame_allocations = allocations;
+  this->total_frame_allocations += allocations;
+#endif
+
+  return true;
+}
+
+EyeScreenCoords CameraExtension::normalize_coords(const cv::Point2f &p_point) {
   int screenWidth = this->frame.cols;
   int screenHeight = this->frame.rows;
 
   // normalize the coordinates over the screen matrix (frame)
   // `* 2 - 1` scales the normalized value from [0, 1] to [-1, 1]
-  float norm_x = (this->smoothedEyeScreenCoords.x / screenWidth) * 2 - 1;
+  float norm_x = (p_point.x / screenWidth) * 2 - 1;
   // invert the y axis since the screen coordinates have top-left origin
-  float norm_y = -((this->smoothedEyeScreenCoords.y / screenHeight) * 2 - 1);
+  float norm_y = -((p_point.y / screenHeight) * 2 - 1);
 
   return {norm_x, norm_y};
 }
 
-EyeScreenCoords CameraExtension::opencv_resolve_eye_coords() {
-  this->capture >> this->frame;
-  if (this->frame.empty()) {
-    godot::UtilityFunctions::print("failed to read frame");
-    return {-1.0, -1.0};
+void CameraExtension::update_motion_reference() {
+  this->has_motion_reference = false;
+
+  cv::Rect roi = HeadTracker::to_detection_rect(
+      {this->frame, this->gray, this->detection_frame,
+       this->active_detection_scale},
+      this->tracker_result.rect);
+  if (roi.empty()) {
+    return;
   }
 
-  // TODO is allocation of cv::Rects expensive ?
-  std::vector<cv::Rect> left_eye_rects;
-  this->left_eye_detector.detectMultiScale(this->frame, left_eye_rects);
+  cv::resize(this->detection_frame(roi), this->motion_reference,
+             MOTION_THUMBNAIL_SIZE, 0, 0, cv::INTER_AREA);
+  this->motion_frame_size = this->detection_frame.size();
+  this->has_motion_reference = true;
+  this->static_frames = 0;
+}
 
-  if (left_eye_rects.empty()) {
-    return {-1.0, -1.0};
+bool CameraExtension::is_static() {
+  if (!this->has_motion_reference || this->motion_threshold <= 0 ||
+      this->static_frames >= this->max_static_frames ||
+      // a scale property changed, the ROI doesn't match anymore
+      this->detection_frame.size() != this->motion_frame_size) {
+    return false;
   }
 
-  cv::Rect left_eye_rect = left_eye_rects[0];
+  uint64_t start_usec = PipelineStats::get_ticks_usec();
+  cv::Rect roi = HeadTracker::to_detection_rect(
+      {this->frame, this->gray, this->detection_frame,
+       this->active_detection_scale},
+      this->tracker_result.rect);
+  // both thumbnails are area averages, far cheaper than any detector
+  cv::resize(this->detection_frame(roi), this->motion_thumbnail,
+             MOTION_THUMBNAIL_SIZE, 0, 0, cv::INTER_AREA);
+  cv::absdiff(this->motion_thumbnail, this->motion_reference,
+              this->motion_difference);
+  double motion = cv::mean(this->motion_difference)[0];
+  this->pipeline_stats.record_since(STAGE_MOTION, start_usec);
 
-  this->rawEyeScreenCoords = {
-      (float)left_eye_rect.x + (float)left_eye_rect.width / 2,
-      (float)left_eye_rect.y + (float)left_eye_rect.height / 2};
+  if (motion >= this->motion_threshold) {
+    return false;
+  }
 
-  this->smooth_coordinates();
+  this->static_frames++;
+  return true;
+}
 
-  int screenWidth = this->frame.cols;
-  int screenHeight = this->frame.rows;
+bool CameraExtension::estimate_head_pose() {
+  const std::vector<cv::Point2f> *landmarks = this->tracker->get_landmarks();
+  if (this->position_mode != POSITION_HEAD_POSE || !landmarks) {
+    return true;
+  }
 
-  // normalize the coordinates over the screen matrix (frame)
-  // `* 2 - 1` scales the normalized value from [0, 1] to [-1, 1]
-  // invert the y axis since the screen coordinates have top-left origin
-  float norm_x = (this->smoothedEyeScreenCoords.x / screenWidth) * 2 - 1;
-  float norm_y = -((this->smoothedEyeScreenCoords.y / screenHeight) * 2 - 1);
+  uint64_t start_usec = PipelineStats::get_ticks_usec();
+  this->has_head_pose =
+      this->head_pose.solve(*landmarks, this->frame.size(),
+                            this->camera_fov_degrees, this->head_position);
+  this->pipeline_stats.record_since(STAGE_POSE, start_usec);
+  return this->has_head_pose;
+}
 
-  return {norm_x, norm_y};
+bool CameraExtension::resolve_eye_coords(EyeScreenCoords &r_coords) {
+  if (!this->prepare_frames()) {
+    this->tracker_result = {};
+    this->has_head_pose = false;
+    this->has_motion_reference = false;
+    return false;
+  }
+
+  if (this->is_static()) {
+    // the viewer didn't move, the last tracked point and head pose still hold
+    this->pipeline_stats.skipped_detections++;
+    r_coords = this->normalize_coords(this->tracker_result.point);
+    return true;
+  }
+
+  this->tracker_result = {};
+  this->has_head_pose = false;
+  this->has_motion_reference = false;
+
+  TrackerFrame tracker_frame = {this->frame, this->gray, this->detection_frame,
+                                this->active_detection_scale};
+  int detection_threads = this->detection_threads;
+  TrackerSettings tracker_settings = {
+      this->detection_interval, this->roi_margin,
+      detection_threads > 0 ? detection_threads : this->auto_detection_threads};
+  bool found = this->tracker->track(tracker_frame, tracker_settings,
+                                    this->tracker_result);
+  this->pipeline_stats.record(STAGE_DETECT, this->tracker_result.detect_msec);
+  if (!found) {
+    // the last pose is no good guess for a face found elsewhere
+    this->head_pose.reset();
+    return false;
+  }
+  this->pipeline_stats.record(STAGE_LANDMARK,
+                              this->tracker_result.landmark_msec);
+
+  if (!this->estimate_head_pose()) {
+    // an implausible fit, better skipped than mixed with screen coordinates
+    return false;
+  }
+
+  this->update_motion_reference();
+
+  r_coords = this->normalize_coords(this->tracker_result.point);
+  return true;
+}
+
+void CameraExtension::start_vision_thread() {
+  if (this->vision_running) {
+    return;
+  }
+
+  this->vision_running = true;
+  this->vision_thread = std::thread(&CameraExtension::vision_loop, this);
+  godot::UtilityFunctions::print("vision thread started");
+}
+
+void CameraExtension::stop_vision_thread() {
+  this->vision_running = false;
+
+  if (this->vision_thread.joinable()) {
+    // returns after the current capture and detection pass
+    this->vision_thread.join();
+    godot::UtilityFunctions::print("vision thread stopped");
+  }
+}
+
+void CameraExtension::vision_loop() {
+  int retry_ms = CAMERA_RETRY_MS;
+  while (this->vision_running) {
+    // opening the camera and deserializing a model take long enough to stall
+    // a frame, so both happen here rather than on the main thread
+    bool reopen = this->reopen_requested.exchange(false);
+    if (reopen || !this->frame_source) {
+      this->open_camera();
+      retry_ms = CAMERA_RETRY_MS;
+    }
+
+    if (!this->frame_source->is_opened()) {
+      // unplugged, busy or not there yet. stop and reopen requests are still
+      // checked every CAMERA_RETRY_MS
+      for (int waited_ms = 0; waited_ms < retry_ms && this->vision_running &&
+                              !this->reopen_requested;
+           waited_ms += CAMERA_RETRY_MS) {
+        std::this_thread::sleep_for(
+            std::chrono::milliseconds(CAMERA_RETRY_MS));
+      }
+      if (this->vision_running && !this->reopen_requested) {
+        this->open_camera();
+        retry_ms = this->frame_source->is_opened()
+                       ? CAMERA_RETRY_MS
+                       : MIN(retry_ms * 2, MAX_CAMERA_RETRY_MS);
+      }
+      continue;
+    }
+
+    if (this->tracker_backend != this->active_backend) {
+      this->load_model();
+      if (this->tracker) {
+        // signals must be emitted from the main thread
+        this->call_deferred("emit_signal", "tracker_ready",
+                            this->active_backend);
+      }
+    }
+
+    if (!this->tracker) {
+      // the selected backend failed to load, wait for another one
+      std::this_thread::sleep_for(std::chrono::milliseconds(CAMERA_RETRY_MS));
+      continue;
+    }
+
+    // blocks on the camera, which paces the loop to the capture rate
+    EyeScreenCoords newCoords = {0.0, 0.0};
+    bool has_face = this->resolve_eye_coords(newCoords);
+    this->pipeline_stats.processed_frames++;
+
+    TrackingResult &result = this->tracking_results.write_buffer();
+    result.coords = newCoords;
+    result.has_face = has_face;
+    result.backend = this->active_backend;
+    result.confidence = this->tracker_result.confidence;
+    result.detect_msec = this->tracker_result.detect_msec;
+    result.landmark_msec = this->tracker_result.landmark_msec;
+    result.has_head_pose = has_face && this->has_head_pose;
+    result.head_position = this->head_position;
+    result.capture_usec = this->capture_usec;
+    if (!this->tracking_results.publish()) {
+      this->pipeline_stats.dropped_frames++;
+    }
+  }
+}
+
+void CameraExtension::_ready() {
+  if (Engine::get_singleton()->is_editor_hint()) {
+    return;
+  }
+
+  this->start_vision_thread();
+  this->add_performance_monitors();
+}
+
+void CameraExtension::_exit_tree() {
+  this->remove_performance_monitors();
+  this->stop_vision_thread();
+  // restart the thread through `_ready` if the node re-enters the tree
+  this->request_ready();
 }
 
 void CameraExtension::_process(double delta) {
   // this->time_passed += delta;
   // godot::UtilityFunctions::print("time passed: ", this->time_passed);
 
-  auto startTime = std::chrono::high_resolution_clock::now();
-  EyeScreenCoords newCoords = this->opencv_resolve_eye_coords();
-  auto duration = std::chrono::duration_cast<std::chrono::milliseconds>(
-                      std::chrono::high_resolution_clock::now() - startTime)
-                      .count();
+  // never blocks: only picks up a result published since the last frame
+  bool has_new_result = this->tracking_results.consume();
 
-  // TODO robust error handling
-  if (newCoords.x == -1.0 && newCoords.y == -1.0) {
-    godot::UtilityFunctions::print("no faces detected");
-    return;
-  }
+  if (has_new_result) {
+    const TrackingResult &result = this->tracking_results.read_buffer();
+    this->last_tracking_result = result;
 
-  godot::UtilityFunctions::print("eye coords computation took ", duration,
-                                 "ms");
+    if (result.has_face) {
+      /*godot::UtilityFunctions::print("newCoords: ", result.coords.x, " , ",*/
+      /*                               result.coords.y);*/
+      Vector3 measurement(result.coords.x, result.coords.y, DEFAULT_Z);
+      if (result.has_head_pose) {
+        // webcam space mirrors the viewer's: image right is the viewer's left
+        // and its y axis points down, while z already points to the viewer
+        measurement = (this->webcam_offset +
+                       Vector3(-result.head_position.x,
+                               -result.head_position.y,
+                               result.head_position.z)) *
+                      this->head_pose_scale;
+      }
+      this->pose_filter.update(measurement, result.capture_usec / 1e6);
+    }
+    // a result without a face is reported by `get_tracker_status`
+  } else if (this->vision_running) {
+    this->pipeline_stats.stale_frames++;
+  }
 
-  /*godot::UtilityFunctions::print("newCoords: ", newCoords.x, " , ",*/
-  /*                               newCoords.y);*/
+  if (!this->pose_filter.is_ready()) {
+    return;
+  }
 
-  Vector3 new_position =
-      Vector3(newCoords.x, newCoords.y, DEFAULT_Z) * CAMERA_COORDS_SCALAR;
+  // the filter runs every frame, extrapolating between detections
+  uint64_t start_usec = PipelineStats::get_ticks_usec();
+  Vector3 new_position = this->pose_filter.predict(
+      start_usec / 1e6 + this->prediction_lead_msec / 1000.0);
+  this->pipeline_stats.record_since(STAGE_SMOOTH, start_usec);
 
+  start_usec = PipelineStats::get_ticks_usec();
+  new_position = new_position * CAMERA_COORDS_SCALAR;
   this->set_position(new_position);
+  if (this->off_axis_projection) {
+    this->apply_off_axis_projection(new_position);
+  }
+  this->pipeline_stats.record_since(STAGE_APPLY, start_usec);
+
+  if (has_new_result && this->last_tracking_result.has_face) {
+    this->pipeline_stats.record_since(STAGE_LATENCY,
+                                      this->last_tracking_result.capture_usec);
+  }
 }
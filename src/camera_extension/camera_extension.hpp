@@ -1,13 +1,21 @@
 #ifndef CAMERA_EXTENSION_HPP
 #define CAMERA_EXTENSION_HPP
 
-#include <dlib/image_processing.h>
-#include <dlib/image_processing/frontal_face_detector.h>
-#include <dlib/opencv.h>
+#include "frame_source.hpp"
+#include "head_pose.hpp"
+#include "head_tracker.hpp"
+#include "pipeline_stats.hpp"
+#include "pose_filter.hpp"
+#include "triple_buffer.hpp"
+#include <atomic>
 #include <godot_cpp/classes/camera3d.hpp>
 #include <godot_cpp/core/class_db.hpp>
+#include <godot_cpp/variant/dictionary.hpp>
 #include <godot_cpp/variant/utility_functions.hpp>
+#include <memory>
+#include <mutex>
 #include <opencv2/opencv.hpp>
+#include <thread>
 
 namespace godot {
 struct EyeScreenCoords {
@@ -15,22 +23,190 @@ struct EyeScreenCoords {
   float y;
 };
 
+// result of one capture-and-detect pass of the vision thread
+struct TrackingResult {
+  EyeScreenCoords coords;
+  bool has_face;
+  // `CameraExtension::TrackerBackend` which produced the result
+  int backend;
+  float confidence;
+  double detect_msec;
+  double landmark_msec;
+  // head position in webcam space and meters, see `HeadPoseEstimator`
+  bool has_head_pose;
+  cv::Point3f head_position;
+  // `PipelineStats::get_ticks_usec()` right after the frame was captured
+  uint64_t capture_usec;
+};
+
+// frame buffers reused across captures, so the hot path doesn't allocate
+struct FrameBuffers {
+  cv::Mat capture;
+  cv::Mat scaled;
+  cv::Mat gray;
+  cv::Mat detection;
+};
+
 class CameraExtension : public Camera3D {
   GDCLASS(CameraExtension, Camera3D)
 
+public:
+  enum TrackerBackend {
+    TRACKER_HAAR_EYE,
+    TRACKER_DLIB_LANDMARKS,
+    TRACKER_DNN_FACE,
+    TRACKER_BACKEND_MAX,
+  };
+
+  enum FilterMode {
+    FILTER_NONE = PoseFilter::FILTER_NONE,
+    FILTER_EXPONENTIAL = PoseFilter::FILTER_EXPONENTIAL,
+    FILTER_ONE_EURO = PoseFilter::FILTER_ONE_EURO,
+    FILTER_KALMAN = PoseFilter::FILTER_KALMAN,
+  };
+
+  enum PositionMode {
+    // normalized tracked point at a fixed depth
+    POSITION_SCREEN,
+    // 3D head position fitted to the face landmarks, falls back to
+    // `POSITION_SCREEN` with backends which don't fit any
+    POSITION_HEAD_POSE,
+  };
+
 private:
-  dlib::frontal_face_detector face_detector;
-  cv::CascadeClassifier left_eye_detector;
-  dlib::shape_predictor pose_model;
+  std::unique_ptr<HeadTracker> tracker;
+  TrackerResult tracker_result;
+  // backend requested through the property, `active_backend` is swapped to
+  // it by the vision thread. `NO_BACKEND` until the first one is loaded
+  static constexpr int NO_BACKEND = -1;
+  std::atomic<int> tracker_backend;
+  int active_backend;
+  std::atomic<bool> tracker_ready;
+
+  static constexpr int FRAME_RING_SIZE = 2;
+  FrameBuffers frame_ring[FRAME_RING_SIZE];
+  int frame_index;
+
+  // views of the current `frame_ring` slot
   cv::Mat frame;
-  cv::VideoCapture capture;
-  bool has_detected_face;
-  dlib::rectangle face_rect;
+  // full resolution grayscale frame, landmarks are refined on it
+  cv::Mat gray;
+  // downscaled grayscale frame, the detectors run on it
+  cv::Mat detection_frame;
+
+#ifdef DEBUG_ENABLED
+  // buffer allocations made while preparing the last frame
+  std::atomic<int> frame_allocations;
+  std::atomic<int64_t> total_frame_allocations;
+#endif
+
+  std::unique_ptr<FrameSource> frame_source;
+  // set by the main thread when the settings below change, the vision thread
+  // then reopens `frame_source` with them
+  std::atomic<bool> reopen_requested;
+  // written by the main thread, copied by the vision thread to open the source
+  std::mutex capture_settings_mutex;
+  // requested from the webcam, the driver may settle for another mode
+  CaptureMode capture_mode;
+  // mode obtained by the vision thread when it opened `frame_source`, which
+  // the main thread must not touch while the thread runs
+  mutable std::mutex obtained_mode_mutex;
+  bool has_obtained_mode;
+  CaptureMode obtained_mode;
+  std::atomic<uint64_t> drained_frames;
+  void publish_obtained_mode();
+  // recorded session replayed instead of the camera, if not empty
+  String replay_path;
+
+  // passed to the tracker as `TrackerSettings` on every frame
+  std::atomic<int> detection_interval;
+  std::atomic<float> roi_margin;
+  // 0 to use `auto_detection_threads`
+  std::atomic<int> detection_threads;
+  int auto_detection_threads;
+
+  std::atomic<int> position_mode;
+  // horizontal field of view of the webcam, used by the head pose estimation
+  std::atomic<float> camera_fov_degrees;
+  HeadPoseEstimator head_pose;
+  // last fitted head position, set by `resolve_eye_coords`
+  bool has_head_pose;
+  cv::Point3f head_position;
+  // world units per meter of head movement in `POSITION_HEAD_POSE` mode
+  double head_pose_scale;
+  // webcam position relative to the screen center, in meters
+  Vector3 webcam_offset;
+
+  // returns false if the landmarks were fitted but gave no plausible pose
+  bool estimate_head_pose();
+
+  std::atomic<float> frame_scale;
+  std::atomic<float> detection_scale;
+  // `detection_scale` as of the frame being processed
+  float active_detection_scale;
+
+  // detection is skipped while the face ROI of the last detection stays
+  // still, compared on thumbnails of it
+  std::atomic<float> motion_threshold;
+  std::atomic<int> max_static_frames;
+  cv::Mat motion_reference;
+  cv::Mat motion_thumbnail;
+  cv::Mat motion_difference;
+  bool has_motion_reference;
+  cv::Size motion_frame_size;
+  int static_frames;
+
+  void allocate_frame_buffers();
+  bool prepare_frames();
+  EyeScreenCoords normalize_coords(const cv::Point2f &p_point);
+  void update_motion_reference();
+  // returns true if the last detection still holds for the current frame
+  bool is_static();
 
   int iterations;
   double time_passed;
-  EyeScreenCoords smoothedEyeScreenCoords, previousEyeScreenCoords,
-      rawEyeScreenCoords, finalEyeScreenCoords;
+
+  // only used by the main thread, which predicts the head position for every
+  // rendered frame from the results of the vision thread
+  PoseFilter pose_filter;
+  // how far past the current frame to predict, e.g. the display latency
+  double prediction_lead_msec;
+
+  // the screen is the z = 0 plane of the parent space, centered on its origin
+  // and `screen_size` meters wide and high. the frustum passes through its
+  // edges wherever the head is, so the screen behaves as a window
+  bool off_axis_projection;
+  Vector2 screen_size;
+  // the camera's own projection, restored when off-axis projection is disabled
+  ProjectionType projection_before_off_axis;
+  float size_before_off_axis;
+  Vector2 frustum_offset_before_off_axis;
+
+  void apply_off_axis_projection(const Vector3 &p_eye_position);
+
+  // the vision thread (producer) owns the capture and detection state above,
+  // the main thread (consumer) only reads the latest result in `_process`
+  std::thread vision_thread;
+  std::atomic<bool> vision_running;
+  TripleBuffer<TrackingResult> tracking_results;
+  // last result consumed by the main thread
+  TrackingResult last_tracking_result;
+
+  PipelineStats pipeline_stats;
+  bool has_performance_monitors;
+  // last captured frame, stamped by `prepare_frames`
+  uint64_t capture_usec;
+  // reads failed in a row, `prepare_frames` backs off and eventually closes
+  // the camera for the vision thread to reopen it
+  int failed_reads;
+
+  void add_performance_monitors();
+  void remove_performance_monitors();
+  double get_latency_monitor() const;
+  double get_detect_monitor() const;
+  uint64_t get_dropped_frames_monitor() const;
+
+  void vision_loop();
 
 protected:
   static void _bind_methods();
@@ -39,18 +215,105 @@ public:
   CameraExtension();
   ~CameraExtension();
 
+  static std::unique_ptr<HeadTracker> create_tracker(TrackerBackend p_backend);
+  // the vision thread loads the model and opens the camera when it starts,
+  // neither happens in the editor
   void load_model();
+  bool is_tracker_ready() const;
 
   void open_camera();
 
-  void smooth_coordinates();
+  // has the vision thread reopen the frame source, which takes too long for the
+  // main thread
+  void reopen_camera();
+
+  void set_replay_path(const String &p_path);
+  String get_replay_path() const;
+
+  void set_capture_width(int p_width);
+  int get_capture_width() const;
+  void set_capture_height(int p_height);
+  int get_capture_height() const;
+  void set_capture_fps(double p_fps);
+  double get_capture_fps() const;
+  void set_capture_fourcc(const String &p_fourcc);
+  String get_capture_fourcc() const;
+  void set_capture_buffer_size(int p_size);
+  int get_capture_buffer_size() const;
+  // mode actually obtained from the frame source
+  Dictionary get_capture_mode() const;
 
-  EyeScreenCoords dlib_resolve_eye_coords();
-  EyeScreenCoords opencv_resolve_eye_coords();
+  // runs a recorded session through every tracker backend as fast as
+  // possible, comparing the tracked points with the reference ones if given
+  Dictionary run_benchmark(const String &p_replay_path,
+                           const String &p_reference_path);
 
+  void set_tracker_backend(TrackerBackend p_backend);
+  TrackerBackend get_tracker_backend() const;
+  Dictionary get_tracker_status() const;
+  Dictionary get_pipeline_stats() const;
+
+  void set_filter_mode(FilterMode p_mode);
+  FilterMode get_filter_mode() const;
+  void set_filter_min_cutoff(double p_min_cutoff);
+  double get_filter_min_cutoff() const;
+  void set_filter_beta(double p_beta);
+  double get_filter_beta() const;
+  void set_filter_process_noise(double p_noise);
+  double get_filter_process_noise() const;
+  void set_filter_measurement_noise(double p_noise);
+  double get_filter_measurement_noise() const;
+  void set_prediction_lead_msec(double p_msec);
+  double get_prediction_lead_msec() const;
+
+  void set_detection_interval(int p_frames);
+  int get_detection_interval() const;
+  void set_roi_margin(float p_margin);
+  float get_roi_margin() const;
+  void set_detection_threads(int p_threads);
+  int get_detection_threads() const;
+  void set_motion_threshold(float p_threshold);
+  float get_motion_threshold() const;
+  void set_max_static_frames(int p_frames);
+  int get_max_static_frames() const;
+  void set_position_mode(PositionMode p_mode);
+  PositionMode get_position_mode() const;
+  void set_camera_fov_degrees(float p_degrees);
+  float get_camera_fov_degrees() const;
+  void set_head_pose_scale(double p_scale);
+  double get_head_pose_scale() const;
+
+  void set_webcam_offset(const Vector3 &p_offset);
+  Vector3 get_webcam_offset() const;
+  void set_off_axis_projection(bool p_enabled);
+  bool is_off_axis_projection() const;
+  void set_screen_size(const Vector2 &p_size);
+  Vector2 get_screen_size() const;
+
+  void set_frame_scale(float p_scale);
+  float get_frame_scale() const;
+  void set_detection_scale(float p_scale);
+  float get_detection_scale() const;
+
+  // -1 in release builds, where allocations aren't tracked
+  int get_frame_allocations() const;
+  int64_t get_total_frame_allocations() const;
+
+  // returns false if no head was tracked in the captured frame
+  bool resolve_eye_coords(EyeScreenCoords &r_coords);
+
+  void start_vision_thread();
+  void stop_vision_thread();
+
+  void _ready() override;
+  void _exit_tree() override;
   void _process(double delta) override;
 };
 
 } // namespace godot
 
+VARIANT_ENUM_CAST(CameraExtension::TrackerBackend);
+VARIANT_ENUM_CAST(CameraExtension::FilterMode);
+VARIANT_ENUM_CAST(CameraExtension::PositionMode);
+
 #endif
@@ -0,0 +1,155 @@
+#include "dlib_face_tracker.hpp"
+#include <godot_cpp/variant/utility_functions.hpp>
+
+const int NOSE_TIP_IDX = 30;
+const int LANDMARK_COUNT = 68;
+
+// initial capacity of the reused detection vectors
+const int MAX_DETECTIONS = 16;
+
+// the frontal face detector's `pyramid_down<6>` scales every level by 5/6
+const double PYRAMID_SCALE = 5.0 / 6.0;
+// `scan_fhog_pyramid` stops at layers smaller than this
+const int MIN_PYRAMID_LAYER_SIZE = 64;
+// no limit, the last band scans every level left
+const int ALL_LEVELS = 1000;
+
+using namespace godot;
+
+static ModelCache<dlib::shape_predictor> shape_predictors;
+
+DlibFaceTracker::DlibFaceTracker(const std::string &p_model_path)
+    : model_path(p_model_path) {
+  face_detector = dlib::get_frontal_face_detector();
+  landmarks.reserve(LANDMARK_COUNT);
+}
+
+bool DlibFaceTracker::load() {
+  /*godot::UtilityFunctions::print("model path: ", model_path.c_str());*/
+
+  try {
+    this->pose_model = shape_predictors.get(
+        this->model_path,
+        [](const std::string &p_path, dlib::shape_predictor &r_model) {
+          dlib::deserialize(p_path) >> r_model;
+        });
+  } catch (const dlib::serialization_error &e) {
+    godot::UtilityFunctions::print("failed to load model: ", e.what());
+    return false;
+  } catch (const std::exception &e) {
+    godot::UtilityFunctions::print("general error: ", e.what());
+    return false;
+  } catch (...) {
+    godot::UtilityFunctions::print("unknown error");
+    return false;
+  }
+
+  godot::UtilityFunctions::print("loaded model");
+  return true;
+}
+
+void DlibFaceTracker::prepare_band(Band &r_band, int p_max_levels) {
+  if (r_band.max_levels == p_max_levels) {
+    return;
+  }
+
+  // rebuilding processes the detector's filters, which only happens when the
+  // band layout changes with the search rect size
+  dlib::frontal_face_detector::image_scanner_type scanner;
+  scanner.copy_configuration(this->face_detector.get_scanner());
+  scanner.set_max_pyramid_levels(p_max_levels);
+  std::vector<dlib::frontal_face_detector::feature_vector_type> weights;
+  for (unsigned long i = 0; i < this->face_detector.num_detectors(); i++) {
+    weights.push_back(this->face_detector.get_w(i));
+  }
+
+  r_band.face_detector = dlib::frontal_face_detector(
+      scanner, this->face_detector.get_overlap_tester(), weights);
+  r_band.max_levels = p_max_levels;
+  r_band.detections.reserve(MAX_DETECTIONS);
+}
+
+bool DlibFaceTracker::detect(const TrackerFrame &p_frame,
+                             const cv::Rect &p_search_rect, cv::Rect &r_rect,
+                             float &r_confidence) {
+  cv::Rect search_rect = to_detection_rect(p_frame, p_search_rect);
+  cv::Mat search = p_frame.detection_frame(search_rect);
+
+  int min_side = std::min(search.cols, search.rows);
+  int level_count =
+      min_side < MIN_PYRAMID_LAYER_SIZE
+          ? 1
+          : (int)(std::log((double)min_side / MIN_PYRAMID_LAYER_SIZE) /
+                  std::log(1.0 / PYRAMID_SCALE)) +
+                1;
+  split_levels(level_count, PYRAMID_SCALE * PYRAMID_SCALE,
+               this->detection_threads, this->band_starts);
+  int band_count = (int)this->band_starts.size() - 1;
+
+  if ((int)this->bands.size() < band_count) {
+    this->bands.resize(band_count);
+  }
+  for (int i = 0; i < band_count; i++) {
+    int levels = this->band_starts[i + 1] - this->band_starts[i];
+    this->prepare_band(this->bands[i],
+                       i + 1 == band_count ? ALL_LEVELS : levels);
+  }
+
+  run_bands(band_count, [&](int p_band) {
+    Band &band = this->bands[p_band];
+    int first_level = this->band_starts[p_band];
+    if (first_level == 0) {
+      band.frame = search;
+    } else {
+      double scale = std::pow(PYRAMID_SCALE, first_level);
+      cv::resize(search, band.frame,
+                 cv::Size(cvRound(search.cols * scale),
+                          cvRound(search.rows * scale)),
+                 0, 0, cv::INTER_AREA);
+    }
+    band.face_detector(dlib::cv_image<unsigned char>(band.frame),
+                       band.detections);
+  });
+
+  const dlib::rect_detection *best = nullptr;
+  double best_scale = 1.0;
+  for (int i = 0; i < band_count; i++) {
+    for (const dlib::rect_detection &detection : this->bands[i].detections) {
+      if (!best ||
+          detection.detection_confidence > best->detection_confidence) {
+        best = &detection;
+        best_scale = std::pow(PYRAMID_SCALE, this->band_starts[i]);
+      }
+    }
+  }
+  if (!best) {
+    return false;
+  }
+
+  cv::Rect rect(best->rect.left(), best->rect.top(), best->rect.width(),
+                best->rect.height());
+  rect = cv::Rect(cvRound(rect.x / best_scale), cvRound(rect.y / best_scale),
+                  cvRound(rect.width / best_scale),
+                  cvRound(rect.height / best_scale));
+  r_rect = from_detection_rect(p_frame, rect + search_rect.tl());
+  r_confidence = (float)best->detection_confidence;
+
+  return true;
+}
+
+cv::Point2f DlibFaceTracker::locate(const TrackerFrame &p_frame,
+                                    const cv::Rect &p_rect) {
+  dlib::rectangle face_rect(p_rect.x, p_rect.y, p_rect.br().x - 1,
+                            p_rect.br().y - 1);
+  dlib::full_object_detection shape =
+      (*this->pose_model)(dlib::cv_image<unsigned char>(p_frame.gray),
+                          face_rect);
+
+  this->landmarks.clear();
+  for (unsigned long i = 0; i < shape.num_parts(); i++) {
+    this->landmarks.emplace_back((float)shape.part(i).x(),
+                                 (float)shape.part(i).y());
+  }
+
+  return this->landmarks[NOSE_TIP_IDX];
+}
@@ -0,0 +1,55 @@
+#ifndef DLIB_FACE_TRACKER_HPP
+#define DLIB_FACE_TRACKER_HPP
+
+#include "head_tracker.hpp"
+#include "model_cache.hpp"
+#include <dlib/image_processing.h>
+#include <dlib/image_processing/frontal_face_detector.h>
+#include <dlib/opencv.h>
+#include <string>
+
+namespace godot {
+
+// detects the face with dlib's HOG detector then tracks the nose tip of the
+// 68 landmarks fitted by the shape predictor at full resolution. all the
+// landmarks are kept for the head pose estimation. with several detection
+// threads, each one scans a band of the HOG pyramid's levels
+class DlibFaceTracker : public HeadTracker {
+  // a detector can't be shared between threads, every band gets its own one,
+  // limited to the band's levels and run on the image downscaled to its first
+  struct Band {
+    dlib::frontal_face_detector face_detector;
+    int max_levels = 0;
+    cv::Mat frame;
+    std::vector<dlib::rect_detection> detections;
+  };
+
+  std::string model_path;
+  dlib::frontal_face_detector face_detector;
+  std::vector<Band> bands;
+  std::vector<int> band_starts;
+  // shared by every tracker loading the same model, it's ~100MB
+  std::shared_ptr<const dlib::shape_predictor> pose_model;
+  std::vector<cv::Point2f> landmarks;
+
+  void prepare_band(Band &r_band, int p_max_levels);
+
+protected:
+  bool detect(const TrackerFrame &p_frame, const cv::Rect &p_search_rect,
+              cv::Rect &r_rect, float &r_confidence) override;
+  cv::Point2f locate(const TrackerFrame &p_frame,
+                     const cv::Rect &p_rect) override;
+
+public:
+  DlibFaceTracker(const std::string &p_model_path);
+
+  const char *get_name() const override { return "dlib_landmarks"; }
+  bool load() override;
+  const std::vector<cv::Point2f> *get_landmarks() const override {
+    return &this->landmarks;
+  }
+};
+
+} // namespace godot
+
+#endif
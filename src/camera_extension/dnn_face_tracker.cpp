@@ -0,0 +1,74 @@
+#include "dnn_face_tracker.hpp"
+#include <godot_cpp/variant/utility_functions.hpp>
+
+// input size and mean BGR values the SSD face detector was trained with
+const int DNN_INPUT_SIZE = 300;
+const cv::Scalar DNN_INPUT_MEAN = cv::Scalar(104.0, 177.0, 123.0);
+
+const float DNN_CONFIDENCE_THRESHOLD = 0.5;
+
+using namespace godot;
+
+DnnFaceTracker::DnnFaceTracker(const std::string &p_model_path,
+                               const std::string &p_config_path)
+    : model_path(p_model_path), config_path(p_config_path) {}
+
+bool DnnFaceTracker::load() {
+  try {
+    this->net = cv::dnn::readNet(this->model_path, this->config_path);
+  } catch (const cv::Exception &e) {
+    godot::UtilityFunctions::print("failed to load dnn model: ", e.what());
+    return false;
+  }
+
+  if (this->net.empty()) {
+    godot::UtilityFunctions::print("failed to load dnn model: ",
+                                   this->model_path.c_str());
+    return false;
+  }
+
+  godot::UtilityFunctions::print("loaded dnn model");
+  return true;
+}
+
+bool DnnFaceTracker::detect(const TrackerFrame &p_frame,
+                            const cv::Rect &p_search_rect, cv::Rect &r_rect,
+                            float &r_confidence) {
+  cv::dnn::blobFromImage(p_frame.frame(p_search_rect), this->blob, 1.0,
+                         cv::Size(DNN_INPUT_SIZE, DNN_INPUT_SIZE),
+                         DNN_INPUT_MEAN, false, false);
+  this->net.setInput(this->blob);
+  cv::Mat output = this->net.forward();
+
+  // 1x1xNx7 output, each row being
+  // [image id, label, confidence, left, top, right, bottom] with the
+  // coordinates normalized over the input image
+  cv::Mat detections(output.size[2], output.size[3], CV_32F,
+                     output.ptr<float>());
+
+  int best = -1;
+  float best_confidence = DNN_CONFIDENCE_THRESHOLD;
+  for (int i = 0; i < detections.rows; i++) {
+    float confidence = detections.at<float>(i, 2);
+    if (confidence > best_confidence) {
+      best = i;
+      best_confidence = confidence;
+    }
+  }
+
+  if (best < 0) {
+    return false;
+  }
+
+  const float *row = detections.ptr<float>(best);
+  cv::Point top_left(cvRound(row[3] * p_search_rect.width),
+                     cvRound(row[4] * p_search_rect.height));
+  cv::Point bottom_right(cvRound(row[5] * p_search_rect.width),
+                         cvRound(row[6] * p_search_rect.height));
+
+  r_rect = (cv::Rect(top_left, bottom_right) + p_search_rect.tl()) &
+           cv::Rect(cv::Point(), p_frame.frame.size());
+  r_confidence = best_confidence;
+
+  return !r_rect.empty();
+}
@@ -0,0 +1,33 @@
+#ifndef DNN_FACE_TRACKER_HPP
+#define DNN_FACE_TRACKER_HPP
+
+#include "head_tracker.hpp"
+#include <opencv2/dnn.hpp>
+#include <string>
+
+namespace godot {
+
+// detects the face with OpenCV's ResNet-10 SSD face detector through
+// `cv::dnn`, confidence being the network's score in [0, 1]. the network
+// resizes its input itself, so it runs on the color frame
+class DnnFaceTracker : public HeadTracker {
+  std::string model_path;
+  std::string config_path;
+  cv::dnn::Net net;
+  cv::Mat blob;
+
+protected:
+  bool detect(const TrackerFrame &p_frame, const cv::Rect &p_search_rect,
+              cv::Rect &r_rect, float &r_confidence) override;
+
+public:
+  DnnFaceTracker(const std::string &p_model_path,
+                 const std::string &p_config_path);
+
+  const char *get_name() const override { return "dnn_face"; }
+  bool load() override;
+};
+
+} // namespace godot
+
+#endif
@@ -0,0 +1,174 @@
+#include "frame_source.hpp"
+#include "pipeline_stats.hpp"
+#include <godot_cpp/variant/utility_functions.hpp>
+#include <thread>
+
+// used when a replay doesn't report its frame rate
+const double DEFAULT_REPLAY_FPS = 30.0;
+
+// a grab returning faster than this didn't wait for the sensor, so it got a
+// frame the driver had queued while the previous one was being processed
+const uint64_t QUEUED_GRAB_USEC = 2000;
+// bounds the grabs of one `read` in case the driver never blocks
+const int MAX_DRAINED_GRABS = 8;
+
+using namespace godot;
+
+static std::string decode_fourcc(double p_code) {
+  int code = (int)p_code;
+  std::string fourcc;
+  for (int i = 0; i < 4; i++) {
+    char c = (char)((code >> (8 * i)) & 0xff);
+    if (c != '\0') {
+      fourcc += c;
+    }
+  }
+  return fourcc;
+}
+
+static CaptureMode read_mode(const cv::VideoCapture &p_capture) {
+  return {(int)p_capture.get(cv::CAP_PROP_FRAME_WIDTH),
+          (int)p_capture.get(cv::CAP_PROP_FRAME_HEIGHT),
+          p_capture.get(cv::CAP_PROP_FPS),
+          decode_fourcc(p_capture.get(cv::CAP_PROP_FOURCC)),
+          (int)p_capture.get(cv::CAP_PROP_BUFFERSIZE)};
+}
+
+CameraFrameSource::CameraFrameSource(int p_device, const CaptureMode &p_mode)
+    : device(p_device), requested_mode(p_mode) {}
+
+bool CameraFrameSource::open() {
+  if (!this->capture.open(this->device, cv::CAP_V4L2)) {
+    godot::UtilityFunctions::print("failed to open camera device");
+    return false;
+  }
+
+  const CaptureMode &requested = this->requested_mode;
+  // V4L2 ties the available resolutions and frame rates to the pixel format,
+  // so it has to be set first. a compressed format such as MJPG is usually
+  // the only one a USB webcam can send at high resolutions and frame rates
+  if (requested.fourcc.size() == 4) {
+    const char *c = requested.fourcc.c_str();
+    this->capture.set(cv::CAP_PROP_FOURCC,
+                      cv::VideoWriter::fourcc(c[0], c[1], c[2], c[3]));
+  }
+  if (requested.width != -1 && requested.height != -1) {
+    this->capture.set(cv::CAP_PROP_FRAME_WIDTH, requested.width);
+    this->capture.set(cv::CAP_PROP_FRAME_HEIGHT, requested.height);
+  }
+  if (requested.fps > 0) {
+    this->capture.set(cv::CAP_PROP_FPS, requested.fps);
+  }
+  if (requested.buffer_size > 0) {
+    // every queued frame is a frame of latency
+    this->capture.set(cv::CAP_PROP_BUFFERSIZE, requested.buffer_size);
+  }
+
+  // the driver silently falls back to the closest mode it supports
+  this->mode = read_mode(this->capture);
+  godot::UtilityFunctions::print(
+      "camera mode ", this->mode.width, "x", this->mode.height, " at ",
+      this->mode.fps, " fps, ", this->mode.fourcc.c_str(), ", ",
+      this->mode.buffer_size, " buffers");
+  if (!requested.fourcc.empty() && this->mode.fourcc != requested.fourcc) {
+    godot::UtilityFunctions::print("camera doesn't support the ",
+                                   requested.fourcc.c_str(), " format");
+  }
+
+  return true;
+}
+
+void CameraFrameSource::release() { this->capture.release(); }
+
+bool CameraFrameSource::is_opened() const { return this->capture.isOpened(); }
+
+bool CameraFrameSource::read(cv::Mat &r_frame) {
+  // grabbing without decoding is cheap, only the newest frame is retrieved
+  for (int i = 0; i < MAX_DRAINED_GRABS; i++) {
+    if (i > 0) {
+      // the previous grab returned a queued frame, drop it for a newer one
+      this->drained_frames++;
+    }
+
+    uint64_t start_usec = PipelineStats::get_ticks_usec();
+    if (!this->capture.grab()) {
+      return false;
+    }
+    if (PipelineStats::get_ticks_usec() - start_usec > QUEUED_GRAB_USEC) {
+      // waited for the sensor, nothing newer is queued
+      break;
+    }
+  }
+
+  return this->capture.retrieve(r_frame);
+}
+
+cv::Size CameraFrameSource::get_size() const {
+  return cv::Size((int)this->capture.get(cv::CAP_PROP_FRAME_WIDTH),
+                  (int)this->capture.get(cv::CAP_PROP_FRAME_HEIGHT));
+}
+
+ReplayFrameSource::ReplayFrameSource(const std::string &p_path, bool p_realtime,
+                                     bool p_loop)
+    : path(p_path), realtime(p_realtime), loop(p_loop) {}
+
+bool ReplayFrameSource::open() {
+  if (!this->capture.open(this->path)) {
+    godot::UtilityFunctions::print("failed to open replay ",
+                                   this->path.c_str());
+    return false;
+  }
+
+  this->mode = read_mode(this->capture);
+  double fps = this->mode.fps;
+  if (fps <= 0) {
+    fps = DEFAULT_REPLAY_FPS;
+  }
+  this->frame_interval_usec = (uint64_t)(1e6 / fps);
+  this->next_frame_usec = PipelineStats::get_ticks_usec();
+  this->frame_index = -1;
+
+  godot::UtilityFunctions::print("replaying ", this->path.c_str(), " at ", fps,
+                                 " fps");
+  return true;
+}
+
+void ReplayFrameSource::release() { this->capture.release(); }
+
+bool ReplayFrameSource::is_opened() const { return this->capture.isOpened(); }
+
+bool ReplayFrameSource::read(cv::Mat &r_frame) {
+  if (!this->capture.read(r_frame)) {
+    if (!this->loop) {
+      this->capture.release();
+      return false;
+    }
+
+    this->capture.set(cv::CAP_PROP_POS_FRAMES, 0);
+    this->frame_index = -1;
+    if (!this->capture.read(r_frame)) {
+      return false;
+    }
+  }
+  this->frame_index++;
+
+  if (this->realtime) {
+    uint64_t now_usec = PipelineStats::get_ticks_usec();
+    if (this->next_frame_usec > now_usec) {
+      std::this_thread::sleep_for(
+          std::chrono::microseconds(this->next_frame_usec - now_usec));
+    } else {
+      // running late, don't try to catch up with a burst of frames
+      this->next_frame_usec = now_usec;
+    }
+    this->next_frame_usec += this->frame_interval_usec;
+  }
+
+  return true;
+}
+
+cv::Size ReplayFrameSource::get_size() const {
+  return cv::Size((int)this->capture.get(cv::CAP_PROP_FRAME_WIDTH),
+                  (int)this->capture.get(cv::CAP_PROP_FRAME_HEIGHT));
+}
+
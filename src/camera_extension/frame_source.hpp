@@ -0,0 +1,98 @@
+#ifndef FRAME_SOURCE_HPP
+#define FRAME_SOURCE_HPP
+
+#include <atomic>
+#include <cstdint>
+#include <opencv2/opencv.hpp>
+#include <string>
+
+namespace godot {
+
+// capture mode requested from, or reported by, the video backend
+struct CaptureMode {
+  // -1 for both to use the default camera resolution
+  int width;
+  int height;
+  // 0 to use the default frame rate
+  double fps;
+  // four character code such as "MJPG" or "YUYV", empty for the default
+  std::string fourcc;
+  // frames queued by the driver, 0 to use the default
+  int buffer_size;
+};
+
+// where the vision pipeline reads its frames from
+class FrameSource {
+public:
+  // queued frames skipped by `read` to return the newest one
+  std::atomic<uint64_t> drained_frames{0};
+
+  virtual ~FrameSource() = default;
+
+  virtual bool open() = 0;
+  virtual void release() = 0;
+  virtual bool is_opened() const = 0;
+  // blocks until the next frame is available, returns false on capture
+  // errors. `r_frame` is reused if it already has the right size and type
+  virtual bool read(cv::Mat &r_frame) = 0;
+  // empty if unknown until the first frame is read
+  virtual cv::Size get_size() const = 0;
+  // mode actually obtained when the source was opened. cached, so it can be
+  // read while another thread reads frames
+  virtual CaptureMode get_mode() const = 0;
+};
+
+// live webcam. the requested mode is negotiated with the driver when opening,
+// which keeps the closest one it supports
+class CameraFrameSource : public FrameSource {
+  int device;
+  CaptureMode requested_mode;
+  CaptureMode mode;
+  cv::VideoCapture capture;
+
+public:
+  CameraFrameSource(int p_device, const CaptureMode &p_mode);
+
+  bool open() override;
+  void release() override;
+  bool is_opened() const override;
+  // grabs until the driver has no queued frame left, then only decodes the
+  // newest one
+  bool read(cv::Mat &r_frame) override;
+  cv::Size get_size() const override;
+  CaptureMode get_mode() const override { return this->mode; }
+};
+
+// recorded session, either a video file or an image sequence such as
+// `frames/%04d.png`
+class ReplayFrameSource : public FrameSource {
+  std::string path;
+  // paces the frames at the recorded frame rate instead of as fast as they
+  // can be decoded
+  bool realtime;
+  // restarts at the end instead of closing
+  bool loop;
+  CaptureMode mode;
+  cv::VideoCapture capture;
+  uint64_t frame_interval_usec = 0;
+  uint64_t next_frame_usec = 0;
+  int frame_index = -1;
+
+public:
+  ReplayFrameSource(const std::string &p_path, bool p_realtime, bool p_loop);
+
+  bool open() override;
+  void release() override;
+  bool is_opened() const override;
+  // closes the source once the end is reached without `loop`
+  bool read(cv::Mat &r_frame) override;
+  cv::Size get_size() const override;
+  CaptureMode get_mode() const override { return this->mode; }
+
+  // index of the last frame read in the recording
+  int get_frame_index() const { return this->frame_index; }
+};
+
+} // namespace godot
+
+#endif
@@ -0,0 +1,123 @@
+#include "haar_eye_tracker.hpp"
+#include <godot_cpp/variant/utility_functions.hpp>
+
+// initial capacity of the reused detection vectors
+const int MAX_DETECTIONS = 16;
+
+// `detectMultiScale` defaults, each scale scans ~1/1.21 of the previous pixels
+const double SCALE_FACTOR = 1.1;
+
+using namespace godot;
+
+HaarEyeTracker::HaarEyeTracker(const std::string &p_cascade_path)
+    : cascade_path(p_cascade_path) {}
+
+bool HaarEyeTracker::load() {
+  this->bands.clear();
+  if (this->prepare_bands(1) < 1) {
+    godot::UtilityFunctions::print("failed to load haar cascade: ",
+                                   this->cascade_path.c_str());
+    return false;
+  }
+
+  godot::UtilityFunctions::print("loaded haar cascade");
+  return true;
+}
+
+int HaarEyeTracker::prepare_bands(int p_band_count) {
+  while ((int)this->bands.size() < p_band_count) {
+    Band band;
+    if (!band.eye_detector.load(this->cascade_path)) {
+      break;
+    }
+    band.detections.reserve(MAX_DETECTIONS);
+    band.neighbors.reserve(MAX_DETECTIONS);
+    this->bands.push_back(std::move(band));
+  }
+
+  return std::min((int)this->bands.size(), p_band_count);
+}
+
+// lists the window sizes `detectMultiScale` scans the image with, computed
+// the same way: the factor is accumulated and every size rounded on its own.
+// a size derived otherwise may round differently at a band boundary, whose
+// scale would then be scanned by both neighboring bands or by neither
+static void scale_windows(const cv::Size &p_window, const cv::Size &p_image,
+                          std::vector<cv::Size> &r_windows) {
+  r_windows.clear();
+  for (double factor = 1.0;; factor *= SCALE_FACTOR) {
+    cv::Size window(cvRound(p_window.width * factor),
+                    cvRound(p_window.height * factor));
+    if (window.width > p_image.width || window.height > p_image.height) {
+      break;
+    }
+    r_windows.push_back(window);
+  }
+}
+
+bool HaarEyeTracker::detect(const TrackerFrame &p_frame,
+                            const cv::Rect &p_search_rect, cv::Rect &r_rect,
+                            float &r_confidence) {
+  cv::Rect search_rect = to_detection_rect(p_frame, p_search_rect);
+  cv::Mat search = p_frame.detection_frame(search_rect);
+
+  // the cascade's window grows by `SCALE_FACTOR` until it outgrows the image
+  scale_windows(this->bands[0].eye_detector.getOriginalWindowSize(),
+                search.size(), this->level_windows);
+  int level_count = (int)this->level_windows.size();
+
+  split_levels(level_count, 1.0 / (SCALE_FACTOR * SCALE_FACTOR),
+               this->prepare_bands(this->detection_threads),
+               this->band_starts);
+  int band_count = (int)this->band_starts.size() - 1;
+
+  run_bands(band_count, [&](int p_band) {
+    Band &band = this->bands[p_band];
+    if (band_count == 1) {
+      band.eye_detector.detectMultiScale(search, band.detections,
+                                         band.neighbors);
+      return;
+    }
+
+    // the window sizes of the band's first and last levels, both scanned.
+    // the neighbors are only grouped within a band, which may split an eye
+    // found across the boundary scales
+    int first_level = this->band_starts[p_band];
+    int end_level = this->band_starts[p_band + 1];
+    cv::Size max_size;
+    if (p_band + 1 < band_count) {
+      max_size = this->level_windows[end_level - 1];
+    }
+    band.eye_detector.detectMultiScale(
+        search, band.detections, band.neighbors, SCALE_FACTOR, 3, 0,
+        this->level_windows[first_level], max_size);
+  });
+
+  int best_band = -1;
+  size_t best = 0;
+  for (int i = 0; i < band_count; i++) {
+    const std::vector<int> &neighbors = this->bands[i].neighbors;
+    if (neighbors.empty()) {
+      continue;
+    }
+
+    size_t band_best =
+        std::max_element(neighbors.begin(), neighbors.end()) -
+        neighbors.begin();
+    if (best_band == -1 ||
+        neighbors[band_best] > this->bands[best_band].neighbors[best]) {
+      best_band = i;
+      best = band_best;
+    }
+  }
+  if (best_band == -1) {
+    return false;
+  }
+
+  const Band &band = this->bands[best_band];
+  r_rect = from_detection_rect(p_frame, band.detections[best] +
+                                            search_rect.tl());
+  r_confidence = (float)band.neighbors[best];
+
+  return true;
+}
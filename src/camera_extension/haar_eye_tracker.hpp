@@ -0,0 +1,42 @@
+#ifndef HAAR_EYE_TRACKER_HPP
+#define HAAR_EYE_TRACKER_HPP
+
+#include "head_tracker.hpp"
+#include <string>
+
+namespace godot {
+
+// tracks the left eye with an OpenCV Haar cascade, confidence being the
+// number of neighboring detections merged into the best rect. with several
+// detection threads, each one scans a band of the cascade's scales
+class HaarEyeTracker : public HeadTracker {
+  // a classifier can't be shared between threads, every band gets its own
+  struct Band {
+    cv::CascadeClassifier eye_detector;
+    std::vector<cv::Rect> detections;
+    std::vector<int> neighbors;
+  };
+
+  std::string cascade_path;
+  std::vector<Band> bands;
+  std::vector<int> band_starts;
+  // window size of every scale scanned
+  std::vector<cv::Size> level_windows;
+
+  // loads the classifiers of the bands missing, returns the usable count
+  int prepare_bands(int p_band_count);
+
+protected:
+  bool detect(const TrackerFrame &p_frame, const cv::Rect &p_search_rect,
+              cv::Rect &r_rect, float &r_confidence) override;
+
+public:
+  HaarEyeTracker(const std::string &p_cascade_path);
+
+  const char *get_name() const override { return "haar_eye"; }
+  bool load() override;
+};
+
+} // namespace godot
+
+#endif
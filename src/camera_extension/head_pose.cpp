@@ -0,0 +1,102 @@
+#include "head_pose.hpp"
+#include <cmath>
+
+// generic face model in meters, nose tip at the origin, x to the face's left,
+// y up and z out of the face. only rigid landmarks are fitted, the jaw line,
+// eyebrows and lips move too much with expressions to help the solve
+struct ModelLandmark {
+  int index;
+  cv::Point3f position;
+};
+
+const ModelLandmark MODEL_LANDMARKS[] = {
+    // nose bridge and tip
+    {27, {0.0f, 0.047f, -0.027f}},
+    {30, {0.0f, 0.0f, 0.0f}},
+    // nostrils
+    {31, {-0.013f, -0.012f, -0.019f}},
+    {35, {0.013f, -0.012f, -0.019f}},
+    // chin
+    {8, {0.0f, -0.069f, -0.014f}},
+    // outer and inner eye corners
+    {36, {-0.047f, 0.036f, -0.028f}},
+    {39, {-0.014f, 0.035f, -0.026f}},
+    {42, {0.014f, 0.035f, -0.026f}},
+    {45, {0.047f, 0.036f, -0.028f}},
+    // mouth corners
+    {48, {-0.032f, -0.032f, -0.026f}},
+    {54, {0.032f, -0.032f, -0.026f}},
+};
+const int MODEL_LANDMARK_COUNT =
+    sizeof(MODEL_LANDMARKS) / sizeof(MODEL_LANDMARKS[0]);
+const int FACE_LANDMARK_COUNT = 68;
+
+// solutions outside of this range are fitting failures, not heads
+const float MIN_HEAD_DISTANCE = 0.1;
+const float MAX_HEAD_DISTANCE = 5.0;
+
+using namespace godot;
+
+HeadPoseEstimator::HeadPoseEstimator() {
+  for (const ModelLandmark &landmark : MODEL_LANDMARKS) {
+    // the model's y and z axes are flipped in OpenCV's camera space
+    model_points.push_back(cv::Point3f(landmark.position.x,
+                                       -landmark.position.y,
+                                       -landmark.position.z));
+  }
+  image_points.resize(MODEL_LANDMARK_COUNT);
+  rotation = cv::Mat::zeros(3, 1, CV_64F);
+  translation = cv::Mat::zeros(3, 1, CV_64F);
+}
+
+void HeadPoseEstimator::update_camera_matrix(const cv::Size &p_frame_size,
+                                             float p_fov_degrees) {
+  if (p_frame_size == this->camera_matrix_size &&
+      p_fov_degrees == this->camera_matrix_fov) {
+    return;
+  }
+
+  // pinhole camera centered on the frame, webcam lens distortion is ignored
+  double focal_length = p_frame_size.width / 2.0 /
+                        std::tan(p_fov_degrees * CV_PI / 180.0 / 2.0);
+  this->camera_matrix = (cv::Mat_<double>(3, 3) << focal_length, 0,
+                         p_frame_size.width / 2.0, 0, focal_length,
+                         p_frame_size.height / 2.0, 0, 0, 1);
+  this->camera_matrix_size = p_frame_size;
+  this->camera_matrix_fov = p_fov_degrees;
+  this->has_solution = false;
+}
+
+bool HeadPoseEstimator::solve(const std::vector<cv::Point2f> &p_landmarks,
+                              const cv::Size &p_frame_size,
+                              float p_fov_degrees, cv::Point3f &r_position) {
+  if ((int)p_landmarks.size() < FACE_LANDMARK_COUNT) {
+    return false;
+  }
+
+  this->update_camera_matrix(p_frame_size, p_fov_degrees);
+
+  for (int i = 0; i < MODEL_LANDMARK_COUNT; i++) {
+    this->image_points[i] = p_landmarks[MODEL_LANDMARKS[i].index];
+  }
+
+  bool solved = cv::solvePnP(this->model_points, this->image_points,
+                             this->camera_matrix, cv::noArray(),
+                             this->rotation, this->translation,
+                             this->has_solution, cv::SOLVEPNP_ITERATIVE);
+
+  double distance = solved ? this->translation.at<double>(2) : 0.0;
+  if (distance < MIN_HEAD_DISTANCE || distance > MAX_HEAD_DISTANCE) {
+    // a diverged solution would be a bad guess for the next frame
+    this->has_solution = false;
+    this->rotation.setTo(0);
+    this->translation.setTo(0);
+    return false;
+  }
+
+  this->has_solution = true;
+  r_position = cv::Point3f((float)this->translation.at<double>(0),
+                           (float)this->translation.at<double>(1),
+                           (float)distance);
+  return true;
+}
@@ -0,0 +1,41 @@
+#ifndef HEAD_POSE_HPP
+#define HEAD_POSE_HPP
+
+#include <opencv2/opencv.hpp>
+#include <vector>
+
+namespace godot {
+
+// estimates the 3D head position from the 68 dlib face landmarks by fitting
+// a generic face model with `cv::solvePnP`. every solve is warm-started from
+// the previous one, which keeps it to a few iterations per frame
+class HeadPoseEstimator {
+  std::vector<cv::Point3f> model_points;
+  // preallocated, filled from the landmarks on every solve
+  std::vector<cv::Point2f> image_points;
+  cv::Mat camera_matrix;
+  cv::Size camera_matrix_size;
+  float camera_matrix_fov = 0.0;
+
+  cv::Mat rotation;
+  cv::Mat translation;
+  bool has_solution = false;
+
+  void update_camera_matrix(const cv::Size &p_frame_size, float p_fov_degrees);
+
+public:
+  HeadPoseEstimator();
+
+  // `p_landmarks` are the 68 landmarks in the pixels of a `p_frame_size`
+  // frame, taken by a camera with a horizontal field of view of
+  // `p_fov_degrees`. `r_position` is the position of the nose tip in camera
+  // space, in meters: x right, y down and z away from the camera
+  bool solve(const std::vector<cv::Point2f> &p_landmarks,
+             const cv::Size &p_frame_size, float p_fov_degrees,
+             cv::Point3f &r_position);
+  void reset() { this->has_solution = false; }
+};
+
+} // namespace godot
+
+#endif
@@ -0,0 +1,147 @@
+#include "head_tracker.hpp"
+#include <chrono>
+#include <godot_cpp/classes/worker_thread_pool.hpp>
+
+using namespace godot;
+
+static double elapsed_msec(std::chrono::steady_clock::time_point start) {
+  return std::chrono::duration<double, std::milli>(
+             std::chrono::steady_clock::now() - start)
+      .count();
+}
+
+cv::Rect HeadTracker::to_detection_rect(const TrackerFrame &p_frame,
+                                        const cv::Rect &p_rect) {
+  float scale = p_frame.detection_scale;
+  cv::Rect scaled(cvRound(p_rect.x * scale), cvRound(p_rect.y * scale),
+                  cvRound(p_rect.width * scale),
+                  cvRound(p_rect.height * scale));
+
+  return scaled & cv::Rect(cv::Point(), p_frame.detection_frame.size());
+}
+
+cv::Rect HeadTracker::from_detection_rect(const TrackerFrame &p_frame,
+                                          const cv::Rect &p_rect) {
+  float scale = p_frame.detection_scale;
+  cv::Rect scaled(cvRound(p_rect.x / scale), cvRound(p_rect.y / scale),
+                  cvRound(p_rect.width / scale),
+                  cvRound(p_rect.height / scale));
+
+  return scaled & cv::Rect(cv::Point(), p_frame.frame.size());
+}
+
+void HeadTracker::split_levels(int p_level_count, float p_level_cost,
+                               int p_band_count,
+                               std::vector<int> &r_band_starts) {
+  double total_cost = 0.0;
+  double level_cost = 1.0;
+  for (int i = 0; i < p_level_count; i++) {
+    total_cost += level_cost;
+    level_cost *= p_level_cost;
+  }
+  double band_cost = total_cost / std::max(p_band_count, 1);
+
+  r_band_starts.clear();
+  r_band_starts.push_back(0);
+
+  double cost = 0.0;
+  level_cost = 1.0;
+  for (int i = 0; i + 1 < p_level_count; i++) {
+    cost += level_cost;
+    level_cost *= p_level_cost;
+    // the first levels are the most expensive, they may get a band each
+    if ((int)r_band_starts.size() < p_band_count &&
+        cost >= band_cost * r_band_starts.size()) {
+      r_band_starts.push_back(i + 1);
+    }
+  }
+
+  r_band_starts.push_back(std::max(p_level_count, 0));
+}
+
+static void run_band(void *p_task, uint32_t p_band) {
+  (*(const std::function<void(int)> *)p_task)((int)p_band);
+}
+
+void HeadTracker::run_bands(int p_band_count,
+                            const std::function<void(int)> &p_task) {
+  if (p_band_count <= 1) {
+    // not worth a round trip through the pool
+    for (int i = 0; i < p_band_count; i++) {
+      p_task(i);
+    }
+    return;
+  }
+
+  WorkerThreadPool *pool = WorkerThreadPool::get_singleton();
+  // high priority, the vision thread is blocked until every band is done
+  WorkerThreadPool::GroupID group = pool->add_native_group_task(
+      &run_band, (void *)&p_task, p_band_count, p_band_count, true,
+      "CameraExtension detection");
+  pool->wait_for_group_task_completion(group);
+}
+
+cv::Point2f HeadTracker::locate(const TrackerFrame &p_frame,
+                                const cv::Rect &p_rect) {
+  return cv::Point2f(p_rect.x + p_rect.width / 2.0f,
+                     p_rect.y + p_rect.height / 2.0f);
+}
+
+cv::Rect HeadTracker::get_search_rect(const TrackerFrame &p_frame,
+                                      const TrackerSettings &p_settings) {
+  cv::Rect full_frame(cv::Point(), p_frame.frame.size());
+
+  this->frames_since_detection++;
+  if (!this->has_last_rect ||
+      this->frames_since_detection >= p_settings.detection_interval) {
+    this->frames_since_detection = 0;
+    return full_frame;
+  }
+
+  int margin_x = (int)(this->last_rect.width * p_settings.roi_margin);
+  int margin_y = (int)(this->last_rect.height * p_settings.roi_margin);
+  cv::Rect roi(this->last_rect.x - margin_x, this->last_rect.y - margin_y,
+               this->last_rect.width + 2 * margin_x,
+               this->last_rect.height + 2 * margin_y);
+
+  return roi & full_frame;
+}
+
+bool HeadTracker::track(const TrackerFrame &p_frame,
+                        const TrackerSettings &p_settings,
+                        TrackerResult &r_result) {
+  r_result = {};
+  this->detection_threads = std::max(p_settings.detection_threads, 1);
+
+  cv::Rect full_frame(cv::Point(), p_frame.frame.size());
+  cv::Rect search_rect = this->get_search_rect(p_frame, p_settings);
+
+  auto start_time = std::chrono::steady_clock::now();
+  bool found = this->detect(p_frame, search_rect, r_result.rect,
+                            r_result.confidence);
+  if (!found && search_rect != full_frame) {
+    // lost the target around its last position, search the whole frame again
+    this->frames_since_detection = 0;
+    found = this->detect(p_frame, full_frame, r_result.rect,
+                         r_result.confidence);
+  }
+  r_result.detect_msec = elapsed_msec(start_time);
+
+  this->has_last_rect = found;
+  if (!found) {
+    return false;
+  }
+  this->last_rect = r_result.rect;
+
+  start_time = std::chrono::steady_clock::now();
+  r_result.point = this->locate(p_frame, r_result.rect);
+  r_result.landmark_msec = elapsed_msec(start_time);
+
+  r_result.found = true;
+  return true;
+}
+
+void HeadTracker::reset() {
+  this->has_last_rect = false;
+  this->frames_since_detection = 0;
+}
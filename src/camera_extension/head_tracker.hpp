@@ -0,0 +1,103 @@
+#ifndef HEAD_TRACKER_HPP
+#define HEAD_TRACKER_HPP
+
+#include <functional>
+#include <opencv2/opencv.hpp>
+#include <vector>
+
+namespace godot {
+
+// views of the frames prepared by CameraExtension for one capture
+struct TrackerFrame {
+  // color and grayscale frames at full resolution
+  cv::Mat frame;
+  cv::Mat gray;
+  // grayscale frame downscaled by `detection_scale`
+  cv::Mat detection_frame;
+  float detection_scale;
+};
+
+struct TrackerSettings {
+  // full-frame detection period in frames, 1 disables ROI tracking
+  int detection_interval;
+  // ROI growth on each side, relative to the last detected rect size
+  float roi_margin;
+  // worker threads a detection may be split across, 1 runs it on the
+  // calling thread
+  int detection_threads;
+};
+
+struct TrackerResult {
+  bool found;
+  // tracked point and detected rect, in full resolution frame pixels
+  cv::Point2f point;
+  cv::Rect rect;
+  // backend specific scale, higher is more confident
+  float confidence;
+  double detect_msec;
+  double landmark_msec;
+};
+
+// head tracking backend: finds a rect in the frame then refines the tracked
+// point from it. detection is track-then-detect, the whole frame is only
+// searched every `detection_interval` frames or when the track is lost,
+// otherwise only the last rect grown by `roi_margin` is
+class HeadTracker {
+  cv::Rect last_rect;
+  bool has_last_rect = false;
+  int frames_since_detection = 0;
+
+  cv::Rect get_search_rect(const TrackerFrame &p_frame,
+                           const TrackerSettings &p_settings);
+
+protected:
+  // `TrackerSettings::detection_threads` of the current `track()`
+  int detection_threads = 1;
+
+  // splits the `p_level_count` levels of a detector's image pyramid into at
+  // most `p_band_count` contiguous bands of about the same cost, each level
+  // costing `p_level_cost` times the previous one. `r_band_starts` gets the
+  // first level of every band, followed by `p_level_count`
+  static void split_levels(int p_level_count, float p_level_cost,
+                           int p_band_count, std::vector<int> &r_band_starts);
+  // runs `p_task(band)` for every band on the engine's WorkerThreadPool, so
+  // detection shares the engine's threads rather than competing with them.
+  // returns once every band is done
+  static void run_bands(int p_band_count,
+                        const std::function<void(int)> &p_task);
+
+  // finds the best detection within `p_search_rect`, both rects being in full
+  // resolution frame pixels
+  virtual bool detect(const TrackerFrame &p_frame,
+                      const cv::Rect &p_search_rect, cv::Rect &r_rect,
+                      float &r_confidence) = 0;
+  // the rect center by default
+  virtual cv::Point2f locate(const TrackerFrame &p_frame,
+                             const cv::Rect &p_rect);
+
+public:
+  virtual ~HeadTracker() = default;
+
+  // maps a full resolution rect to `detection_frame` and back
+  static cv::Rect to_detection_rect(const TrackerFrame &p_frame,
+                                    const cv::Rect &p_rect);
+  static cv::Rect from_detection_rect(const TrackerFrame &p_frame,
+                                      const cv::Rect &p_rect);
+
+  virtual const char *get_name() const = 0;
+  // returns false if the backend's model couldn't be loaded
+  virtual bool load() = 0;
+  // all the landmarks fitted by the last successful `track()`, in full
+  // resolution frame pixels, or null if the backend doesn't fit any
+  virtual const std::vector<cv::Point2f> *get_landmarks() const {
+    return nullptr;
+  }
+
+  bool track(const TrackerFrame &p_frame, const TrackerSettings &p_settings,
+             TrackerResult &r_result);
+  void reset();
+};
+
+} // namespace godot
+
+#endif
@@ -0,0 +1,40 @@
+#ifndef MODEL_CACHE_HPP
+#define MODEL_CACHE_HPP
+
+#include <map>
+#include <memory>
+#include <mutex>
+#include <string>
+
+namespace godot {
+
+// process-wide cache of read-only models keyed by path, so every instance
+// using a model shares one copy of it. a model is freed once its last user
+// releases it
+template <typename T> class ModelCache {
+  std::mutex mutex;
+  std::map<std::string, std::weak_ptr<const T>> models;
+
+public:
+  // returns the cached model or loads it with `p_load(path, model)`, which
+  // may throw. concurrent requests for a model being loaded wait for it
+  // rather than loading it again
+  template <typename F>
+  std::shared_ptr<const T> get(const std::string &p_path, F p_load) {
+    std::lock_guard<std::mutex> lock(this->mutex);
+
+    std::shared_ptr<const T> model = this->models[p_path].lock();
+    if (model) {
+      return model;
+    }
+
+    std::shared_ptr<T> loaded = std::make_shared<T>();
+    p_load(p_path, *loaded);
+    this->models[p_path] = loaded;
+    return loaded;
+  }
+};
+
+} // namespace godot
+
+#endif
@@ -0,0 +1,110 @@
+#include "pipeline_stats.hpp"
+#include <algorithm>
+#include <chrono>
+
+using namespace godot;
+
+void StageTimings::record(float p_msec) {
+  uint32_t index = this->count.load(std::memory_order_relaxed);
+  this->samples[index % WINDOW_SIZE].store(p_msec, std::memory_order_relaxed);
+  this->count.store(index + 1, std::memory_order_release);
+}
+
+StagePercentiles StageTimings::get_percentiles() const {
+  uint32_t size =
+      std::min(this->count.load(std::memory_order_acquire), WINDOW_SIZE);
+  if (size == 0) {
+    return {0, 0, 0, 0};
+  }
+
+  float window[WINDOW_SIZE];
+  for (uint32_t i = 0; i < size; i++) {
+    window[i] = this->samples[i].load(std::memory_order_relaxed);
+  }
+  std::sort(window, window + size);
+
+  auto percentile = [&](float p) { return window[(uint32_t)(p * (size - 1))]; };
+  return {percentile(0.50), percentile(0.95), percentile(0.99),
+          window[size - 1]};
+}
+
+void StageTimings::reset() { this->count = 0; }
+
+const char *PipelineStats::get_stage_name(PipelineStage p_stage) {
+  switch (p_stage) {
+  case STAGE_CAPTURE:
+    return "capture";
+  case STAGE_CONVERT:
+    return "convert";
+  case STAGE_MOTION:
+    return "motion";
+  case STAGE_DETECT:
+    return "detect";
+  case STAGE_LANDMARK:
+    return "landmark";
+  case STAGE_POSE:
+    return "pose";
+  case STAGE_SMOOTH:
+    return "smooth";
+  case STAGE_APPLY:
+    return "apply";
+  case STAGE_LATENCY:
+    return "latency";
+  default:
+    return "unknown";
+  }
+}
+
+uint64_t PipelineStats::get_ticks_usec() {
+  return std::chrono::duration_cast<std::chrono::microseconds>(
+             std::chrono::steady_clock::now().time_since_epoch())
+      .count();
+}
+
+void PipelineStats::record(PipelineStage p_stage, float p_msec) {
+  this->stages[p_stage].record(p_msec);
+}
+
+void PipelineStats::record_since(PipelineStage p_stage,
+                                 uint64_t p_start_usec) {
+  this->record(p_stage, (get_ticks_usec() - p_start_usec) / 1000.0f);
+}
+
+StagePercentiles PipelineStats::get_percentiles(PipelineStage p_stage) const {
+  return this->stages[p_stage].get_percentiles();
+}
+
+Dictionary PipelineStats::to_dictionary() const {
+  Dictionary stats;
+
+  for (int i = 0; i < STAGE_MAX; i++) {
+    StagePercentiles percentiles = this->get_percentiles((PipelineStage)i);
+
+    Dictionary stage;
+    stage["p50"] = percentiles.p50;
+    stage["p95"] = percentiles.p95;
+    stage["p99"] = percentiles.p99;
+    stage["max"] = percentiles.max;
+    stats[get_stage_name((PipelineStage)i)] = stage;
+  }
+
+  stats["processed_frames"] = this->processed_frames.load();
+  stats["failed_captures"] = this->failed_captures.load();
+  stats["dropped_frames"] = this->dropped_frames.load();
+  stats["stale_frames"] = this->stale_frames.load();
+  stats["skipped_detections"] = this->skipped_detections.load();
+
+  return stats;
+}
+
+void PipelineStats::reset() {
+  for (StageTimings &stage : this->stages) {
+    stage.reset();
+  }
+
+  this->failed_captures = 0;
+  this->dropped_frames = 0;
+  this->stale_frames = 0;
+  this->processed_frames = 0;
+  this->skipped_detections = 0;
+}
@@ -0,0 +1,78 @@
+#ifndef PIPELINE_STATS_HPP
+#define PIPELINE_STATS_HPP
+
+#include <atomic>
+#include <cstdint>
+#include <godot_cpp/variant/dictionary.hpp>
+
+namespace godot {
+
+enum PipelineStage {
+  STAGE_CAPTURE,
+  STAGE_CONVERT,
+  STAGE_MOTION,
+  STAGE_DETECT,
+  STAGE_LANDMARK,
+  STAGE_POSE,
+  STAGE_SMOOTH,
+  STAGE_APPLY,
+  // capture timestamp to `set_position`, i.e. motion-to-photon minus the
+  // webcam exposure and the engine's own render latency
+  STAGE_LATENCY,
+  STAGE_MAX,
+};
+
+struct StagePercentiles {
+  float p50;
+  float p95;
+  float p99;
+  float max;
+};
+
+// rolling window of the last durations of one stage. lock-free with a single
+// writer thread per stage, readers copy the window and may see a sample from
+// the next frame, which doesn't matter for percentiles
+class StageTimings {
+  static constexpr uint32_t WINDOW_SIZE = 256;
+
+  std::atomic<float> samples[WINDOW_SIZE] = {};
+  std::atomic<uint32_t> count{0};
+
+public:
+  void record(float p_msec);
+  StagePercentiles get_percentiles() const;
+  void reset();
+};
+
+class PipelineStats {
+  StageTimings stages[STAGE_MAX];
+
+public:
+  // captures which returned no frame
+  std::atomic<uint64_t> failed_captures{0};
+  // results overwritten before the main thread picked them up
+  std::atomic<uint64_t> dropped_frames{0};
+  // rendered frames without a new result, reusing the last pose
+  std::atomic<uint64_t> stale_frames{0};
+  std::atomic<uint64_t> processed_frames{0};
+  // frames which reused the last detection, nothing having moved around it
+  std::atomic<uint64_t> skipped_detections{0};
+
+  static const char *get_stage_name(PipelineStage p_stage);
+  // monotonic clock shared by the vision and main threads
+  static uint64_t get_ticks_usec();
+
+  void record_since(PipelineStage p_stage, uint64_t p_start_usec);
+  void record(PipelineStage p_stage, float p_msec);
+  StagePercentiles get_percentiles(PipelineStage p_stage) const;
+
+  // {"<stage>": {"p50": msec, "p95": msec, "p99": msec, "max": msec}, ...}
+  // plus the frame counters
+  Dictionary to_dictionary() const;
+  // not thread-safe, only call while the writers are stopped
+  void reset();
+};
+
+} // namespace godot
+
+#endif
@@ -0,0 +1,101 @@
+#include "pose_filter.hpp"
+#include <algorithm>
+#include <cmath>
+#include <godot_cpp/core/math.hpp>
+
+// measurements further apart than this restart the filter instead of
+// smoothing across the gap, e.g. when the face was lost for a while
+const double RESET_GAP_SEC = 0.5;
+
+using namespace godot;
+
+// smoothing factor of a first order low-pass filter with the given cutoff
+static double low_pass_alpha(double p_cutoff, double p_dt) {
+  double tau = 1.0 / (Math_TAU * p_cutoff);
+  return 1.0 / (1.0 + tau / p_dt);
+}
+
+void PoseFilter::reset() { this->has_estimate = false; }
+
+void PoseFilter::update_exponential(AxisState &r_axis, double p_measurement) {
+  r_axis.position = this->exponential_alpha * p_measurement +
+                    (1 - this->exponential_alpha) * r_axis.position;
+}
+
+void PoseFilter::update_one_euro(AxisState &r_axis, double p_measurement,
+                                 double p_dt) {
+  double speed = (p_measurement - r_axis.last_measurement) / p_dt;
+  double speed_alpha = low_pass_alpha(this->derivative_cutoff, p_dt);
+  r_axis.velocity = speed_alpha * speed + (1 - speed_alpha) * r_axis.velocity;
+
+  double cutoff = this->min_cutoff + this->beta * std::abs(r_axis.velocity);
+  double alpha = low_pass_alpha(cutoff, p_dt);
+  r_axis.position = alpha * p_measurement + (1 - alpha) * r_axis.position;
+  r_axis.last_measurement = p_measurement;
+}
+
+void PoseFilter::update_kalman(AxisState &r_axis, double p_measurement,
+                               double p_dt) {
+  // predict with a constant velocity model, acceleration being white noise
+  double dt2 = p_dt * p_dt;
+  r_axis.position += r_axis.velocity * p_dt;
+  double p00 = r_axis.p00 + p_dt * (2 * r_axis.p01 + p_dt * r_axis.p11) +
+               this->process_noise * dt2 * dt2 / 4;
+  double p01 =
+      r_axis.p01 + p_dt * r_axis.p11 + this->process_noise * dt2 * p_dt / 2;
+  double p11 = r_axis.p11 + this->process_noise * dt2;
+
+  // correct with the measured position
+  double innovation = p_measurement - r_axis.position;
+  double s = p00 + this->measurement_noise;
+  double k0 = p00 / s;
+  double k1 = p01 / s;
+  r_axis.position += k0 * innovation;
+  r_axis.velocity += k1 * innovation;
+  r_axis.p00 = (1 - k0) * p00;
+  r_axis.p01 = (1 - k0) * p01;
+  r_axis.p11 = p11 - k1 * p01;
+}
+
+void PoseFilter::update(const Vector3 &p_measurement, double p_time) {
+  double dt = p_time - this->last_time;
+
+  if (!this->has_estimate || dt <= 0 || dt > RESET_GAP_SEC ||
+      this->mode == FILTER_NONE) {
+    for (int i = 0; i < 3; i++) {
+      this->axes[i] = {p_measurement[i], 0.0, p_measurement[i],
+                       this->measurement_noise, 0.0, this->process_noise};
+    }
+    this->has_estimate = true;
+    this->last_time = p_time;
+    return;
+  }
+
+  for (int i = 0; i < 3; i++) {
+    switch (this->mode) {
+    case FILTER_EXPONENTIAL:
+      this->update_exponential(this->axes[i], p_measurement[i]);
+      break;
+    case FILTER_ONE_EURO:
+      this->update_one_euro(this->axes[i], p_measurement[i], dt);
+      break;
+    case FILTER_KALMAN:
+      this->update_kalman(this->axes[i], p_measurement[i], dt);
+      break;
+    default:
+      break;
+    }
+  }
+
+  this->last_time = p_time;
+}
+
+Vector3 PoseFilter::predict(double p_time) const {
+  double dt = std::clamp(p_time - this->last_time, 0.0, this->max_prediction);
+
+  Vector3 position;
+  for (int i = 0; i < 3; i++) {
+    position[i] = this->axes[i].position + this->axes[i].velocity * dt;
+  }
+  return position;
+}
@@ -0,0 +1,67 @@
+#ifndef POSE_FILTER_HPP
+#define POSE_FILTER_HPP
+
+#include <godot_cpp/variant/vector3.hpp>
+
+namespace godot {
+
+// filters the tracked head position and extrapolates it to the time a frame
+// is rendered, so the camera keeps moving smoothly between detections and
+// the pipeline latency is compensated
+class PoseFilter {
+public:
+  enum Mode {
+    FILTER_NONE,
+    // fixed exponential moving average, no prediction
+    FILTER_EXPONENTIAL,
+    // One Euro filter: adaptive low-pass whose cutoff rises with speed
+    FILTER_ONE_EURO,
+    // constant-velocity Kalman filter, one per axis
+    FILTER_KALMAN,
+  };
+
+private:
+  struct AxisState {
+    double position;
+    double velocity;
+    // One Euro: raw measurement of the last update
+    double last_measurement;
+    // Kalman: position/velocity covariance
+    double p00, p01, p11;
+  };
+
+  AxisState axes[3];
+  bool has_estimate = false;
+  // time of the last measurement, in seconds
+  double last_time = 0.0;
+
+  void update_exponential(AxisState &r_axis, double p_measurement);
+  void update_one_euro(AxisState &r_axis, double p_measurement, double p_dt);
+  void update_kalman(AxisState &r_axis, double p_measurement, double p_dt);
+
+public:
+  Mode mode = FILTER_ONE_EURO;
+
+  double exponential_alpha = 0.5;
+  // One Euro parameters, see https://gery.casiez.net/1euro/
+  double min_cutoff = 1.0;
+  double beta = 5.0;
+  double derivative_cutoff = 1.0;
+  // Kalman acceleration and measurement noise variances
+  double process_noise = 50.0;
+  double measurement_noise = 0.001;
+  // longest extrapolation past the last measurement, in seconds
+  double max_prediction = 0.1;
+
+  void reset();
+  bool is_ready() const { return this->has_estimate; }
+
+  // feeds a measurement taken at `p_time`, in seconds
+  void update(const Vector3 &p_measurement, double p_time);
+  // filtered position extrapolated to `p_time`, in seconds
+  Vector3 predict(double p_time) const;
+};
+
+} // namespace godot
+
+#endif
@@ -0,0 +1,67 @@
+#include "tracking_benchmark.hpp"
+#include <cmath>
+#include <fstream>
+#include <sstream>
+
+using namespace godot;
+
+bool BenchmarkAccuracy::load_reference(const std::string &p_path) {
+  std::ifstream file(p_path);
+  if (!file) {
+    return false;
+  }
+
+  this->reference.clear();
+
+  std::string line;
+  while (std::getline(file, line)) {
+    std::istringstream fields(line);
+    int frame;
+    float x, y;
+    char comma;
+    // skips the header and comments
+    if (fields >> frame >> comma >> x >> comma >> y) {
+      this->reference[frame] = cv::Point2f(x, y);
+    }
+  }
+
+  return true;
+}
+
+void BenchmarkAccuracy::reset() {
+  this->last_frame = -1;
+  this->error_sum = 0.0;
+  this->jitter_square_sum = 0.0;
+  this->error_count = 0;
+  this->jitter_count = 0;
+}
+
+void BenchmarkAccuracy::add(int p_frame, const cv::Point2f &p_point) {
+  auto reference_point = this->reference.find(p_frame);
+  if (reference_point == this->reference.end()) {
+    return;
+  }
+
+  cv::Point2f error = p_point - reference_point->second;
+  this->error_sum += cv::norm(error);
+  this->error_count++;
+
+  if (this->last_frame == p_frame - 1) {
+    cv::Point2f change = error - this->last_error;
+    this->jitter_square_sum += change.dot(change);
+    this->jitter_count++;
+  }
+
+  this->last_error = error;
+  this->last_frame = p_frame;
+}
+
+double BenchmarkAccuracy::get_mean_error() const {
+  return this->error_count ? this->error_sum / this->error_count : 0.0;
+}
+
+double BenchmarkAccuracy::get_jitter() const {
+  return this->jitter_count
+             ? std::sqrt(this->jitter_square_sum / this->jitter_count)
+             : 0.0;
+}
@@ -0,0 +1,39 @@
+#ifndef TRACKING_BENCHMARK_HPP
+#define TRACKING_BENCHMARK_HPP
+
+#include <opencv2/opencv.hpp>
+#include <string>
+#include <unordered_map>
+
+namespace godot {
+
+// compares tracked points with the reference coordinates of a recorded
+// session, stored as `frame,x,y` CSV lines in capture pixels
+class BenchmarkAccuracy {
+  std::unordered_map<int, cv::Point2f> reference;
+
+  cv::Point2f last_error;
+  int last_frame = -1;
+  double error_sum = 0.0;
+  double jitter_square_sum = 0.0;
+  int error_count = 0;
+  int jitter_count = 0;
+
+public:
+  bool load_reference(const std::string &p_path);
+  bool has_reference() const { return !this->reference.empty(); }
+
+  void reset();
+  void add(int p_frame, const cv::Point2f &p_point);
+
+  int get_matched_frames() const { return this->error_count; }
+  // mean distance to the reference, in pixels
+  double get_mean_error() const;
+  // RMS of the error change between consecutive frames, in pixels. a
+  // constant offset doesn't count as jitter
+  double get_jitter() const;
+};
+
+} // namespace godot
+
+#endif
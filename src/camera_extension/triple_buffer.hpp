@@ -0,0 +1,53 @@
+#ifndef TRIPLE_BUFFER_HPP
+#define TRIPLE_BUFFER_HPP
+
+#include <atomic>
+#include <cstdint>
+
+namespace godot {
+
+// lock-free single-producer/single-consumer mailbox holding only the latest
+// value: the writer fills its back buffer and swaps it with the shared middle
+// one, the reader swaps the middle buffer with its front one when it is fresh.
+// neither side ever waits on the other, and stale values are simply overwritten
+template <typename T> class TripleBuffer {
+  static constexpr uint8_t INDEX_MASK = 0b011;
+  static constexpr uint8_t FRESH_BIT = 0b100;
+
+  T buffers[3] = {};
+  std::atomic<uint8_t> middle{0};
+  // only touched by the writer
+  uint8_t back = 1;
+  // only touched by the reader
+  uint8_t front = 2;
+
+public:
+  // writer side: fill the returned buffer then call `publish()`
+  T &write_buffer() { return this->buffers[this->back]; }
+
+  // returns false if the previous value was overwritten before being read
+  bool publish() {
+    uint8_t previous = this->middle.exchange(this->back | FRESH_BIT,
+                                             std::memory_order_acq_rel);
+    this->back = previous & INDEX_MASK;
+    return !(previous & FRESH_BIT);
+  }
+
+  // reader side: returns true if a value was published since the last call,
+  // in which case `read_buffer()` now holds it
+  bool consume() {
+    if (!(this->middle.load(std::memory_order_relaxed) & FRESH_BIT)) {
+      return false;
+    }
+    this->front =
+        this->middle.exchange(this->front, std::memory_order_acq_rel) &
+        INDEX_MASK;
+    return true;
+  }
+
+  const T &read_buffer() const { return this->buffers[this->front]; }
+};
+
+} // namespace godot
+
+#endif